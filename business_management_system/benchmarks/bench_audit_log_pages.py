@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Audit log paging: time to fetch one page near the start, middle and end of a
+large AuditLog with keyset paging (get_audit_log_page) versus LIMIT/OFFSET.
+
+Usage:
+    python benchmarks/bench_audit_log_pages.py [--rows N] [--iterations N]
+"""
+import argparse
+import datetime
+
+from bench_utils import create_benchmark_database, print_result, time_calls
+
+from db import database_manager
+
+PAGE_SIZE = database_manager.AUDIT_LOG_PAGE_SIZE
+
+def seed_database(row_count: int) -> None:
+    database_manager.configure_database(create_benchmark_database())
+    start = datetime.datetime(2024, 1, 1)
+    with database_manager.db_connection() as conn:
+        conn.execute("INSERT INTO Users (username, password_hash, role) VALUES ('owner', 'x', 'Owner')")
+        conn.executemany(
+            "INSERT INTO AuditLog (user_id, action_type, action_details, timestamp) VALUES (1, 'BENCH', ?, ?)",
+            [(f"record {i}", (start + datetime.timedelta(seconds=i // 3)).strftime("%Y-%m-%d %H:%M:%S"))
+             for i in range(row_count)]
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark audit log paging")
+    parser.add_argument("--rows", type=int, default=500000, help="AuditLog rows to create")
+    parser.add_argument("--iterations", type=int, default=50, help="Fetches per measurement")
+    args = parser.parse_args()
+
+    seed_database(args.rows)
+    conn = database_manager.get_db_connection()
+
+    for label, offset in [("start", 0), ("middle", args.rows // 2), ("end", args.rows - PAGE_SIZE)]:
+        # The key of the row just before the page, as the viewer would hold it
+        before = None
+        if offset:
+            row = conn.execute(
+                "SELECT timestamp, log_id FROM AuditLog ORDER BY timestamp DESC, log_id DESC LIMIT 1 OFFSET ?",
+                (offset - 1,)
+            ).fetchone()
+            before = (row["timestamp"], row["log_id"])
+
+        print_result(f"keyset page at {label}",
+                     time_calls(lambda: database_manager.get_audit_log_page(before), args.iterations))
+        print_result(f"OFFSET page at {label}", time_calls(lambda: conn.execute("""
+            SELECT a.log_id, a.timestamp, u.username, a.action_type, a.action_details
+            FROM AuditLog a LEFT JOIN Users u ON a.user_id = u.user_id
+            ORDER BY a.timestamp DESC, a.log_id DESC LIMIT ? OFFSET ?
+        """, (PAGE_SIZE, offset)).fetchall(), args.iterations))
+
+    database_manager.close_db_connections()
+
+if __name__ == "__main__":
+    main()
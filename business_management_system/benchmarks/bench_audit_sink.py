@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Burst of audit records written through the background audit sink, reporting
+caller-side latency and how many transactions the writer needed.
+
+Usage:
+    python benchmarks/bench_audit_sink.py [--records N]
+"""
+import argparse
+import time
+
+from bench_utils import create_benchmark_database
+
+from db import database_manager
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the batched audit-log writer")
+    parser.add_argument("--records", type=int, default=5000, help="Audit records in the burst")
+    args = parser.parse_args()
+
+    database_manager.configure_database(create_benchmark_database())
+
+    start = time.perf_counter()
+    for i in range(args.records):
+        database_manager.log_action(None, "SALE_SCANNED", f"Scanned item {i}")
+    queued = time.perf_counter() - start
+    database_manager.flush_audit_log(timeout=None)
+    total = time.perf_counter() - start
+
+    stats = database_manager.get_audit_sink_stats()
+    with database_manager.db_connection() as conn:
+        rows = conn.execute("SELECT COUNT(*) FROM AuditLog").fetchone()[0]
+
+    print(f"records logged:        {args.records}")
+    print(f"rows in AuditLog:      {rows}")
+    print(f"writer transactions:   {stats['transactions']}")
+    print(f"caller time per call:  {queued / args.records * 1000:.4f} ms")
+    print(f"time until durable:    {total * 1000:.1f} ms")
+    database_manager.close_db_connections()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Product lookup latency: one SQL round trip per lookup versus the in-memory
+catalog cache, plus a check that the cache follows price changes made by
+another connection and stock changes made by checkout.
+
+Usage:
+    python benchmarks/bench_catalog_cache.py [--products N] [--iterations N]
+"""
+import argparse
+import random
+import sqlite3
+import sys
+import time
+
+from bench_utils import create_benchmark_database, print_result, time_calls
+
+from db import database_manager
+from db import order_engine
+
+def seed_database(product_count: int) -> str:
+    db_path = create_benchmark_database()
+    database_manager.configure_database(db_path)
+    with database_manager.db_connection() as conn:
+        conn.execute("INSERT INTO Users (username, password_hash, role) VALUES ('cashier', 'x', 'Cashier')")
+        conn.execute("INSERT INTO Categories (name) VALUES ('Benchmark')")
+        conn.execute("INSERT INTO SalesLocations (location_name, capacity) VALUES ('Checkout 1', 1)")
+        conn.executemany(
+            "INSERT INTO Products (name, price, category_id, current_stock) VALUES (?, ?, 1, 1000)",
+            [(f"Product {i}", 1.0 + i % 50) for i in range(product_count)]
+        )
+    return db_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the product catalog cache")
+    parser.add_argument("--products", type=int, default=5000, help="Products in the catalog")
+    parser.add_argument("--iterations", type=int, default=20000, help="Lookups per measurement")
+    args = parser.parse_args()
+
+    db_path = seed_database(args.products)
+    cache = database_manager.get_catalog_cache()
+    conn = database_manager.get_db_connection()
+    rng = random.Random(42)
+    ids = [rng.randint(1, args.products) for _ in range(args.iterations)]
+    position = iter(range(10 ** 9))
+
+    def sql_lookup():
+        conn.execute("SELECT price FROM Products WHERE product_id = ?", (ids[next(position) % len(ids)],)).fetchone()
+
+    def cache_lookup():
+        cache.get_price(ids[next(position) % len(ids)])
+
+    cache.get_products()
+    print_result("price via SQL", time_calls(sql_lookup, args.iterations))
+    print_result("price via catalog cache", time_calls(cache_lookup, args.iterations))
+
+    ok = True
+
+    # Another connection (e.g. the owner's workstation) changes a price
+    other = sqlite3.connect(db_path)
+    other.execute("UPDATE Products SET price = 99.5 WHERE product_id = 7")
+    other.commit()
+    other.close()
+    time.sleep(cache.check_interval)
+    ok = cache.get_price(7) == 99.5 and ok
+
+    # Checkout refreshes the stock level immediately
+    order_engine.checkout([(3, 4)], location_id=1, user_id=1)
+    ok = cache.get_product(3)["current_stock"] == 996 and ok
+
+    print(cache.stats())
+    print("cache follows database changes" if ok else "FAILED: cache returned stale rows")
+    database_manager.close_db_connections()
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
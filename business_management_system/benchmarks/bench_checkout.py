@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Checkout latency and statement count for carts of 1 to 200 lines.
+
+Statements are counted from the trace callback in two ways: distinct
+statements prepared per checkout (constant) and statement executions
+(executemany executes its statement once per cart line).
+
+Usage:
+    python benchmarks/bench_checkout.py [--repeats N]
+"""
+import argparse
+import statistics
+
+from bench_utils import create_benchmark_database
+
+from db import database_manager
+from db import order_engine
+
+CART_SIZES = [1, 5, 10, 50, 100, 200]
+PRODUCT_COUNT = 1000
+
+def seed_database() -> None:
+    database_manager.configure_database(create_benchmark_database())
+    with database_manager.db_connection() as conn:
+        conn.execute("INSERT INTO Users (username, password_hash, role) VALUES ('cashier', 'x', 'Cashier')")
+        conn.execute("INSERT INTO Categories (name) VALUES ('Benchmark')")
+        conn.execute("INSERT INTO SalesLocations (location_name, capacity) VALUES ('Checkout 1', 1)")
+        conn.executemany(
+            "INSERT INTO Products (name, price, category_id, current_stock) VALUES (?, ?, 1, ?)",
+            [(f"Product {i}", 1.0 + i % 50, 10 ** 7) for i in range(PRODUCT_COUNT)]
+        )
+
+class StatementCounter:
+    """Counts statements stepped on the calling thread's connection."""
+
+    def __init__(self):
+        self.executions = 0
+        self.distinct = set()
+
+    def __call__(self, statement: str) -> None:
+        # Transaction control, including the busy timeout switched around BEGIN IMMEDIATE
+        if statement not in ("BEGIN IMMEDIATE", "COMMIT") and not statement.startswith("PRAGMA busy_timeout"):
+            self.executions += 1
+            self.distinct.add(statement.split("VALUES")[0])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transactional checkout")
+    parser.add_argument("--repeats", type=int, default=20, help="Checkouts per cart size")
+    args = parser.parse_args()
+
+    seed_database()
+    conn = database_manager.get_db_connection()
+
+    print(f"{'lines':>5} {'median ms':>10} {'max ms':>8} {'statements':>11} {'executions':>11}")
+    for size in CART_SIZES:
+        cart = [(product_id, 1) for product_id in range(1, size + 1)]
+        latencies = []
+        for _ in range(args.repeats):
+            counter = StatementCounter()
+            conn.set_trace_callback(counter)
+            result = order_engine.checkout(cart, location_id=1, user_id=1)
+            conn.set_trace_callback(None)
+            assert result["success"], result
+            latencies.append(result["latency_ms"])
+        print(f"{size:>5} {statistics.median(latencies):>10.3f} {max(latencies):>8.3f} "
+              f"{len(counter.distinct):>11} {counter.executions:>11}")
+
+    print(order_engine.get_checkout_stats())
+    database_manager.close_db_connections()
+
+if __name__ == "__main__":
+    main()
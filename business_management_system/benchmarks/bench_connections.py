@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Per-call latency of database_manager functions with one-shot connections
+(the previous behaviour) versus the pooled per-thread connections.
+
+Usage:
+    python benchmarks/bench_connections.py [--iterations N]
+"""
+import argparse
+import sqlite3
+from contextlib import contextmanager
+
+import bcrypt
+
+from bench_utils import create_benchmark_database, time_calls, print_result
+
+from db import database_manager
+from db.connection_manager import ConnectionManager
+
+class OneShotConnectionManager(ConnectionManager):
+    """Opens and closes a fresh connection for every transaction, like the old get_db_connection()."""
+
+    def get_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.database_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def transaction(self, immediate: bool = False):
+        conn = self.get_connection()
+        try:
+            if immediate:
+                conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+def prepare_database() -> str:
+    db_path = create_benchmark_database()
+    database_manager.configure_database(db_path)
+    database_manager.initialize_system("owner", "owner123", "System Owner", "Benchmark Business")
+
+    # A low bcrypt cost keeps the password check from hiding the database cost
+    with database_manager.db_connection() as conn:
+        conn.execute(
+            "INSERT INTO Users (username, password_hash, role, full_name) VALUES (?, ?, ?, ?)",
+            ("cashier1", bcrypt.hashpw(b"cashier123", bcrypt.gensalt(4)), "Cashier", "Bench Cashier")
+        )
+    return db_path
+
+def run_suite(label: str, iterations: int) -> None:
+    print_result(f"{label}: verify_user",
+                 time_calls(lambda: database_manager.verify_user("cashier1", "cashier123"), iterations))
+    print_result(f"{label}: get_all_users",
+                 time_calls(database_manager.get_all_users, iterations))
+    print_result(f"{label}: log_action",
+                 time_calls(lambda: database_manager.log_action(None, "BENCHMARK", "benchmark entry"), iterations))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pooled versus one-shot SQLite connections")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per measured function")
+    args = parser.parse_args()
+
+    db_path = prepare_database()
+
+    # WAL mode is persistent, so switch back to the default journal for the baseline
+    database_manager.close_db_connections()
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.close()
+    database_manager._connection_manager = OneShotConnectionManager(db_path)
+    run_suite("before (one-shot)", args.iterations)
+
+    database_manager.configure_database(db_path)
+    run_suite("after (pooled)", args.iterations)
+    database_manager.close_db_connections()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-paint of each dashboard with lazily built tabs versus all
+tabs built up front (the behaviour before LazyTabview, reproduced with
+build_all()). The database holds USERS users and LOGS audit log rows.
+
+Needs a display (on a headless machine run it under xvfb-run).
+
+Usage:
+    python benchmarks/bench_dashboard_paint.py [--users N] [--logs N] [--runs N]
+"""
+import argparse
+import statistics
+import sys
+import time
+import types
+
+from bench_utils import create_benchmark_database
+
+from db import database_manager
+
+def seed_database(user_count: int, log_count: int) -> None:
+    database_manager.configure_database(create_benchmark_database())
+    with database_manager.db_connection() as conn:
+        conn.execute("INSERT INTO Users (username, password_hash, role, is_owner) VALUES ('owner', 'x', 'Owner', 1)")
+        conn.executemany("INSERT INTO Users (username, password_hash, role) VALUES (?, 'x', ?)",
+                         [(f"user{i}", ("Manager", "Cashier", "Accounting")[i % 3]) for i in range(user_count)])
+        conn.execute("INSERT INTO SystemConfig (installation_id, license_key, business_name, hardware_id, owner_id) "
+                     "VALUES ('bench', 'x', 'Benchmark Shop', 'x', 1)")
+        conn.executemany("INSERT INTO AuditLog (user_id, action_type, action_details) VALUES (1, 'USER_LOGIN', ?)",
+                         [(f"User owner session {i}",) for i in range(log_count)])
+
+def time_first_paint(root, frame_class, eager: bool) -> float:
+    """Builds a dashboard and returns milliseconds until Tk has drawn it."""
+    controller = types.SimpleNamespace(current_username="owner", current_user_id=1, current_user_role="Owner",
+                                       is_owner=True, show_login_frame=lambda: None)
+    painted = []
+    started = time.perf_counter()
+    frame = frame_class(root, controller)
+    if eager:
+        frame.tabview.build_all()
+    frame.pack(fill="both", expand=True)
+
+    def record():
+        root.update_idletasks()
+        painted.append((time.perf_counter() - started) * 1000)
+    root.after_idle(record)
+    while not painted:
+        root.update()
+    frame.destroy()
+    root.update()
+    return painted[0]
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure dashboard time-to-first-paint")
+    parser.add_argument("--users", type=int, default=300, help="Users in the user management tab")
+    parser.add_argument("--logs", type=int, default=5000, help="Audit log rows")
+    parser.add_argument("--runs", type=int, default=5, help="Measurements per dashboard and mode")
+    args = parser.parse_args()
+
+    try:
+        import customtkinter as ctk
+        root = ctk.CTk()
+    except Exception as e:
+        print(f"No display available: {e}")
+        sys.exit(2)
+    root.geometry("1100x800")
+
+    seed_database(args.users, args.logs)
+    from ui.owner_dashboard_view import OwnerDashboard
+    from ui.manager_dashboard_view import ManagerDashboard
+    from ui.cashier_dashboard_view import CashierDashboard
+    from ui.accounting_dashboard_view import AccountingDashboard
+
+    print(f"{'dashboard':<20} {'eager ms':>9} {'lazy ms':>9}")
+    for frame_class in (OwnerDashboard, ManagerDashboard, CashierDashboard, AccountingDashboard):
+        eager = statistics.median(time_first_paint(root, frame_class, True) for _ in range(args.runs))
+        lazy = statistics.median(time_first_paint(root, frame_class, False) for _ in range(args.runs))
+        print(f"{frame_class.__name__:<20} {eager:>9.1f} {lazy:>9.1f}")
+
+    root.destroy()
+    database_manager.close_db_connections()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Cold versus warm cost of the hardware fingerprint.
+
+Cold calls discard the process-wide cache first, so they include the
+platform probes (WMI on Windows, machine-id on Linux) and hashing.
+
+Usage:
+    python benchmarks/bench_fingerprint.py [--iterations N]
+"""
+import argparse
+
+from bench_utils import time_calls, print_result
+
+from db.hardware_fingerprint import fingerprint
+
+def cold_call() -> None:
+    fingerprint.reset()
+    fingerprint.get_hardware_id()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold versus warm hardware fingerprint")
+    parser.add_argument("--iterations", type=int, default=50, help="Calls per measurement")
+    args = parser.parse_args()
+
+    print_result("cold get_hardware_id", time_calls(cold_call, args.iterations))
+    fingerprint.get_hardware_id()
+    print_result("warm get_hardware_id", time_calls(fingerprint.get_hardware_id, args.iterations * 100))
+
+    print("components:")
+    for name, value in fingerprint.get_components().items():
+        print(f"  {name:<12} {value}")
+
+if __name__ == "__main__":
+    main()
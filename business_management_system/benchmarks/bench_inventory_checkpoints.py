@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark of point-in-time stock queries with and without inventory checkpoints.
+
+Builds a database with many products and a couple of years of InventoryLog
+rows, writes the day and month checkpoints with close_inventory_periods()
+and times month-end stock valuations through inventory_checkpoints against
+a full scan that takes Products.current_stock and subtracts every change
+logged since. Every tenth product was created with stock that has no
+InventoryLog row, as products added through the application are. Also
+checks a mid-month instant and single products. Exits non-zero if any
+result differs from the full scan.
+
+Usage:
+    python benchmarks/bench_inventory_checkpoints.py [--products N] [--changes N] [--months N]
+"""
+import argparse
+import datetime
+import random
+import sqlite3
+import sys
+import time
+
+from bench_utils import create_benchmark_database
+
+from db import database_manager
+from db import inventory_checkpoints
+
+TIME_FORMAT = inventory_checkpoints.TIME_FORMAT
+
+def seed_database(products: int, changes: int, months: int, seed: int = 0) -> str:
+    """
+    Creates products with an InventoryLog of about changes rows each over the last months.
+
+    Every tenth product starts with unlogged opening stock instead of an
+    "Initial Stock" row.
+    """
+    db_path = create_benchmark_database()
+    rng = random.Random(seed)
+    end = datetime.datetime.now() - datetime.timedelta(minutes=5)
+    span = months * 30 * 86400
+
+    def log_rows(stock_levels: list):
+        for product_id in range(1, products + 1):
+            opening = product_id % 10 == 0
+            stock = rng.randint(20, 200) if opening else 0
+            offsets = sorted(rng.randrange(span) for _ in range(changes))
+            for i, offset in enumerate(offsets):
+                if i == 0 and not opening:
+                    change, reason = rng.randint(20, 200), "Initial Stock"
+                elif stock and rng.random() < 0.8:
+                    change, reason = -rng.randint(1, min(stock, 10)), "Sale"
+                else:
+                    change, reason = rng.randint(10, 100), "Manual Stock Entry"
+                stock += change
+                log_time = (end - datetime.timedelta(seconds=span - offset)).strftime(TIME_FORMAT)
+                yield product_id, change, stock, reason, log_time
+            stock_levels.append((stock, product_id))
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("BEGIN")
+    conn.execute("INSERT INTO Categories (name) VALUES ('Benchmark')")
+    conn.executemany(
+        "INSERT INTO Products (product_id, name, price, cost_price, category_id, current_stock) VALUES (?, ?, ?, ?, 1, 0)",
+        [(i, f"Product {i}", round(2 + i % 97 * 0.5, 2), round(1 + i % 97 * 0.3, 2)) for i in range(1, products + 1)]
+    )
+    stock_levels = []
+    conn.executemany(
+        "INSERT INTO InventoryLog (product_id, change_quantity, new_stock_level, reason, log_time) VALUES (?, ?, ?, ?, ?)",
+        log_rows(stock_levels)
+    )
+    conn.executemany("UPDATE Products SET current_stock = ? WHERE product_id = ?", stock_levels)
+    conn.execute("COMMIT")
+    conn.close()
+    return db_path
+
+# The baseline: every product's current_stock less every change logged at or after an instant
+FULL_SCAN_SQL = """
+    SELECT p.product_id, p.price, p.cost_price, p.current_stock - COALESCE(s.change_quantity, 0) AS stock
+    FROM Products p
+    LEFT JOIN (SELECT product_id, SUM(change_quantity) AS change_quantity FROM InventoryLog
+               WHERE log_time >= ? GROUP BY product_id) s ON s.product_id = p.product_id
+"""
+
+def full_scan_levels(conn: sqlite3.Connection, at: str) -> dict:
+    return {row[0]: row[3] for row in conn.execute(FULL_SCAN_SQL, (at,)).fetchall()}
+
+def full_scan_valuation(conn: sqlite3.Connection, at: str) -> dict:
+    row = conn.execute(f"""
+        SELECT COALESCE(SUM(stock), 0), ROUND(COALESCE(SUM(stock * cost_price), 0), 2),
+               ROUND(COALESCE(SUM(stock * price), 0), 2)
+        FROM ({FULL_SCAN_SQL})
+    """, (at,)).fetchone()
+    return {"units": row[0], "cost_value": row[1], "retail_value": row[2]}
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark point-in-time stock queries")
+    parser.add_argument("--products", type=int, default=100_000, help="Products")
+    parser.add_argument("--changes", type=int, default=20, help="InventoryLog rows per product")
+    parser.add_argument("--months", type=int, default=24, help="Months of history")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    db_path = seed_database(args.products, args.changes, args.months)
+    print(f"seeded {args.products} products, {args.products * args.changes} log rows "
+          f"in {time.perf_counter() - start:.1f} s")
+    database_manager.configure_database(db_path)
+    conn = sqlite3.connect(db_path)
+
+    closed, elapsed = timed(inventory_checkpoints.close_inventory_periods)
+    print(f"first close_inventory_periods: {closed} in {elapsed / 1000:.1f} s")
+    closed, elapsed = timed(inventory_checkpoints.close_inventory_periods)
+    print(f"next close_inventory_periods:  {closed} in {elapsed:.1f} ms")
+
+    # A product added after the checkpoints, with unlogged opening stock, then adjusted
+    conn.execute("INSERT INTO Products (name, price, cost_price, category_id, current_stock) "
+                 "VALUES ('Added later', 4.49, 2.0, 1, 75)")
+    conn.commit()
+    new_product = conn.execute("SELECT MAX(product_id) FROM Products").fetchone()[0]
+    database_manager.adjust_stock(new_product, -5, "Spoilage")
+
+    failures = []
+    month_starts = [at for (at,) in conn.execute(
+        "SELECT checkpoint_time FROM InventoryCheckpointRuns WHERE period = 'month' ORDER BY checkpoint_time DESC LIMIT 3"
+    )]
+    last_checkpoint = datetime.datetime.strptime(month_starts[0], TIME_FORMAT)
+    instants = month_starts + [(last_checkpoint + datetime.timedelta(days=14, hours=13)).strftime(TIME_FORMAT)]
+
+    print(f"\n{'valuation at':<22} {'units':>12} {'checkpoint ms':>14} {'full scan ms':>13}")
+    for at in instants:
+        valuation, checkpoint_ms = timed(inventory_checkpoints.get_stock_valuation, at)
+        expected, scan_ms = timed(full_scan_valuation, conn, at)
+        print(f"{at:<22} {valuation['units']:>12} {checkpoint_ms:>14.1f} {scan_ms:>13.1f}")
+        for key, value in expected.items():
+            if abs(valuation[key] - value) > 0.01:
+                failures.append(f"valuation at {at}: {key} {valuation[key]}, full scan {value}")
+
+    at = instants[-1]
+    levels, elapsed = timed(inventory_checkpoints.get_stock_levels_at, at)
+    print(f"\nget_stock_levels_at({at}): {len(levels)} products in {elapsed:.1f} ms")
+    expected = full_scan_levels(conn, at)
+    failures += [f"product {row['product_id']} at {at}: {row['stock_level']}, full scan {expected.get(row['product_id'], 0)}"
+                 for row in levels if row["stock_level"] != expected.get(row["product_id"], 0)][:10]
+
+    rng = random.Random(1)
+    samples = []
+    for product_id in rng.sample(range(1, args.products + 1), min(200, args.products)):
+        at = rng.choice(instants)
+        stock, elapsed = timed(inventory_checkpoints.get_stock_at, product_id, at)
+        samples.append(elapsed)
+        expected = conn.execute("SELECT current_stock - (SELECT COALESCE(SUM(change_quantity), 0) FROM InventoryLog "
+                                "WHERE product_id = ? AND log_time >= ?) FROM Products WHERE product_id = ?",
+                                (product_id, at, product_id)).fetchone()[0]
+        if stock != expected:
+            failures.append(f"get_stock_at({product_id}, {at}) = {stock}, current stock less later changes {expected}")
+    print(f"get_stock_at: median {sorted(samples)[len(samples) // 2]:.3f} ms over {len(samples)} products")
+
+    now_levels = {row["product_id"]: row["stock_level"]
+                  for row in inventory_checkpoints.get_stock_levels_at(datetime.datetime.now().strftime(TIME_FORMAT))}
+    current = dict(conn.execute("SELECT product_id, current_stock FROM Products").fetchall())
+    if now_levels != current:
+        failures.append("stock levels now do not match Products.current_stock")
+    conn.close()
+    database_manager.close_db_connections()
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures[:20]))
+        sys.exit(1)
+    print("\ncheckpoint queries match the current stock less the changes since")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Round-trip check and throughput comparison of the license codec against the
+original character-by-character simple_encrypt/simple_decrypt.
+
+The script exits with a non-zero status if any payload does not round-trip
+or differs from the original implementation's output.
+
+Usage:
+    python benchmarks/bench_license_codec.py [--payloads N]
+"""
+import argparse
+import datetime
+import json
+import random
+import sys
+import time
+
+import bench_utils  # noqa: F401  (adds src to the path)
+
+from db.license_codec import decode_license, decode_licenses, encode_license, encode_licenses
+
+KEY = "BusinessManagementSystemSecretKey"
+
+def legacy_encrypt(text: str) -> str:
+    """The original simple_encrypt implementation."""
+    result = ""
+    for i, char in enumerate(text):
+        key_char = KEY[i % len(KEY)]
+        result += chr((ord(char) + ord(key_char)) % 256)
+    return ''.join(f'{ord(c):02x}' for c in result)
+
+def legacy_decrypt(encrypted_hex: str) -> str:
+    """The original simple_decrypt implementation."""
+    encrypted = ''.join(chr(int(encrypted_hex[i:i+2], 16)) for i in range(0, len(encrypted_hex), 2))
+    result = ""
+    for i, char in enumerate(encrypted):
+        key_char = KEY[i % len(KEY)]
+        result += chr((ord(char) - ord(key_char)) % 256)
+    return result
+
+def make_payloads(count: int, seed: int = 1234) -> list:
+    """Builds license JSON payloads like generate_license_key() does."""
+    rng = random.Random(seed)
+    issue = datetime.datetime(2025, 1, 1)
+    payloads = []
+    for i in range(count):
+        payloads.append(json.dumps({
+            "hardware_id": "%064x" % rng.getrandbits(256),
+            "owner_id": rng.randint(1, 10 ** 6),
+            "owner_name": f"Owner {i} " + "".join(rng.choice("abcdefghij ") for _ in range(rng.randint(0, 40))),
+            "issue_date": (issue + datetime.timedelta(minutes=i)).isoformat(),
+            "expiry_date": (issue + datetime.timedelta(days=3650, minutes=i)).isoformat(),
+            "license_version": "1.0"
+        }))
+    # Edge cases: empty, key-length boundaries and non-ASCII text
+    payloads += ["", "x" * len(KEY), "y" * (len(KEY) + 1), "Café Ünïcode ÿ"]
+    return payloads
+
+def check_round_trip(payloads: list) -> int:
+    failures = 0
+    bulk_encoded = encode_licenses(payloads)
+    bulk_decoded = decode_licenses(bulk_encoded)
+    for i, text in enumerate(payloads):
+        expected = legacy_encrypt(text)
+        encoded = encode_license(text)
+        if encoded != expected or bulk_encoded[i] != expected:
+            failures += 1
+            print(f"encode mismatch for payload {i}")
+        if decode_license(expected) != text or bulk_decoded[i] != text or legacy_decrypt(encoded) != text:
+            failures += 1
+            print(f"decode mismatch for payload {i}")
+    return failures
+
+def throughput(label: str, func, payloads: list) -> None:
+    start = time.perf_counter()
+    func(payloads)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {len(payloads) / elapsed:12,.0f} payloads/s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark the license codec")
+    parser.add_argument("--payloads", type=int, default=5000, help="Payloads in the throughput run")
+    args = parser.parse_args()
+
+    failures = check_round_trip(make_payloads(500))
+    print(f"round-trip check: {'OK' if not failures else f'{failures} failures'}")
+
+    payloads = make_payloads(args.payloads)
+    encoded = encode_licenses(payloads)
+    throughput("legacy encrypt", lambda p: [legacy_encrypt(t) for t in p], payloads)
+    throughput("encode_license (per call)", lambda p: [encode_license(t) for t in p], payloads)
+    throughput("encode_licenses (bulk)", encode_licenses, payloads)
+    throughput("legacy decrypt", lambda p: [legacy_decrypt(t) for t in p], encoded)
+    throughput("decode_license (per call)", lambda p: [decode_license(t) for t in p], encoded)
+    throughput("decode_licenses (bulk)", decode_licenses, encoded)
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Reporting engine benchmark: builds a database with LINES synthetic paid order
+lines (four per order, over one year) and times the vectorized NumPy report
+against the equivalent row-by-row Python aggregation over sqlite3.Row, for
+each bucket size. Exits non-zero if the two disagree.
+
+Usage:
+    python benchmarks/bench_reporting_engine.py [--lines N] [--group-by category,location]
+"""
+import argparse
+import sys
+import time
+
+from bench_utils import create_benchmark_database
+
+from db import database_manager
+from db import reporting_engine
+
+PRODUCT_COUNT = 500
+CATEGORY_COUNT = 12
+LOCATION_COUNT = 4
+LINES_PER_ORDER = 4
+
+def seed_database(line_count: int) -> None:
+    database_manager.configure_database(create_benchmark_database())
+    order_count = line_count // LINES_PER_ORDER
+    start = time.perf_counter()
+    with database_manager.db_connection(immediate=True) as conn:
+        conn.executemany("INSERT INTO Categories (name) VALUES (?)", [(f"Category {i}",) for i in range(CATEGORY_COUNT)])
+        conn.executemany("INSERT INTO SalesLocations (location_name, capacity) VALUES (?, 1)",
+                         [(f"Checkout {i}",) for i in range(LOCATION_COUNT)])
+        conn.executemany(
+            "INSERT INTO Products (name, price, cost_price, category_id, current_stock) VALUES (?, ?, ?, ?, 0)",
+            [(f"Product {i}", 1.0 + i % 40, 0.6 * (1.0 + i % 40), 1 + i % CATEGORY_COUNT) for i in range(PRODUCT_COUNT)]
+        )
+        # Orders spread evenly over 2024, in order_time order
+        conn.execute(f"""
+            WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i + 1 < ?)
+            INSERT INTO Orders (location_id, order_time, status, total_amount, payment_time, payment_method)
+            SELECT 1 + i % {LOCATION_COUNT}, t, 'Paid', 0, t, CASE WHEN i % 2 THEN 'Card' ELSE 'Cash' END
+            FROM (SELECT i, datetime('2024-01-01', '+' || (i * 31536000 / ?) || ' seconds') AS t FROM n)
+        """, (order_count, order_count))
+        conn.execute(f"""
+            WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i + 1 < ?)
+            INSERT INTO OrderItems (order_id, product_id, quantity, price_at_order, subtotal, cost_at_order)
+            SELECT i / {LINES_PER_ORDER} + 1, p.product_id, 1 + i % 3, p.price, p.price * (1 + i % 3), p.cost_price
+            FROM n JOIN Products p ON p.product_id = 1 + (i * 7919) % {PRODUCT_COUNT}
+        """, (order_count * LINES_PER_ORDER,))
+    print(f"seeded {order_count * LINES_PER_ORDER:,} order lines in {time.perf_counter() - start:.1f} s")
+
+def aggregate_rows(conn, start: str, end: str, bucket: str, group_by) -> list:
+    """The row-by-row baseline: a Python loop over sqlite3.Row objects."""
+    conn.row_factory = database_manager.sqlite3.Row
+    cursor = conn.execute(reporting_engine.ORDER_LINES_SQL, (start, end))
+    lines = ((row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7]) for row in cursor)
+    return reporting_engine.aggregate_lines_python(lines, bucket, group_by)
+
+def rows_match(left: list, right: list) -> bool:
+    if len(left) != len(right):
+        return False
+    for a, b in zip(left, right):
+        for key in a:
+            if isinstance(a[key], float) and abs(a[key] - b[key]) > 0.05:
+                return False
+            if not isinstance(a[key], float) and a[key] != b[key]:
+                return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized reporting engine")
+    parser.add_argument("--lines", type=int, default=10000000, help="Synthetic order lines")
+    parser.add_argument("--group-by", default="category,location", help="Comma-separated groupings")
+    args = parser.parse_args()
+    group_by = [name for name in args.group_by.split(",") if name]
+
+    print(f"NumPy available: {reporting_engine.NUMPY_AVAILABLE}")
+    seed_database(args.lines)
+    conn = database_manager.get_db_connection()
+    start, end = "2024-01-01", "2025-01-01"
+
+    # Time spent just stepping the joined query the row-by-row path reads
+    t0 = time.perf_counter()
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    for _ in cursor.execute(reporting_engine.ORDER_LINES_SQL, (start, end)):
+        pass
+    print(f"stepping the joined order lines alone: {time.perf_counter() - t0:.2f} s")
+
+    ok = True
+    print(f"{'bucket':>6} {'groups':>7} {'numpy s':>8} {'rows s':>8} {'speedup':>8}")
+    for bucket in reporting_engine.REPORT_BUCKETS:
+        t0 = time.perf_counter()
+        vectorized = reporting_engine.build_report(conn, start, end, bucket, group_by, use_numpy=True)
+        numpy_seconds = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        baseline = aggregate_rows(conn, start, end, bucket, group_by)
+        row_seconds = time.perf_counter() - t0
+
+        if not rows_match(vectorized, baseline):
+            print(f"FAILED: {bucket} report differs from the row-by-row aggregation")
+            ok = False
+        print(f"{bucket:>6} {len(vectorized):>7} {numpy_seconds:>8.2f} {row_seconds:>8.2f} "
+              f"{row_seconds / numpy_seconds:>7.1f}x")
+
+    database_manager.close_db_connections()
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
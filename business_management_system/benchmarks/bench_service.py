@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Load test of the database service on localhost.
+
+Starts service_server.py in a subprocess on a fresh benchmark database and
+runs several simulated terminals against it, each a thread with its own
+keep-alive connection doing what a sales terminal does: a checkout, a
+catalog change check and a sales location read. Runs once with write
+batching off (--batch-size 1) and once with the default batch size, and
+prints throughput, latency per operation and the service's batching
+counters. Afterwards checks that every sale's stock decrement was applied
+exactly once. Exits non-zero on failure.
+
+Usage:
+    python benchmarks/bench_service.py [--terminals N] [--duration SECONDS]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from bench_utils import create_benchmark_database
+
+from db.service_client import ServiceClient
+from db.service_server import WRITE_BATCH_SIZE
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "db", "service_server.py")
+PRODUCT_COUNT = 1000
+INITIAL_STOCK = 10 ** 7
+
+def seed_database(terminals: int) -> str:
+    db_path = create_benchmark_database()
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("BEGIN")
+    conn.execute("INSERT INTO Users (username, password_hash, role) VALUES ('cashier', 'x', 'Cashier')")
+    conn.execute("INSERT INTO Categories (name) VALUES ('Benchmark')")
+    conn.executemany("INSERT INTO SalesLocations (location_name, capacity) VALUES (?, 1)",
+                     [(f"Checkout {i + 1}",) for i in range(terminals)])
+    conn.executemany(
+        "INSERT INTO Products (name, price, category_id, current_stock) VALUES (?, ?, 1, ?)",
+        [(f"Product {i}", 1.0 + i % 50, INITIAL_STOCK) for i in range(PRODUCT_COUNT)]
+    )
+    conn.execute("COMMIT")
+    conn.close()
+    return db_path
+
+def start_server(db_path: str, batch_size: int) -> tuple:
+    """Starts the service on a free port and returns (process, base URL)."""
+    process = subprocess.Popen(
+        [sys.executable, SERVER_SCRIPT, "--database", db_path, "--port", "0", "--batch-size", str(batch_size)],
+        stdout=subprocess.PIPE, text=True
+    )
+    line = process.stdout.readline()
+    if " on http://" not in line:
+        process.kill()
+        raise RuntimeError(f"The service did not start: {line!r}")
+    # Keep reading so the service never blocks on a full pipe
+    threading.Thread(target=lambda: [None for _ in process.stdout], daemon=True).start()
+    return process, line.rsplit(" on ", 1)[1].strip()
+
+def run_terminal(base_url: str, location_id: int, deadline: float, seed: int, latencies: dict, failures: list) -> None:
+    client = ServiceClient(base_url)
+    rng = random.Random(seed)
+    since = None
+    while time.perf_counter() < deadline:
+        cart = [(rng.randint(1, PRODUCT_COUNT), rng.randint(1, 3)) for _ in range(rng.randint(1, 5))]
+        start = time.perf_counter()
+        result = client.call("checkout", cart=cart, location_id=location_id, user_id=1)
+        latencies["checkout"].append((time.perf_counter() - start) * 1000)
+        if not result["success"]:
+            failures.append(result["error"])
+
+        start = time.perf_counter()
+        since = client.call("get_catalog_changes", since=since)["last_change_id"]
+        latencies["get_catalog_changes"].append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        client.call("get_sales_locations")
+        latencies["get_sales_locations"].append((time.perf_counter() - start) * 1000)
+    client.close()
+
+def run_load(db_path: str, batch_size: int, terminals: int, duration: float) -> list:
+    process, base_url = start_server(db_path, batch_size)
+    try:
+        latencies = {"checkout": [], "get_catalog_changes": [], "get_sales_locations": []}
+        failures = []
+        deadline = time.perf_counter() + duration
+        threads = [threading.Thread(target=run_terminal,
+                                    args=(base_url, i % terminals + 1, deadline, i, latencies, failures))
+                   for i in range(terminals)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        stats = ServiceClient(base_url).stats()
+    finally:
+        process.terminate()
+        process.wait()
+
+    print(f"\nbatch size {batch_size}, {terminals} terminals, {elapsed:.1f} s: "
+          f"{len(latencies['checkout']) / elapsed:.0f} checkouts/s, {stats['requests'] / elapsed:.0f} requests/s")
+    print(f"{'operation':<22} {'calls':>7} {'median ms':>10} {'p95 ms':>8} {'max ms':>8}")
+    for operation, samples in latencies.items():
+        samples.sort()
+        print(f"{operation:<22} {len(samples):>7} {statistics.median(samples):>10.2f} "
+              f"{samples[int(len(samples) * 0.95) - 1]:>8.2f} {samples[-1]:>8.2f}")
+    print(f"write batches {stats['batches']}, average {stats['average_batch']:.1f}, largest {stats['largest_batch']}")
+    return failures
+
+def check_stock(db_path: str) -> list:
+    """Compares each product's stock with the quantities sold."""
+    conn = sqlite3.connect(db_path)
+    mismatches = conn.execute("""
+        SELECT p.product_id
+        FROM Products p
+        LEFT JOIN (SELECT product_id, SUM(quantity) AS sold FROM OrderItems GROUP BY product_id) s
+            ON s.product_id = p.product_id
+        WHERE p.current_stock != ? - COALESCE(s.sold, 0)
+    """, (INITIAL_STOCK,)).fetchall()
+    conn.close()
+    return [f"stock of product {product_id} does not match its sales" for product_id, in mismatches]
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the database service on localhost")
+    parser.add_argument("--terminals", type=int, default=8, help="Simulated terminals (client threads)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per run")
+    args = parser.parse_args()
+
+    db_path = seed_database(args.terminals)
+    failures = []
+    for batch_size in (1, WRITE_BATCH_SIZE):
+        failures += run_load(db_path, batch_size, args.terminals, args.duration)
+    failures += check_stock(db_path)
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures[:20]))
+        sys.exit(1)
+    print("\nservice load test OK")
+
+if __name__ == "__main__":
+    main()
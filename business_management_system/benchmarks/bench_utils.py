@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Shared helpers for the benchmark scripts in this directory."""
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+# Add the src directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from db.migrations import run_migrations
+
+def create_benchmark_database(directory: str = None) -> str:
+    """
+    Creates an empty database with the application schema in a temporary location.
+
+    Args:
+        directory: Directory to create the database in (a new temp dir if omitted)
+
+    Returns:
+        Path of the new database file
+    """
+    directory = directory or tempfile.mkdtemp(prefix="bms_bench_")
+    db_path = os.path.join(directory, "benchmark.db")
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    run_migrations(conn)
+    conn.close()
+    return db_path
+
+def time_calls(func: Callable[[], object], iterations: int) -> Dict[str, float]:
+    """
+    Times repeated calls to a function.
+
+    Args:
+        func: Zero-argument callable to time
+        iterations: Number of calls
+
+    Returns:
+        Dictionary with mean, median and p95 latency in milliseconds
+    """
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": statistics.fmean(samples),
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[int(len(samples) * 0.95) - 1] if len(samples) > 1 else samples[0],
+    }
+
+def print_result(label: str, result: Dict[str, float]) -> None:
+    """Prints one timing result on a single line."""
+    print(f"{label:<40} mean {result['mean_ms']:8.3f} ms   "
+          f"median {result['median_ms']:8.3f} ms   p95 {result['p95_ms']:8.3f} ms")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Streaming export memory check: exports a synthetic AuditLog of ROWS rows to
+CSV and exits non-zero if the Python heap peak during the export (measured
+with tracemalloc) exceeds the ceiling, or if the file has the wrong number of
+rows. Also checks that a cancelled export leaves no file behind.
+
+Usage:
+    python benchmarks/check_export_memory.py [--rows N] [--ceiling-mb MB]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from bench_utils import create_benchmark_database
+
+from db import database_manager
+from db.log_export import export_audit_log_csv
+
+def seed_database(row_count: int) -> None:
+    database_manager.configure_database(create_benchmark_database())
+    with database_manager.db_connection() as conn:
+        conn.execute("INSERT INTO Users (username, password_hash, role) VALUES ('owner', 'x', 'Owner')")
+        conn.execute("""
+            WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i + 1 < ?)
+            INSERT INTO AuditLog (user_id, action_type, action_details, timestamp)
+            SELECT CASE WHEN i % 10 = 0 THEN NULL ELSE 1 END, 'BENCH_ACTION',
+                   'synthetic audit record number ' || i,
+                   datetime('2024-01-01', '+' || (i / 4) || ' seconds')
+            FROM n
+        """, (row_count,))
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the audit log export runs in bounded memory")
+    parser.add_argument("--rows", type=int, default=1000000, help="AuditLog rows to export")
+    parser.add_argument("--ceiling-mb", type=float, default=16.0, help="Maximum Python heap peak in MB")
+    args = parser.parse_args()
+
+    seed_database(args.rows)
+    directory = tempfile.mkdtemp(prefix="bms_export_")
+    file_path = os.path.join(directory, "audit_log.csv")
+
+    # Timed without tracemalloc, which slows allocation-heavy code several-fold
+    start = time.perf_counter()
+    export_audit_log_csv(file_path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    result = export_audit_log_csv(file_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    with open(file_path, encoding="utf-8") as f:
+        lines = sum(1 for _ in f) - 1
+    peak_mb = peak / (1024 * 1024)
+    print(f"exported {result['rows']:,} rows in {elapsed:.2f} s "
+          f"({os.path.getsize(file_path) / (1024 * 1024):.1f} MB file), heap peak {peak_mb:.2f} MB")
+
+    ok = result["success"] and lines == args.rows
+    if peak_mb > args.ceiling_mb:
+        print(f"FAILED: heap peak above the {args.ceiling_mb} MB ceiling")
+        ok = False
+
+    # Cancel after the first chunk: no partial or final file may remain
+    cancel_path = os.path.join(directory, "cancelled.csv")
+    cancel_event = threading.Event()
+    result = export_audit_log_csv(cancel_path, progress=lambda written, total: cancel_event.set(),
+                                  cancel_event=cancel_event)
+    cancelled_ok = result["cancelled"] and not os.path.exists(cancel_path) and not os.path.exists(cancel_path + ".part")
+    print("cancelled export left no file" if cancelled_ok else "FAILED: cancelled export left a file")
+
+    database_manager.close_db_connections()
+    sys.exit(0 if ok and cancelled_ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Log retention check: builds a database with two years of AuditLog and
+LicenseValidation rows, archives everything past the retention period and
+verifies that
+
+- the live tables keep only the retained rows and the file shrinks,
+- paging through live rows and archives returns every row exactly once, in order,
+- the CSV export includes the archived rows,
+- repeating a batch after a crash between archive and delete adds no duplicates.
+
+Exits non-zero on any failure.
+
+Usage:
+    python benchmarks/check_log_archive.py [--rows N] [--retention-days N]
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+from bench_utils import create_benchmark_database
+
+from db import database_manager
+from db import log_archive
+from db.log_export import export_audit_log_csv
+
+def seed_database(row_count: int) -> str:
+    db_path = create_benchmark_database()
+    database_manager.configure_database(db_path)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    step = datetime.timedelta(days=730) / row_count
+    with database_manager.db_connection() as conn:
+        conn.execute("INSERT INTO Users (username, password_hash, role) VALUES ('owner', 'x', 'Owner')")
+        conn.executemany(
+            "INSERT INTO AuditLog (user_id, action_type, action_details, timestamp) VALUES (?, ?, ?, ?)",
+            [(1 if i % 5 else None, "USER_LOGIN" if i % 2 else "USER_LOGOUT", f"User owner session {i}",
+              (now - step * (row_count - i)).strftime("%Y-%m-%d %H:%M:%S"))
+             for i in range(row_count)]
+        )
+        conn.executemany(
+            "INSERT INTO LicenseValidation (is_successful, validation_method, error_message, validation_date) VALUES (1, 'Local', '', ?)",
+            [((now - step * 10 * (row_count // 10 - i)).strftime("%Y-%m-%d %H:%M:%S"),) for i in range(row_count // 10)]
+        )
+    return db_path
+
+def page_through_history() -> list:
+    keys, before = [], None
+    while True:
+        page = log_archive.get_audit_log_history_page(before, 500)
+        if not page:
+            return keys
+        keys.extend((log["timestamp"], log["log_id"]) for log in page)
+        before = keys[-1]
+
+def main():
+    parser = argparse.ArgumentParser(description="Check log archival and archive reads")
+    parser.add_argument("--rows", type=int, default=200000, help="AuditLog rows spread over two years")
+    parser.add_argument("--retention-days", type=int, default=90, help="Days kept in the live database")
+    args = parser.parse_args()
+
+    db_path = seed_database(args.rows)
+    conn = database_manager.get_db_connection()
+    size_before = os.path.getsize(db_path)
+    ok = True
+
+    # Simulate a crash after the first batch was archived but before it was deleted
+    cutoff = (datetime.datetime.now(datetime.timezone.utc)
+              - datetime.timedelta(days=args.retention_days)).strftime("%Y-%m-%d %H:%M:%S")
+    first_batch = [tuple(row) for row in conn.execute(log_archive.AUDIT_LOG.select_sql, (10 ** 12, cutoff, 5000))]
+    month = first_batch[0][1][:7]
+    log_archive._write_archive(month, log_archive.AUDIT_LOG, [row for row in first_batch if row[1][:7] == month])
+
+    start = time.perf_counter()
+    moved = log_archive.archive_old_logs(args.retention_days)
+    elapsed = time.perf_counter() - start
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    size_after = os.path.getsize(db_path)
+
+    live = conn.execute("SELECT COUNT(*) FROM AuditLog").fetchone()[0]
+    archived = log_archive.count_archived_rows(log_archive.AUDIT_LOG)
+    archive_bytes = sum(os.path.getsize(path) for path in log_archive.list_archive_files())
+    print(f"moved {moved} in {elapsed:.2f} s into {len(log_archive.list_archive_files())} archive files "
+          f"({archive_bytes / 1024:.0f} KB)")
+    print(f"live database {size_before / 1024:.0f} KB -> {size_after / 1024:.0f} KB, "
+          f"{live} AuditLog rows live, {archived} archived")
+    if live + archived != args.rows or conn.execute("SELECT COUNT(*) FROM AuditLog WHERE timestamp < ?", (cutoff,)).fetchone()[0]:
+        print("FAILED: archived and live rows do not add up")
+        ok = False
+    if size_after >= size_before:
+        print("FAILED: the live database did not shrink")
+        ok = False
+
+    start = time.perf_counter()
+    keys = page_through_history()
+    print(f"paged through {len(keys)} rows in {time.perf_counter() - start:.2f} s")
+    if len(keys) != args.rows or len(set(keys)) != len(keys) or keys != sorted(keys, reverse=True):
+        print("FAILED: history pages are incomplete, duplicated or out of order")
+        ok = False
+
+    file_path = os.path.join(tempfile.mkdtemp(prefix="bms_archive_"), "audit_log.csv")
+    result = export_audit_log_csv(file_path)
+    print(f"exported {result['rows']} rows")
+    if result["rows"] != args.rows:
+        print("FAILED: export is missing archived rows")
+        ok = False
+
+    print("log archive ok" if ok else "FAILED")
+    database_manager.close_db_connections()
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Upgrade check: builds a large database at schema version 4 (before the
+daily sales summaries), upgrades it with run_migrations() while another
+connection keeps writing, and verifies that
+
+- the batched summary backfill equals a full rebuild,
+- the other connection's writes got through while the upgrade ran, and
+  none of them waited longer than --max-wait-ms for the write lock.
+
+For comparison, also times the same backfill as one transaction, the time
+every terminal would have been locked out. Exits non-zero on failure.
+
+Usage:
+    python benchmarks/check_migrations.py [--orders N] [--max-wait-ms N]
+"""
+import argparse
+import random
+import sqlite3
+import sys
+import threading
+import time
+
+from bench_utils import create_benchmark_database
+
+from db import migrations
+from db import sales_summary
+
+def seed_database(orders: int) -> str:
+    """Creates a database with orders spread over three years, downgraded to version 4."""
+    db_path = create_benchmark_database()
+    rng = random.Random(3)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("BEGIN")
+    conn.execute("INSERT INTO Users (username, password_hash, role) VALUES ('cashier', 'x', 'Cashier')")
+    conn.executemany("INSERT INTO Categories (name) VALUES (?)", [(f"Category {i}",) for i in range(5)])
+    conn.executemany("INSERT INTO SalesLocations (location_name, capacity) VALUES (?, 1)",
+                     [(f"Checkout {i}",) for i in range(3)])
+    conn.executemany("INSERT INTO Products (name, price, category_id, current_stock) VALUES (?, 2.5, ?, 0)",
+                     [(f"Product {i}", 1 + i % 5) for i in range(500)])
+    order_rows, line_rows = [], []
+    for order_id in range(1, orders + 1):
+        paid_at = (f"{2022 + order_id * 3 // orders}-{1 + rng.randrange(12):02d}-{1 + rng.randrange(28):02d} "
+                   f"{rng.randrange(8, 20):02d}:{rng.randrange(60):02d}:00")
+        lines = [(order_id, rng.randint(1, 500), rng.randint(1, 3)) for _ in range(rng.randint(1, 5))]
+        total = sum(quantity * 2.5 for _, _, quantity in lines)
+        order_rows.append((order_id, 1 + order_id % 3, paid_at, total, paid_at, rng.choice(["Cash", "Card"])))
+        line_rows += [(order_id, product_id, quantity, quantity * 2.5) for order_id, product_id, quantity in lines]
+    conn.executemany("""
+        INSERT INTO Orders (order_id, location_id, user_id_creator, order_time, status, total_amount, payment_time, payment_method)
+        VALUES (?, ?, 1, ?, 'Paid', ?, ?, ?)
+    """, order_rows)
+    conn.executemany("INSERT INTO OrderItems (order_id, product_id, quantity, price_at_order, subtotal) "
+                     "VALUES (?, ?, ?, 2.5, ?)", line_rows)
+    conn.execute("COMMIT")
+
+    # Back to the schema before migration 5
+    conn.execute("DROP TABLE DailySales")
+    conn.execute("DROP TABLE DailyOrderTotals")
+    conn.execute("DROP INDEX idx_orders_status_payment_time")
+    conn.execute("PRAGMA user_version = 4")
+    conn.close()
+    return db_path
+
+def snapshot(conn: sqlite3.Connection) -> list:
+    return conn.execute(
+        "SELECT sale_date, product_id, category_id, payment_method, location_id, line_count, units, ROUND(revenue, 2) "
+        "FROM DailySales ORDER BY 1, 2, 3, 4, 5"
+    ).fetchall() + conn.execute(
+        "SELECT sale_date, payment_method, location_id, order_count, ROUND(revenue, 2) FROM DailyOrderTotals ORDER BY 1, 2, 3"
+    ).fetchall()
+
+def keep_writing(db_path: str, stop: threading.Event, waits: list) -> None:
+    """Stands in for a terminal: short write transactions, each timed from BEGIN IMMEDIATE to COMMIT."""
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=60)
+    while not stop.is_set():
+        start = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("INSERT INTO AuditLog (action_type, action_details) VALUES ('CHECK', 'write during upgrade')")
+        conn.execute("COMMIT")
+        waits.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.005)
+    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that schema upgrades leave room for other writers")
+    parser.add_argument("--orders", type=int, default=300000, help="Paid orders in the database being upgraded")
+    parser.add_argument("--max-wait-ms", type=float, default=1000.0, help="Longest acceptable wait of another writer")
+    args = parser.parse_args()
+
+    db_path = seed_database(args.orders)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+
+    waits, stop = [], threading.Event()
+    writer = threading.Thread(target=keep_writing, args=(db_path, stop, waits))
+    writer.start()
+    start = time.perf_counter()
+    version = migrations.run_migrations(conn)
+    upgrade_seconds = time.perf_counter() - start
+    stop.set()
+    writer.join()
+    batched = snapshot(conn)
+
+    start = time.perf_counter()
+    conn.execute("BEGIN IMMEDIATE")
+    sales_summary.rebuild_sales_summaries(conn)
+    conn.execute("COMMIT")
+    single_seconds = time.perf_counter() - start
+    rebuilt = snapshot(conn)
+    conn.close()
+
+    waits.sort()
+    print(f"upgraded {args.orders} orders to version {version} in {upgrade_seconds:.1f} s")
+    print(f"other writer: {len(waits)} commits meanwhile, median wait {waits[len(waits) // 2]:.1f} ms, "
+          f"max {waits[-1]:.1f} ms" if waits else "other writer: no commits")
+    print(f"the same backfill in one transaction: {single_seconds:.1f} s")
+
+    failures = []
+    if version != migrations.LATEST_VERSION:
+        failures.append(f"upgrade stopped at version {version}")
+    if batched != rebuilt:
+        failures.append("batched summary backfill differs from a full rebuild")
+    if len(waits) < 2:
+        failures.append("the other writer did not get through during the upgrade")
+    elif waits[-1] > args.max_wait_ms:
+        failures.append(f"the other writer waited {waits[-1]:.0f} ms for the write lock")
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nupgrade leaves room for other writers")
+
+if __name__ == "__main__":
+    main()
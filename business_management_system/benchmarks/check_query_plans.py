@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression check: runs EXPLAIN QUERY PLAN on every hot query in
+db.indexes.HOT_QUERIES and exits non-zero if any of them scans a whole table.
+
+Checks a fresh database built from the schema, and also an existing database
+without indexes after ensure_indexes() has been applied to it.
+
+Usage:
+    python benchmarks/check_query_plans.py [--database PATH]
+"""
+import argparse
+import sqlite3
+import sys
+
+from bench_utils import create_benchmark_database
+
+from db.indexes import HOT_QUERIES, ensure_indexes, explain_query_plan, find_table_scans
+
+def create_unindexed_database() -> str:
+    """Builds a database with the tables but none of the indexes, like an older install."""
+    db_path = create_benchmark_database()
+    conn = sqlite3.connect(db_path)
+    for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'").fetchall():
+        conn.execute(f"DROP INDEX {name}")
+    conn.commit()
+    conn.close()
+    return db_path
+
+def check(label: str, db_path: str, apply_indexes: bool = False) -> bool:
+    conn = sqlite3.connect(db_path, uri=db_path.startswith("file:"))
+    if apply_indexes:
+        ensure_indexes(conn)
+        conn.commit()
+    scans = find_table_scans(conn)
+    print(f"{label}:")
+    for name, (sql, params) in HOT_QUERIES.items():
+        status = "SCAN" if name in scans else "ok"
+        print(f"  [{status:>4}] {name}")
+        for detail in explain_query_plan(conn, sql, params):
+            print(f"           {detail}")
+    conn.close()
+    return not scans
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if a hot query falls back to a full table scan")
+    parser.add_argument("--database", help="Also check an existing database file (read-only)")
+    args = parser.parse_args()
+
+    ok = check("new database", create_benchmark_database())
+    ok = check("existing database after ensure_indexes", create_unindexed_database(), apply_indexes=True) and ok
+    if args.database:
+        ok = check(args.database, f"file:{args.database}?mode=ro") and ok
+
+    print("all hot queries use indexes" if ok else "FAILED: some hot queries scan whole tables")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
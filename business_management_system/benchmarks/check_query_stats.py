@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Checks the query statistics: connections are plain sqlite3 connections while
+statistics are off (so the disabled overhead is zero), statements are keyed
+by their normalized SQL with rows and call sites, slow statements reach the
+slow-query log with their plan, and connections are not swapped inside a
+transaction. Prints the per-call cost of a primary-key lookup with
+statistics off and on. Exits non-zero on failure.
+
+Usage:
+    python benchmarks/check_query_stats.py [--iterations N]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+
+from bench_utils import create_benchmark_database, time_calls, print_result
+
+from db import database_manager
+from db.query_stats import InstrumentedConnection, normalize_sql
+
+def seed_database() -> None:
+    database_manager.configure_database(create_benchmark_database())
+    with database_manager.db_connection() as conn:
+        conn.execute("INSERT INTO Users (username, password_hash, role) VALUES ('owner', 'x', 'Owner')")
+        conn.executemany("INSERT INTO Categories (name) VALUES (?)", [(f"Category {i}",) for i in range(20)])
+
+def main():
+    parser = argparse.ArgumentParser(description="Check query statistics and the slow-query log")
+    parser.add_argument("--iterations", type=int, default=20000, help="Lookups timed per mode")
+    args = parser.parse_args()
+
+    seed_database()
+    failures = []
+
+    expected = "SELECT * FROM t WHERE a IN (?...) AND b = ? AND c = ?"
+    if normalize_sql("SELECT *\n  FROM t WHERE a IN (1, 2, 3) AND b = 'x' AND c = ?") != expected:
+        failures.append("IN lists and literals are not normalized")
+    if normalize_sql("INSERT INTO t VALUES (?, ?), (?, ?), (?, ?)") != "INSERT INTO t VALUES (?...), ...":
+        failures.append("multi-row VALUES is not normalized")
+
+    if type(database_manager.get_db_connection()) is not sqlite3.Connection:
+        failures.append("connections are instrumented while statistics are off")
+    disabled = time_calls(lambda: database_manager.get_user_by_id(1), args.iterations)
+
+    # Switching on inside a transaction must not swap the connection under it
+    with database_manager.db_connection() as conn:
+        database_manager.enable_query_stats(threshold_ms=1000)
+        if database_manager.get_db_connection() is not conn:
+            failures.append("the connection was replaced inside a transaction")
+    if not isinstance(database_manager.get_db_connection(), InstrumentedConnection):
+        failures.append("connections are not instrumented after enabling statistics")
+
+    database_manager.get_query_stats().reset()
+    enabled = time_calls(lambda: database_manager.get_user_by_id(1), args.iterations)
+
+    # Log everything from here on
+    database_manager.enable_query_stats(threshold_ms=0)
+    database_manager.get_categories()
+    database_manager.get_user_by_id(1)
+    worker = threading.Thread(target=database_manager.get_all_users)
+    worker.start()
+    worker.join()
+
+    entries = {entry["sql"]: entry for entry in database_manager.get_query_stats().snapshot()}
+    lookups = [entry for sql, entry in entries.items() if sql == "SELECT * FROM Users WHERE user_id = ?"]
+    if not lookups or lookups[0]["calls"] != args.iterations + 1 or lookups[0]["rows"] != args.iterations + 1:
+        failures.append("get_user_by_id calls or rows were not recorded")
+    elif not lookups[0]["call_sites"][0][0].startswith("database_manager.py:"):
+        failures.append(f"unexpected call site {lookups[0]['call_sites'][0][0]}")
+    if not any("FROM Categories" in sql and entry["rows"] == 20 for sql, entry in entries.items()):
+        failures.append("the categories query rows were not recorded")
+    if not any(sql.endswith("is_owner FROM Users") for sql in entries):
+        failures.append("a statement from a worker thread was not recorded")
+
+    report = database_manager.get_query_stats_report(5)
+    print(report)
+    log_path = database_manager.get_query_stats().log_path
+    database_manager.disable_query_stats()
+    if type(database_manager.get_db_connection()) is not sqlite3.Connection:
+        failures.append("connections are still instrumented after disabling statistics")
+
+    log_text = open(log_path).read() if os.path.exists(log_path) else ""
+    if "SLOW" not in log_text or "plan: SEARCH Users USING INTEGER PRIMARY KEY" not in log_text:
+        failures.append("the slow-query log has no entry with a query plan")
+
+    print()
+    print_result("get_user_by_id, statistics off", disabled)
+    print_result("get_user_by_id, statistics on", enabled)
+    database_manager.close_db_connections()
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nquery statistics OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Daily sales summary check: places orders through checkout(), verifies that
+the incrementally maintained summaries equal a full rebuild and a direct
+aggregation over Orders/OrderItems, then times a month report read from the
+summaries against the same report computed from the raw order lines.
+
+Exits non-zero if the summaries disagree.
+
+Usage:
+    python benchmarks/check_sales_summary.py [--orders N] [--history-lines N]
+"""
+import argparse
+import random
+import sys
+
+from bench_utils import create_benchmark_database, print_result, time_calls
+
+from db import database_manager
+from db import order_engine
+from db import sales_summary
+
+PRODUCT_COUNT = 200
+
+RAW_REPORT_SQL = """
+    SELECT oi.product_id, SUM(oi.quantity), ROUND(SUM(oi.subtotal), 2)
+    FROM Orders o
+    JOIN OrderItems oi ON oi.order_id = o.order_id
+    WHERE o.status = 'Paid' AND date(o.payment_time) BETWEEN ? AND ?
+    GROUP BY oi.product_id
+    ORDER BY oi.product_id
+"""
+
+def seed_database() -> None:
+    database_manager.configure_database(create_benchmark_database())
+    with database_manager.db_connection() as conn:
+        conn.execute("INSERT INTO Users (username, password_hash, role) VALUES ('cashier', 'x', 'Cashier')")
+        conn.executemany("INSERT INTO Categories (name) VALUES (?)", [(f"Category {i}",) for i in range(5)])
+        conn.executemany("INSERT INTO SalesLocations (location_name, capacity) VALUES (?, 1)",
+                         [(f"Checkout {i}",) for i in range(3)])
+        conn.executemany(
+            "INSERT INTO Products (name, price, category_id, current_stock) VALUES (?, ?, ?, ?)",
+            [(f"Product {i}", round(1.0 + i * 0.37, 2), 1 + i % 5, 10 ** 8) for i in range(PRODUCT_COUNT)]
+        )
+
+def add_history(lines: int) -> None:
+    """Bulk-inserts paid orders spread over a year, bypassing checkout, then rebuilds."""
+    rng = random.Random(7)
+    with database_manager.db_connection(immediate=True) as conn:
+        for order in range(lines // 4):
+            day = f"2024-{1 + order % 12:02d}-{1 + order % 28:02d} 12:00:00"
+            items = [(rng.randint(1, PRODUCT_COUNT), rng.randint(1, 3)) for _ in range(4)]
+            total = round(sum(quantity * 2.5 for _, quantity in items), 2)
+            order_id = conn.execute("""
+                INSERT INTO Orders (location_id, user_id_creator, order_time, status, total_amount, payment_time, payment_method)
+                VALUES (?, 1, ?, 'Paid', ?, ?, ?)
+            """, (1 + order % 3, day, total, day, "Cash" if order % 2 else "Card")).lastrowid
+            conn.executemany(
+                "INSERT INTO OrderItems (order_id, product_id, quantity, price_at_order, subtotal) VALUES (?, ?, ?, 2.5, ?)",
+                [(order_id, product_id, quantity, quantity * 2.5) for product_id, quantity in items]
+            )
+    database_manager.rebuild_sales_summary()
+
+def snapshot(conn) -> list:
+    return [tuple(row) for row in conn.execute(
+        "SELECT sale_date, product_id, category_id, payment_method, location_id, line_count, units, ROUND(revenue, 2) "
+        "FROM DailySales ORDER BY 1, 2, 3, 4, 5"
+    )] + [tuple(row) for row in conn.execute(
+        "SELECT sale_date, payment_method, location_id, order_count, ROUND(revenue, 2) FROM DailyOrderTotals ORDER BY 1, 2, 3"
+    )]
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark the daily sales summaries")
+    parser.add_argument("--orders", type=int, default=500, help="Orders placed through checkout")
+    parser.add_argument("--history-lines", type=int, default=400000, help="Bulk-loaded historical order lines")
+    args = parser.parse_args()
+
+    seed_database()
+    add_history(args.history_lines)
+
+    rng = random.Random(42)
+    for _ in range(args.orders):
+        cart = [(rng.randint(1, PRODUCT_COUNT), rng.randint(1, 5)) for _ in range(rng.randint(1, 8))]
+        result = order_engine.checkout(cart, location_id=rng.randint(1, 3), user_id=1,
+                                       payment_method=rng.choice(order_engine.PAYMENT_METHODS))
+        assert result["success"], result
+
+    conn = database_manager.get_db_connection()
+    incremental = snapshot(conn)
+    database_manager.rebuild_sales_summary()
+    rebuilt = snapshot(conn)
+    ok = incremental == rebuilt
+    print("incremental summaries match a full rebuild" if ok else "FAILED: incremental summaries differ from rebuild")
+
+    start_date, end_date = "2024-03-01", "2024-03-31"
+    from_summary = [(row[0], row[1], row[2]) for row in conn.execute("""
+        SELECT product_id, SUM(units), ROUND(SUM(revenue), 2) FROM DailySales
+        WHERE sale_date BETWEEN ? AND ? GROUP BY product_id ORDER BY product_id
+    """, (start_date, end_date))]
+    from_raw = [tuple(row) for row in conn.execute(RAW_REPORT_SQL, (start_date, end_date))]
+    if from_summary != from_raw:
+        print("FAILED: summary report differs from raw aggregation")
+        ok = False
+
+    print_result("month by product, raw order lines",
+                 time_calls(lambda: conn.execute(RAW_REPORT_SQL, (start_date, end_date)).fetchall(), 5))
+    print_result("month by product, DailySales",
+                 time_calls(lambda: database_manager.get_sales_summary(start_date, end_date, ["product"]), 50))
+    print_result("year by day, DailyOrderTotals",
+                 time_calls(lambda: database_manager.get_order_summary("2024-01-01", "2024-12-31", ["day"]), 50))
+
+    database_manager.close_db_connections()
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
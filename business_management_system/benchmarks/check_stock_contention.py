@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Multiprocess stress test of concurrent stock updates.
+
+Several processes, each with its own connections as separate terminals
+would have, sell and restock the same few products at once through
+order_engine.checkout() and database_manager.adjust_stock(). Stock is kept
+low so sales regularly run out. Afterwards checks that no update was lost:
+each product's stock equals its initial stock plus every change in the
+InventoryLog, each log row's new_stock_level follows from the one before,
+the Sale rows match the OrderItems, stock never went negative and no
+process saw a "database is locked" error. Prints the write lock counters
+of every process. Exits non-zero on failure.
+
+Usage:
+    python benchmarks/check_stock_contention.py [--processes N] [--operations N] [--products N]
+"""
+import argparse
+import multiprocessing
+import random
+import sqlite3
+import sys
+import time
+
+from bench_utils import create_benchmark_database
+
+from db import database_manager
+from db import order_engine
+
+INITIAL_STOCK = 50
+
+def seed_database(products: int, processes: int) -> str:
+    db_path = create_benchmark_database()
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("BEGIN")
+    conn.executemany("INSERT INTO Users (username, password_hash, role) VALUES (?, 'x', 'Cashier')",
+                     [(f"cashier{i}",) for i in range(processes)])
+    conn.execute("INSERT INTO Categories (name) VALUES ('Contention')")
+    conn.executemany("INSERT INTO SalesLocations (location_name, capacity) VALUES (?, 1)",
+                     [(f"Checkout {i + 1}",) for i in range(processes)])
+    conn.executemany(
+        "INSERT INTO Products (name, price, category_id, current_stock) VALUES (?, 2.5, 1, ?)",
+        [(f"Hot product {i}", INITIAL_STOCK) for i in range(products)]
+    )
+    conn.execute("""
+        INSERT INTO InventoryLog (product_id, change_quantity, new_stock_level, reason)
+        SELECT product_id, current_stock, current_stock, 'Initial Stock' FROM Products
+    """)
+    conn.execute("COMMIT")
+    conn.close()
+    return db_path
+
+def run_terminal(db_path: str, terminal: int, operations: int, products: int, start_at: float) -> dict:
+    """Sells and restocks in one process; returns its counters."""
+    database_manager.configure_database(db_path)
+    rng = random.Random(terminal)
+    counts = {"sales": 0, "rejected": 0, "restocks": 0, "removals": 0, "refused": 0, "errors": []}
+    time.sleep(max(0.0, start_at - time.time()))
+    for _ in range(operations):
+        if rng.random() < 0.8:
+            cart = [(rng.randint(1, products), rng.randint(1, 3)) for _ in range(rng.randint(1, 3))]
+            result = order_engine.checkout(cart, location_id=terminal + 1, user_id=terminal + 1)
+            if result["success"]:
+                counts["sales"] += 1
+            elif "stock" in result["error"].lower():
+                counts["rejected"] += 1
+            else:
+                counts["errors"].append(result["error"])
+        elif rng.random() < 0.7:
+            database_manager.adjust_stock(rng.randint(1, products), rng.randint(5, 15), "Manual Stock Entry",
+                                          terminal + 1)
+            counts["restocks"] += 1
+        else:
+            if database_manager.adjust_stock(rng.randint(1, products), -rng.randint(1, 4), "Spoilage", terminal + 1):
+                counts["removals"] += 1
+            else:
+                counts["refused"] += 1
+    database_manager.flush_audit_log()
+    counts["write_stats"] = database_manager.get_write_stats()
+    database_manager.close_db_connections()
+    return counts
+
+def check_database(db_path: str) -> list:
+    conn = sqlite3.connect(db_path)
+    failures = []
+    for product_id, stock, logged in conn.execute("""
+        SELECT p.product_id, p.current_stock, SUM(l.change_quantity)
+        FROM Products p JOIN InventoryLog l ON l.product_id = p.product_id
+        GROUP BY p.product_id
+    """):
+        if stock != logged:
+            failures.append(f"product {product_id}: stock {stock}, InventoryLog total {logged}")
+        if stock < 0:
+            failures.append(f"product {product_id}: negative stock {stock}")
+
+    running = {}
+    for log_id, product_id, change, level in conn.execute(
+            "SELECT log_id, product_id, change_quantity, new_stock_level FROM InventoryLog ORDER BY log_id"):
+        expected = running.get(product_id, 0) + change
+        if level != expected:
+            failures.append(f"InventoryLog {log_id}: new_stock_level {level}, expected {expected}")
+        running[product_id] = level
+
+    sold_items = conn.execute("SELECT COALESCE(SUM(quantity), 0) FROM OrderItems").fetchone()[0]
+    sold_log = conn.execute("SELECT COALESCE(-SUM(change_quantity), 0) FROM InventoryLog WHERE reason = 'Sale'").fetchone()[0]
+    if sold_items != sold_log:
+        failures.append(f"OrderItems hold {sold_items} units sold, InventoryLog {sold_log}")
+    conn.close()
+    return failures[:20]
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress test concurrent stock updates across processes")
+    parser.add_argument("--processes", type=int, default=8, help="Concurrent terminal processes")
+    parser.add_argument("--operations", type=int, default=300, help="Sales and adjustments per process")
+    parser.add_argument("--products", type=int, default=5, help="Products all terminals compete for")
+    args = parser.parse_args()
+
+    db_path = seed_database(args.products, args.processes)
+    start_at = time.time() + 1.0
+    started = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+        results = pool.starmap(run_terminal, [(db_path, terminal, args.operations, args.products, start_at)
+                                              for terminal in range(args.processes)])
+    elapsed = time.perf_counter() - started
+
+    print(f"{'terminal':>8} {'sales':>6} {'rejected':>8} {'restocks':>8} {'removals':>8} "
+          f"{'writes':>7} {'contended':>9} {'retries':>7} {'avg wait ms':>11} {'max wait ms':>11}")
+    failures = []
+    for terminal, counts in enumerate(results):
+        stats = counts["write_stats"]
+        print(f"{terminal:>8} {counts['sales']:>6} {counts['rejected']:>8} {counts['restocks']:>8} "
+              f"{counts['removals']:>8} {stats['write_transactions']:>7} {stats['contended']:>9} "
+              f"{stats['busy_retries']:>7} {stats['average_lock_wait_ms']:>11.2f} {stats['max_lock_wait_ms']:>11.2f}")
+        failures += [f"terminal {terminal}: {error}" for error in counts["errors"][:5]]
+        if stats["busy_failures"]:
+            failures.append(f"terminal {terminal}: {stats['busy_failures']} writes gave up on a locked database")
+    print(f"{sum(counts['sales'] for counts in results)} sales in {elapsed:.1f} s")
+
+    failures += check_database(db_path)
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nno lost stock updates")
+
+if __name__ == "__main__":
+    main()
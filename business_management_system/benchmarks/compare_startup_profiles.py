@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Compares two startup reports written by main.py --profile-startup.
+
+Prints the startup spans side by side and the modules whose cumulative
+import time changed the most, and exits non-zero if the first frame (or
+any top-level span) got slower than the allowed regression.
+
+Usage:
+    python benchmarks/compare_startup_profiles.py OLD.json NEW.json [--threshold PCT] [--min-ms MS] [--top N]
+"""
+import argparse
+import json
+import sys
+
+def load(path: str) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+def top_level_spans(report: dict) -> dict:
+    return {span["name"]: span["duration_ms"] for span in report["spans"] if len(span["path"]) == 1}
+
+def first_frame_ms(report: dict):
+    for mark in report.get("marks", []):
+        if mark["name"] == "first frame mapped":
+            return mark["at_ms"]
+    return None
+
+def import_times(report: dict) -> dict:
+    return {record["module"]: record["cumulative_us"] / 1000 for record in report.get("imports", [])}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two startup profiles")
+    parser.add_argument("old", help="Baseline report")
+    parser.add_argument("new", help="Report to check")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Allowed slowdown in percent")
+    parser.add_argument("--min-ms", type=float, default=20.0, help="Ignore slowdowns smaller than this")
+    parser.add_argument("--top", type=int, default=15, help="Import changes to list")
+    args = parser.parse_args()
+
+    old, new = load(args.old), load(args.new)
+    rows = []
+    old_spans, new_spans = top_level_spans(old), top_level_spans(new)
+    for name in list(old_spans) + [name for name in new_spans if name not in old_spans]:
+        rows.append((name, old_spans.get(name), new_spans.get(name)))
+    rows.append(("first frame mapped", first_frame_ms(old), first_frame_ms(new)))
+
+    regressions = []
+    print(f"{'phase':<28} {'old ms':>9} {'new ms':>9} {'change':>8}")
+    for name, before, after in rows:
+        if before is None or after is None:
+            print(f"{name:<28} {before if before is not None else '-':>9} {after if after is not None else '-':>9}")
+            continue
+        change = (after - before) * 100 / before if before else 0.0
+        print(f"{name:<28} {before:>9.1f} {after:>9.1f} {change:>+7.0f}%")
+        if after - before >= args.min_ms and change > args.threshold:
+            regressions.append(name)
+
+    old_imports, new_imports = import_times(old), import_times(new)
+    if old_imports or new_imports:
+        deltas = sorted(((new_imports.get(module, 0.0) - old_imports.get(module, 0.0), module)
+                         for module in set(old_imports) | set(new_imports)),
+                        key=lambda item: -abs(item[0]))
+        print(f"\n{'module (cumulative import)':<40} {'old ms':>9} {'new ms':>9}")
+        for delta, module in deltas[:args.top]:
+            print(f"{module:<40} {old_imports.get(module, 0.0):>9.1f} {new_imports.get(module, 0.0):>9.1f}")
+
+    if regressions:
+        print(f"\nFAILED: slower startup in {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nno startup regression")
+
+if __name__ == "__main__":
+    main()
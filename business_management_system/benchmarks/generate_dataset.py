@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Builds a synthetic business database at a chosen scale.
+
+The data is a pure function of the seed and the sizes: the same arguments
+always give the same categories, products, users, orders, order lines and
+audit log rows. Only the bcrypt password hashes (random salt) and the
+hardware ID in SystemConfig (taken from this machine, so the license check
+passes here) differ between runs. Rows are bulk loaded with executemany in
+batches with journaling off, then the daily sales summaries are rebuilt.
+
+Every user's password is DATASET_PASSWORD; the owner is "owner", the staff
+accounts are user00001, user00002, ...
+
+Usage:
+    python benchmarks/generate_dataset.py OUTPUT.db [--scale small|medium|large|huge]
+        [--products N] [--orders N] [--lines N] [--audit-rows N] [--users N]
+        [--years N] [--seed N] [--force]
+"""
+import argparse
+import datetime
+import os
+import random
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterator, List, Tuple
+
+import bench_utils  # noqa: F401  (puts src on the path)
+
+from db import database_manager
+from db import sales_summary
+from db.migrations import run_migrations
+from db.order_engine import PAYMENT_METHODS
+
+DATASET_PASSWORD = "bench123"
+DATASET_END = datetime.datetime(2025, 12, 31, 21, 0, 0)
+BATCH_ROWS = 50000
+
+# products, orders, order lines, audit rows, users
+SCALES = {
+    "small": (1000, 100000, 500000, 200000, 20),
+    "medium": (5000, 1000000, 5000000, 2000000, 50),
+    "large": (10000, 10000000, 50000000, 20000000, 100),
+    "huge": (20000, 25000000, 125000000, 50000000, 200),
+}
+
+CATEGORY_NAMES = ["Electronics", "Groceries", "Clothing", "Office Supplies", "Beverages", "Household",
+                  "Toys", "Garden", "Books", "Health", "Sports", "Automotive"]
+LOCATION_NAMES = ["Checkout 1", "Checkout 2", "Checkout 3", "Checkout 4", "Online Store"]
+STAFF_ROLES = ["Cashier", "Cashier", "Cashier", "Manager", "Accounting"]
+AUDIT_ACTIONS = ["USER_LOGIN", "USER_LOGOUT", "ORDER_PAID", "LOGIN_FAILED", "USER_UPDATED", "BUSINESS_INFO_UPDATED"]
+
+# Order status mix: (status, cumulative probability)
+ORDER_STATUSES = [("Paid", 0.95), ("Cancelled", 0.98), ("Completed", 1.0)]
+
+def _timestamp(start: datetime.datetime, seconds: float) -> str:
+    return (start + datetime.timedelta(seconds=int(seconds))).isoformat(sep=" ")
+
+def _batches(rows: Iterator[tuple], size: int = BATCH_ROWS) -> Iterator[List[tuple]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _load(conn: sqlite3.Connection, sql: str, rows: Iterator[tuple], label: str) -> int:
+    """Inserts rows with executemany, one transaction per batch."""
+    count = 0
+    started = time.perf_counter()
+    for batch in _batches(rows):
+        conn.execute("BEGIN")
+        conn.executemany(sql, batch)
+        conn.execute("COMMIT")
+        count += len(batch)
+    print(f"  {label:<12} {count:>12,} rows  {time.perf_counter() - started:8.1f} s")
+    return count
+
+def _product_rows(rng: random.Random, count: int) -> Iterator[tuple]:
+    for index in range(count):
+        category = CATEGORY_NAMES[index % len(CATEGORY_NAMES)]
+        price = round(rng.uniform(0.5, 400.0) if index % 10 else rng.uniform(400.0, 2000.0), 2)
+        cost = round(price * rng.uniform(0.4, 0.8), 2)
+        yield (f"{category} item {index + 1:06d}", f"Synthetic product {index + 1}", price, cost,
+               1 + index % len(CATEGORY_NAMES), rng.randint(0, 1000), 0 if rng.random() < 0.02 else 1)
+
+def _order_rows(rng: random.Random, order_count: int, line_count: int, products: List[Tuple[float, float]],
+                staff_ids: List[int], start: datetime.datetime, span_seconds: float,
+                lines_out: List[tuple]) -> Iterator[tuple]:
+    """
+    Yields order rows in order_time order and appends their lines to lines_out.
+
+    Line counts vary per order but always add up to line_count; product
+    popularity is skewed so a few products sell most.
+    """
+    step = span_seconds / order_count
+    remaining_lines = line_count
+    product_count = len(products)
+    for index in range(order_count):
+        order_id = index + 1
+        remaining_orders = order_count - index
+        average = remaining_lines / remaining_orders
+        if remaining_orders == 1:
+            lines = remaining_lines
+        else:
+            lines = max(1, min(remaining_lines - (remaining_orders - 1), round(rng.triangular(1, 2 * average - 1))))
+        remaining_lines -= lines
+
+        total = 0.0
+        for _ in range(lines):
+            product_id = 1 + int(product_count * rng.random() ** 2)
+            price, cost = products[product_id - 1]
+            quantity = 1 if rng.random() < 0.7 else rng.randint(2, 6)
+            subtotal = round(price * quantity, 2)
+            total += subtotal
+            lines_out.append((order_id, product_id, quantity, price, subtotal, cost))
+
+        order_time = _timestamp(start, (index + rng.random()) * step)
+        draw = rng.random()
+        status = next(name for name, cumulative in ORDER_STATUSES if draw < cumulative)
+        paid = status == "Paid"
+        yield (order_id, 1 + index % len(LOCATION_NAMES), rng.choice(staff_ids), rng.choice(staff_ids),
+               order_time, status, round(total, 2), order_time if paid else None,
+               rng.choice(PAYMENT_METHODS) if paid else None)
+
+def _audit_rows(rng: random.Random, count: int, user_ids: List[int], usernames: Dict[int, str],
+                start: datetime.datetime, span_seconds: float) -> Iterator[tuple]:
+    step = span_seconds / max(count, 1)
+    for index in range(count):
+        user_id = rng.choice(user_ids)
+        action = AUDIT_ACTIONS[min(int(rng.expovariate(1.2)), len(AUDIT_ACTIONS) - 1)]
+        details = f"User {usernames[user_id]} {action.lower().replace('_', ' ')} #{index + 1}"
+        yield (None if action == "LOGIN_FAILED" else user_id, action, details,
+               _timestamp(start, (index + rng.random()) * step))
+
+def generate_dataset(path: str, products: int, orders: int, lines: int, audit_rows: int,
+                     users: int = 20, years: int = 5, seed: int = 1) -> Dict[str, int]:
+    """
+    Creates a new database at path and fills it with synthetic data.
+
+    Args:
+        path: Database file to create (must not exist)
+        products: Number of products
+        orders: Number of orders, spread evenly over the period
+        lines: Number of order lines (at least one per order)
+        audit_rows: Number of audit log rows
+        users: Number of staff accounts besides the owner
+        years: Length of the trading period ending at DATASET_END
+        seed: Seed of the random generator
+
+    Returns:
+        Row counts per table
+    """
+    if lines < orders:
+        raise ValueError("Every order needs at least one line")
+    rng = random.Random(seed)
+    start = DATASET_END - datetime.timedelta(days=365 * years)
+    span_seconds = (DATASET_END - start).total_seconds()
+    started = time.perf_counter()
+
+    conn = sqlite3.connect(path, isolation_level=None)
+    run_migrations(conn)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")
+    counts = {}
+    try:
+        print(f"Generating {path} (seed {seed})")
+        password_hash = database_manager.hash_password(DATASET_PASSWORD)
+        staff = [("owner", password_hash, "Owner", "Dataset Owner", 1)]
+        staff += [(f"user{index:05d}", password_hash, STAFF_ROLES[index % len(STAFF_ROLES)], f"Staff Member {index}", 0)
+                  for index in range(1, users + 1)]
+        counts["Users"] = _load(conn, "INSERT INTO Users (username, password_hash, role, full_name, is_owner) "
+                                      "VALUES (?, ?, ?, ?, ?)", iter(staff), "users")
+        usernames = {user_id: row[0] for user_id, row in enumerate(staff, start=1)}
+
+        hardware_id = database_manager.get_hardware_id()
+        conn.execute("INSERT INTO SystemConfig (installation_id, license_key, business_name, installation_date, "
+                     "hardware_id, owner_id) VALUES (?, ?, ?, ?, ?, 1)",
+                     (f"dataset-{seed}", database_manager.generate_license_key(hardware_id, {"user_id": 1}),
+                      "Synthetic Trading Co.", start.isoformat(sep=" "), hardware_id))
+
+        counts["Categories"] = _load(conn, "INSERT INTO Categories (name, description) VALUES (?, ?)",
+                                     ((name, f"{name} department") for name in CATEGORY_NAMES), "categories")
+        counts["SalesLocations"] = _load(conn, "INSERT INTO SalesLocations (location_name, capacity) VALUES (?, ?)",
+                                         ((name, 999 if name == "Online Store" else 1) for name in LOCATION_NAMES),
+                                         "locations")
+
+        product_rows = list(_product_rows(rng, products))
+        counts["Products"] = _load(conn, "INSERT INTO Products (name, description, price, cost_price, category_id, "
+                                         "current_stock, is_available) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                   iter(product_rows), "products")
+        prices = [(row[2], row[3]) for row in product_rows]
+        del product_rows
+
+        # Orders and their lines are generated together; lines are flushed after each order batch
+        staff_ids = list(range(2, users + 2)) or [1]
+        order_sql = ("INSERT INTO Orders (order_id, location_id, user_id_creator, user_id_processor, order_time, "
+                     "status, total_amount, payment_time, payment_method) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+        line_sql = ("INSERT INTO OrderItems (order_id, product_id, quantity, price_at_order, subtotal, cost_at_order) "
+                    "VALUES (?, ?, ?, ?, ?, ?)")
+        pending_lines: List[tuple] = []
+        counts["Orders"] = counts["OrderItems"] = 0
+        load_started = time.perf_counter()
+        for batch in _batches(_order_rows(rng, orders, lines, prices, staff_ids, start, span_seconds, pending_lines)):
+            conn.execute("BEGIN")
+            conn.executemany(order_sql, batch)
+            conn.executemany(line_sql, pending_lines)
+            conn.execute("COMMIT")
+            counts["Orders"] += len(batch)
+            counts["OrderItems"] += len(pending_lines)
+            pending_lines.clear()
+        print(f"  {'orders':<12} {counts['Orders']:>12,} rows  {time.perf_counter() - load_started:8.1f} s "
+              f"({counts['OrderItems']:,} lines)")
+        assert counts["OrderItems"] == lines, f"generated {counts['OrderItems']} order lines, expected {lines}"
+
+        counts["AuditLog"] = _load(conn, "INSERT INTO AuditLog (user_id, action_type, action_details, timestamp) "
+                                         "VALUES (?, ?, ?, ?)",
+                                   _audit_rows(rng, audit_rows, list(usernames), usernames, start, span_seconds),
+                                   "audit log")
+
+        summary_started = time.perf_counter()
+        conn.execute("BEGIN")
+        sales_summary.rebuild_sales_summaries(conn)
+        conn.execute("COMMIT")
+        print(f"  {'summaries':<12} {'':>12}       {time.perf_counter() - summary_started:8.1f} s")
+
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA journal_mode = WAL")
+    finally:
+        conn.close()
+    print(f"Done in {time.perf_counter() - started:.1f} s, {os.path.getsize(path) / 2 ** 20:,.0f} MiB")
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic business database")
+    parser.add_argument("output", help="Database file to create")
+    parser.add_argument("--scale", choices=list(SCALES), default="small", help="Preset sizes")
+    parser.add_argument("--products", type=int, help="Products (overrides the preset)")
+    parser.add_argument("--orders", type=int, help="Orders (overrides the preset)")
+    parser.add_argument("--lines", type=int, help="Order lines (overrides the preset)")
+    parser.add_argument("--audit-rows", type=int, help="Audit log rows (overrides the preset)")
+    parser.add_argument("--users", type=int, help="Staff accounts (overrides the preset)")
+    parser.add_argument("--years", type=int, default=5, help="Length of the trading period")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    parser.add_argument("--force", action="store_true", help="Replace an existing output file")
+    args = parser.parse_args()
+
+    products, orders, lines, audit_rows, users = SCALES[args.scale]
+    if args.orders is not None:
+        # Keep the preset's lines per order
+        lines = args.orders * lines // orders
+        orders = args.orders
+    if args.lines is not None:
+        lines = args.lines
+
+    if os.path.exists(args.output):
+        if not args.force:
+            print(f"{args.output} already exists (use --force to replace it)")
+            sys.exit(1)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.output + suffix):
+                os.remove(args.output + suffix)
+
+    try:
+        counts = generate_dataset(
+            args.output,
+            products=args.products if args.products is not None else products,
+            orders=orders,
+            lines=lines,
+            audit_rows=args.audit_rows if args.audit_rows is not None else audit_rows,
+            users=args.users if args.users is not None else users,
+            years=args.years,
+            seed=args.seed,
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    for table, count in counts.items():
+        print(f"{table:<16} {count:>12,}")
+
+if __name__ == "__main__":
+    main()
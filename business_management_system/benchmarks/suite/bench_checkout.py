@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""Checkout of one- and five-line carts, cycling through products that have stock."""
+import itertools
+
+import pytest
+
+from db import database_manager
+from db.order_engine import checkout
+
+@pytest.fixture(scope="module")
+def stocked_products(dataset):
+    with database_manager.db_connection() as conn:
+        rows = conn.execute(
+            "SELECT product_id FROM Products WHERE is_available = 1 AND current_stock >= 500 ORDER BY product_id"
+        ).fetchall()
+    return [row["product_id"] for row in rows]
+
+@pytest.mark.parametrize("lines", [1, 5])
+def bench_checkout(benchmark, dataset, stocked_products, lines):
+    products = itertools.cycle(stocked_products)
+
+    def run():
+        cart = [(next(products), 1) for _ in range(lines)]
+        return checkout(cart, 1, 2, "Card")
+
+    result = benchmark(run)
+    assert result["success"], result.get("error")
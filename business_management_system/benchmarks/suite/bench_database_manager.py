@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Read paths of database_manager that the dashboards call."""
+import pytest
+
+from db import database_manager
+
+def bench_get_all_users(benchmark, dataset):
+    users = benchmark(database_manager.get_all_users)
+    assert users
+
+def bench_get_user_by_id(benchmark, dataset):
+    assert benchmark(database_manager.get_user_by_id, dataset["owner_id"]) is not None
+
+def bench_get_products(benchmark, dataset):
+    assert benchmark(database_manager.get_products)
+
+def bench_get_categories(benchmark, dataset):
+    assert benchmark(database_manager.get_categories)
+
+def bench_get_sales_locations(benchmark, dataset):
+    assert benchmark(database_manager.get_sales_locations)
+
+def bench_get_business_info(benchmark, dataset):
+    assert benchmark(database_manager.get_business_info) is not None
+
+def bench_is_system_initialized(benchmark, dataset):
+    assert benchmark(database_manager.is_system_initialized)
+
+def bench_verify_license_cached(benchmark, dataset):
+    database_manager.verify_license(force=True)
+    assert benchmark(database_manager.verify_license)
+
+def bench_log_action(benchmark, dataset):
+    benchmark(database_manager.log_action, dataset["owner_id"], "BENCHMARK", "Benchmark audit record")
+    assert database_manager.flush_audit_log()
+
+@pytest.mark.parametrize("grouping", ["day", "month", "category", "product", "location"])
+def bench_get_sales_summary(benchmark, last_year_range, grouping):
+    assert benchmark(database_manager.get_sales_summary, *last_year_range, [grouping])
+
+@pytest.mark.parametrize("grouping", ["day", "month", "payment_method"])
+def bench_get_order_summary(benchmark, last_year_range, grouping):
+    assert benchmark(database_manager.get_order_summary, *last_year_range, [grouping])
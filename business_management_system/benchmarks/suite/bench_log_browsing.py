@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""Audit log browsing: keyset pages at the top and deep into the history."""
+from db import database_manager
+from db.log_archive import get_audit_log_history_page
+
+def _key(log):
+    return log["timestamp"], log["log_id"]
+
+def bench_first_page(benchmark, dataset):
+    assert benchmark(database_manager.get_audit_log_page)
+
+def bench_deep_page(benchmark, dataset):
+    with database_manager.db_connection() as conn:
+        middle = conn.execute(
+            "SELECT timestamp, log_id FROM AuditLog ORDER BY log_id LIMIT 1 OFFSET (SELECT COUNT(*) / 2 FROM AuditLog)"
+        ).fetchone()
+    assert benchmark(database_manager.get_audit_log_page, tuple(middle))
+
+def bench_history_first_page(benchmark, dataset):
+    assert benchmark(get_audit_log_history_page)
+
+def bench_scroll_ten_pages(benchmark, dataset):
+    def scroll():
+        before = None
+        for _ in range(10):
+            page = get_audit_log_history_page(before)
+            before = _key(page[-1])
+        return before
+
+    assert benchmark(scroll)
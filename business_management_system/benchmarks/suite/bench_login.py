@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""Login: license check, user lookup and bcrypt verification at the configured work factor."""
+from db import database_manager
+
+import generate_dataset
+
+def bench_login_success(benchmark, dataset):
+    result = benchmark(database_manager.verify_user, "owner", generate_dataset.DATASET_PASSWORD)
+    assert result[0]
+
+def bench_login_wrong_password(benchmark, dataset):
+    result = benchmark(database_manager.verify_user, "owner", "wrong password")
+    assert not result[0]
+
+def bench_login_unknown_user(benchmark, dataset):
+    result = benchmark(database_manager.verify_user, "nobody", generate_dataset.DATASET_PASSWORD)
+    assert not result[0]
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""Sales analysis over the order lines, vectorized and row by row."""
+import datetime
+
+import pytest
+
+from db import database_manager
+from db import reporting_engine
+
+def _exclusive_end(day: str) -> str:
+    return (datetime.date.fromisoformat(day) + datetime.timedelta(days=1)).isoformat()
+
+@pytest.mark.parametrize("bucket,group_by", [
+    ("month", []),
+    ("day", ["category"]),
+    ("week", ["category", "location"]),
+], ids=["month", "day-category", "week-category-location"])
+@pytest.mark.parametrize("use_numpy", [True, False], ids=["numpy", "python"])
+def bench_build_report(benchmark, last_year_range, bucket, group_by, use_numpy):
+    if use_numpy and not reporting_engine.NUMPY_AVAILABLE:
+        pytest.skip("NumPy is not installed")
+    conn = database_manager.get_db_connection()
+    start, end = last_year_range[0], _exclusive_end(last_year_range[1])
+    rows = benchmark.pedantic(reporting_engine.build_report, args=(conn, start, end, bucket, group_by),
+                              kwargs={"use_numpy": use_numpy}, rounds=3, warmup_rounds=1)
+    assert rows
+
+def bench_get_sales_analysis(benchmark, recent_range):
+    start, end = recent_range[0], _exclusive_end(recent_range[1])
+    assert benchmark(database_manager.get_sales_analysis, start, end, "day", ["category"])
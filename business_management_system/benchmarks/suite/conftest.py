@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Fixtures for the pytest-benchmark suite.
+
+The suite runs against a synthetic database from generate_dataset.py. The
+dataset for a scale and seed is generated once and cached in
+DATASET_CACHE_DIR; each session works on a copy because checkout and audit
+benchmarks write to it. Results are saved as JSON under results/ (one file
+per run, see --benchmark-autosave) and can be compared between versions with
+pytest-benchmark's --benchmark-compare or `pytest-benchmark compare`.
+
+Usage (from business_management_system):
+    python -m pytest benchmarks/suite [--bms-scale smoke|small|medium|large|huge] [--bms-seed N]
+        [--bms-dataset PATH] [--bms-in-place] [--benchmark-compare]
+"""
+import datetime
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+import pytest
+
+SUITE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(SUITE_DIR))
+
+import generate_dataset  # noqa: E402
+
+from db import database_manager  # noqa: E402
+
+RESULTS_DIR = os.path.join(SUITE_DIR, "results")
+DATASET_CACHE_DIR = os.path.join(tempfile.gettempdir(), "bms_datasets")
+
+# A scale small enough to generate in a few seconds, for checking the suite itself
+SUITE_SCALES = dict(generate_dataset.SCALES, smoke=(500, 20000, 100000, 50000, 10))
+
+def pytest_addoption(parser):
+    group = parser.getgroup("bms", "business management system benchmarks")
+    group.addoption("--bms-scale", choices=list(SUITE_SCALES), default="smoke",
+                    help="Dataset preset from generate_dataset.py")
+    group.addoption("--bms-seed", type=int, default=1, help="Dataset seed")
+    group.addoption("--bms-dataset", default=None, help="Use an existing dataset instead of generating one")
+    group.addoption("--bms-in-place", action="store_true",
+                    help="Do not copy the dataset (checkout and audit benchmarks then modify it)")
+
+def pytest_configure(config):
+    # Runs before pytest-benchmark reads its storage option
+    if config.getoption("benchmark_storage", None) == "file://./.benchmarks":
+        config.option.benchmark_storage = "file://" + RESULTS_DIR
+
+def pytest_benchmark_update_json(config, benchmarks, output_json):
+    output_json["dataset"] = {
+        "scale": config.getoption("bms_scale"),
+        "seed": config.getoption("bms_seed"),
+        "path": config.getoption("bms_dataset"),
+    }
+
+def _cached_dataset(scale: str, seed: int) -> str:
+    path = os.path.join(DATASET_CACHE_DIR, f"{scale}-seed{seed}.db")
+    if not os.path.exists(path):
+        os.makedirs(DATASET_CACHE_DIR, exist_ok=True)
+        products, orders, lines, audit_rows, users = SUITE_SCALES[scale]
+        partial = path + ".partial"
+        if os.path.exists(partial):
+            os.remove(partial)
+        generate_dataset.generate_dataset(partial, products, orders, lines, audit_rows, users, seed=seed)
+        os.replace(partial, path)
+    return path
+
+@pytest.fixture(scope="session")
+def dataset(request, tmp_path_factory):
+    """
+    Configures database_manager on the benchmark dataset.
+
+    Returns:
+        Dictionary with path, the dataset's first and last day and the owner's user_id
+    """
+    source = request.config.getoption("bms_dataset") or _cached_dataset(
+        request.config.getoption("bms_scale"), request.config.getoption("bms_seed"))
+    path = source
+    if not request.config.getoption("bms_in_place"):
+        path = str(tmp_path_factory.mktemp("dataset") / os.path.basename(source))
+        with sqlite3.connect(source) as src, sqlite3.connect(path) as dst:
+            src.backup(dst)
+
+    database_manager.configure_database(path)
+    with database_manager.db_connection() as conn:
+        first, last = conn.execute("SELECT MIN(date(order_time)), MAX(date(order_time)) FROM Orders").fetchone()
+    yield {
+        "path": path,
+        "first_day": first,
+        "last_day": last,
+        "owner_id": 1,
+    }
+    database_manager.close_db_connections()
+    if path != source:
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+@pytest.fixture(scope="session")
+def recent_range(dataset):
+    """The last 90 days of the dataset as (start, end) dates, end inclusive."""
+    last = datetime.date.fromisoformat(dataset["last_day"])
+    return (last - datetime.timedelta(days=89)).isoformat(), last.isoformat()
+
+@pytest.fixture(scope="session")
+def last_year_range(dataset):
+    """The last 365 days of the dataset as (start, end) dates, end inclusive."""
+    last = datetime.date.fromisoformat(dataset["last_day"])
+    return (last - datetime.timedelta(days=364)).isoformat(), last.isoformat()
@@ -31,6 +31,14 @@ def check_dependencies():
         print("Bcrypt is not installed. Installing...")
         subprocess.check_call([sys.executable, "-m", "pip", "install", "bcrypt"])
         print("Bcrypt installed successfully.")
+    
+    try:
+        import numpy
+        print("NumPy is installed.")
+    except ImportError:
+        print("NumPy is not installed. Installing...")
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "numpy"])
+        print("NumPy installed successfully.")
 
 def create_spec_file(output_dir, app_name, icon_path=None):
     """Create a PyInstaller spec file."""
@@ -43,7 +51,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=['customtkinter', 'bcrypt'],
+    hiddenimports=['customtkinter', 'bcrypt', 'numpy'],
     hookspath=[],
     hooksconfig={{}},
     runtime_hooks=[],
@@ -57,6 +65,9 @@ a = Analysis(
 # Add all UI files
 ui_files = [
     ('src/ui/login_view.py', 'src/ui'),
+    ('src/ui/async_utils.py', 'src/ui'),
+    ('src/ui/virtual_list.py', 'src/ui'),
+    ('src/ui/lazy_tabs.py', 'src/ui'),
     ('src/ui/owner_dashboard_view.py', 'src/ui'),
     ('src/ui/manager_dashboard_view.py', 'src/ui'),
     ('src/ui/cashier_dashboard_view.py', 'src/ui'),
@@ -69,6 +80,25 @@ for src, dest in ui_files:
 # Add database files
 db_files = [
     ('src/db/database_manager.py', 'src/db'),
+    ('src/db/connection_manager.py', 'src/db'),
+    ('src/db/audit_sink.py', 'src/db'),
+    ('src/db/license_service.py', 'src/db'),
+    ('src/db/hardware_fingerprint.py', 'src/db'),
+    ('src/db/password_service.py', 'src/db'),
+    ('src/db/license_codec.py', 'src/db'),
+    ('src/db/indexes.py', 'src/db'),
+    ('src/db/migrations.py', 'src/db'),
+    ('src/db/order_engine.py', 'src/db'),
+    ('src/db/sales_summary.py', 'src/db'),
+    ('src/db/reporting_engine.py', 'src/db'),
+    ('src/db/catalog_cache.py', 'src/db'),
+    ('src/db/task_executor.py', 'src/db'),
+    ('src/db/query_stats.py', 'src/db'),
+    ('src/db/service_server.py', 'src/db'),
+    ('src/db/service_client.py', 'src/db'),
+    ('src/db/log_archive.py', 'src/db'),
+    ('src/db/log_export.py', 'src/db'),
+    ('src/db/inventory_checkpoints.py', 'src/db'),
     ('src/db/database_schema.sql', 'src/db'),
     ('src/db/__init__.py', 'src/db'),
 ]
@@ -1,44 +1,34 @@
 #!/usr/bin/env python3
+import argparse
 import sqlite3
 import os
 import sys
 
-# Add the parent directory (src) to the Python path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Add the src directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), 'src')))
 
 # Database path
-DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "business_management.db")
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "business_management.db")
 
 def create_database():
-    """Creates the database with all tables according to the schema."""
-    # Check if database already exists
+    """Creates the database, or upgrades an existing one, to the latest schema version."""
+    from db.migrations import run_migrations
+
     if os.path.exists(DB_PATH):
-        print(f"Database already exists at {DB_PATH}. Skipping creation.")
-        return
-    
-    print(f"Creating new database at {DB_PATH}...")
-    
-    # Read the schema SQL file
-    schema_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "db", "database_schema.sql")
-    with open(schema_path, 'r') as f:
-        schema_sql = f.read()
+        print(f"Database already exists at {DB_PATH}. Checking schema version...")
+    else:
+        print(f"Creating new database at {DB_PATH}...")
     
     # Connect to database (will create it if it doesn't exist)
     conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Execute the schema SQL
-        cursor.executescript(schema_sql)
+        conn = sqlite3.connect(DB_PATH, isolation_level=None)
         
-        # Commit the changes
-        conn.commit()
-        print("Database created successfully with all tables.")
+        # Apply the schema and any pending migrations
+        version = run_migrations(conn)
+        print(f"Database is at schema version {version}.")
     except sqlite3.Error as e:
         print(f"Error creating database: {e}")
-        if conn:
-            conn.rollback()
     finally:
         if conn:
             conn.close()
@@ -111,12 +101,57 @@ def add_sample_data():
         if conn:
             conn.close()
 
+def rebuild_summaries(start_date=None, end_date=None):
+    """Regenerates the daily sales summary tables from the orders."""
+    from db.database_manager import configure_database, rebuild_sales_summary, close_db_connections
+
+    configure_database(DB_PATH)
+    ok = rebuild_sales_summary(start_date, end_date)
+    close_db_connections()
+    return ok
+
+def enable_incremental_vacuum():
+    """Converts the database to incremental auto_vacuum with a one-time full VACUUM."""
+    from db.log_archive import enable_incremental_vacuum as convert
+
+    conn = None
+    try:
+        conn = sqlite3.connect(DB_PATH, isolation_level=None)
+        print("Rewriting the database file. Close the application on every computer first; "
+              "a large database can take several minutes...")
+        if convert(conn):
+            print("The database now returns space freed by log archival to the file system.")
+        else:
+            print("The database is already in incremental auto_vacuum mode.")
+        return True
+    except sqlite3.Error as e:
+        print(f"Error converting database: {e}")
+        return False
+    finally:
+        if conn:
+            conn.close()
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or upgrade the Business Management System database")
+    parser.add_argument("--rebuild-sales-summaries", action="store_true",
+                        help="Regenerate the daily sales summary tables and exit")
+    parser.add_argument("--from", dest="start_date", help="First day to rebuild (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end_date", help="Last day to rebuild (YYYY-MM-DD)")
+    parser.add_argument("--enable-incremental-vacuum", action="store_true",
+                        help="Rewrite the database once so archived log space is returned to the disk, and exit")
+    args = parser.parse_args()
+    
     print("Business Management System - Database Setup")
     print("===========================================")
     
     create_database()
     
+    if args.enable_incremental_vacuum:
+        sys.exit(0 if enable_incremental_vacuum() else 1)
+
+    if args.rebuild_sales_summaries:
+        sys.exit(0 if rebuild_summaries(args.start_date, args.end_date) else 1)
+    
     # Ask if user wants to add sample data
     response = input("Do you want to add sample data for testing? (y/n): ")
     if response.lower() == 'y':
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+import atexit
+import datetime
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Writer tuning
+AUDIT_QUEUE_SIZE = 10000       # Maximum pending records before callers block
+AUDIT_BATCH_SIZE = 200         # Records written per transaction at most
+AUDIT_FLUSH_INTERVAL = 0.5     # Seconds a record may wait before being written
+
+AUDIT_INSERT_SQL = """
+    INSERT INTO AuditLog
+    (user_id, action_type, action_details, timestamp)
+    VALUES (?, ?, ?, ?)
+"""
+
+LICENSE_INSERT_SQL = """
+    INSERT INTO LicenseValidation
+    (is_successful, validation_method, error_message, validation_date)
+    VALUES (?, ?, ?, ?)
+"""
+
+_STOP = object()
+
+def _current_timestamp() -> str:
+    """Returns the current UTC time in the format used by CURRENT_TIMESTAMP."""
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+class AuditSink:
+    """
+    Background writer for AuditLog and LicenseValidation rows.
+
+    Records are queued by the caller and written by a single daemon thread,
+    which groups them into executemany() transactions. A batch is written when
+    it reaches AUDIT_BATCH_SIZE records, when the oldest record has waited
+    AUDIT_FLUSH_INTERVAL seconds, on flush() and at shutdown. The timestamp of
+    each record is taken when it is queued, not when it is written.
+    """
+
+    def __init__(self, get_manager: Callable[[], Any], queue_size: int = AUDIT_QUEUE_SIZE,
+                 batch_size: int = AUDIT_BATCH_SIZE, flush_interval: float = AUDIT_FLUSH_INTERVAL):
+        self._get_manager = get_manager
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats = {"records_written": 0, "transactions": 0, "records_dropped": 0}
+        atexit.register(self.close)
+
+    def log_action(self, user_id: Optional[int], action_type: str, action_details: str) -> None:
+        """Queues an AuditLog record."""
+        self._put(("audit", (user_id, action_type, action_details, _current_timestamp())))
+
+    def log_license_validation(self, is_successful: bool, validation_method: str, message: str = "") -> None:
+        """Queues a LicenseValidation record."""
+        self._put(("license", (1 if is_successful else 0, validation_method, message, _current_timestamp())))
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """
+        Writes every queued record before returning.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the queue was flushed, False on timeout
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        """Flushes pending records and stops the writer thread."""
+        with self._start_lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns counters of records written, transactions used and records dropped."""
+        return dict(self._stats, records_pending=self._queue.qsize())
+
+    def _put(self, item: Tuple[str, tuple]) -> None:
+        self._ensure_started()
+        # Blocks when the queue is full, applying back-pressure to the caller
+        self._queue.put(item)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="AuditSinkWriter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        pending: List[Tuple[str, tuple]] = []
+        deadline = None
+        try:
+            while True:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    self._write(pending)
+                    pending, deadline = [], None
+                    continue
+
+                if item is _STOP:
+                    self._write(pending)
+                    return
+                if isinstance(item, threading.Event):
+                    self._write(pending)
+                    pending, deadline = [], None
+                    item.set()
+                    continue
+
+                pending.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(pending) >= self.batch_size:
+                    self._write(pending)
+                    pending, deadline = [], None
+        finally:
+            self._get_manager().close_thread_connection()
+
+    def _write(self, records: List[Tuple[str, tuple]]) -> None:
+        if not records:
+            return
+        audit_rows = [row for kind, row in records if kind == "audit"]
+        license_rows = [row for kind, row in records if kind == "license"]
+        manager = self._get_manager()
+        try:
+            with manager.transaction(immediate=True) as conn:
+                if audit_rows:
+                    conn.executemany(AUDIT_INSERT_SQL, audit_rows)
+                if license_rows:
+                    conn.executemany(LICENSE_INSERT_SQL, license_rows)
+            self._stats["transactions"] += 1
+            self._stats["records_written"] += len(records)
+        except sqlite3.Error as e:
+            # Retry one record at a time so a single bad row does not lose the batch
+            print(f"Error writing audit batch, retrying individually: {e}")
+            for kind, row in records:
+                try:
+                    with manager.transaction(immediate=True) as conn:
+                        conn.execute(AUDIT_INSERT_SQL if kind == "audit" else LICENSE_INSERT_SQL, row)
+                    self._stats["transactions"] += 1
+                    self._stats["records_written"] += 1
+                except sqlite3.Error as row_error:
+                    self._stats["records_dropped"] += 1
+                    print(f"Error logging {kind} record: {row_error}")
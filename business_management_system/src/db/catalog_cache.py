@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Seconds between PRAGMA data_version checks; lookups in between are pure dict reads
+CATALOG_CHECK_INTERVAL = 0.25
+
+PRODUCT_SELECT_SQL = """
+    SELECT p.product_id, p.name, p.price, p.current_stock, p.is_available,
+           p.category_id, c.name AS category_name
+    FROM Products p
+    JOIN Categories c ON c.category_id = p.category_id
+"""
+
+class CatalogCache:
+    """
+    In-memory copy of the Products and Categories tables for the sales terminal.
+
+    Products are held in a dict keyed by product_id with a second index by
+    name, so a price or stock lookup is a dict access. The cache reads through
+    its own connection and, at most every CATALOG_CHECK_INTERVAL seconds,
+    compares PRAGMA data_version, which changes whenever another connection
+    commits. When it has changed, the CatalogChanges rows written by the
+    Products and Categories triggers tell the cache which products to reload;
+    a category change (product_id NULL) reloads everything, as does falling
+    behind the rows the CatalogChanges trigger keeps. The cache only reads;
+    writers in this process call notify_products_changed() to refresh
+    immediately.
+    """
+
+    def __init__(self, get_manager: Callable[[], Any], check_interval: float = CATALOG_CHECK_INTERVAL):
+        self._get_manager = get_manager
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._database_path: Optional[str] = None
+        self._products: Dict[int, Dict[str, Any]] = {}
+        self._ids_by_name: Dict[str, int] = {}
+        self._data_version: Optional[int] = None
+        self._last_change_id = 0
+        self._checked_at = 0.0
+        self._stats = {"hits": 0, "misses": 0, "full_reloads": 0, "incremental_reloads": 0, "products_reloaded": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        database_path = self._get_manager().database_path
+        if self._conn is not None and self._database_path != database_path:
+            self._close_connection()
+        if self._conn is None:
+            self._conn = sqlite3.connect(database_path, isolation_level=None, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA busy_timeout = 5000")
+            self._database_path = database_path
+            self._data_version = None
+        return self._conn
+
+    def _close_connection(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = None
+        self._database_path = None
+        self._data_version = None
+
+    def _full_reload(self, conn: sqlite3.Connection) -> None:
+        conn.execute("BEGIN")
+        try:
+            rows = conn.execute(PRODUCT_SELECT_SQL).fetchall()
+            self._last_change_id = conn.execute(
+                "SELECT COALESCE(MAX(change_id), 0) FROM CatalogChanges"
+            ).fetchone()[0]
+        finally:
+            conn.execute("COMMIT")
+        self._products = {row["product_id"]: dict(row) for row in rows}
+        self._ids_by_name = {row["name"]: row["product_id"] for row in rows}
+        self._stats["full_reloads"] += 1
+
+    def _reload_products(self, conn: sqlite3.Connection, product_ids: Iterable[int]) -> None:
+        product_ids = list(set(product_ids))
+        if not product_ids:
+            return
+        rows = conn.execute(
+            f"{PRODUCT_SELECT_SQL} WHERE p.product_id IN ({', '.join('?' * len(product_ids))})",
+            product_ids
+        ).fetchall()
+        for product_id in product_ids:
+            old = self._products.pop(product_id, None)
+            if old is not None and self._ids_by_name.get(old["name"]) == product_id:
+                del self._ids_by_name[old["name"]]
+        for row in rows:
+            self._products[row["product_id"]] = dict(row)
+            self._ids_by_name[row["name"]] = row["product_id"]
+        self._stats["incremental_reloads"] += 1
+        self._stats["products_reloaded"] += len(product_ids)
+
+    def _apply_changes(self, conn: sqlite3.Connection) -> None:
+        """Reloads the products listed in CatalogChanges since the last refresh."""
+        oldest = conn.execute("SELECT MIN(change_id) FROM CatalogChanges").fetchone()[0]
+        changes = conn.execute(
+            "SELECT change_id, product_id FROM CatalogChanges WHERE change_id > ? ORDER BY change_id",
+            (self._last_change_id,)
+        ).fetchall()
+        if not changes:
+            return
+        # A category change, or rows pruned before we saw them, needs a full reload
+        if any(row["product_id"] is None for row in changes) or (oldest or 0) > self._last_change_id + 1:
+            self._full_reload(conn)
+        else:
+            self._reload_products(conn, (row["product_id"] for row in changes))
+            self._last_change_id = changes[-1]["change_id"]
+
+    def _refresh(self, force: bool = False) -> None:
+        """Brings the cache up to date if the database changed since the last check."""
+        now = time.monotonic()
+        if not force and self._conn is not None and now - self._checked_at < self.check_interval \
+                and self._database_path == self._get_manager().database_path:
+            return
+        conn = self._connect()
+        self._checked_at = now
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._data_version is None:
+            self._full_reload(conn)
+        elif data_version != self._data_version or force:
+            self._apply_changes(conn)
+        # The version read before applying: a commit made meanwhile is picked up next time
+        self._data_version = data_version
+
+    def _lookup(self, product_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        product = self._products.get(product_id) if product_id is not None else None
+        self._stats["hits" if product is not None else "misses"] += 1
+        return product
+
+    def get_product(self, product_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Gets a product from the cache.
+
+        Args:
+            product_id: ID of the product
+
+        Returns:
+            Product dictionary (shared, do not modify) or None if unknown
+        """
+        with self._lock:
+            try:
+                self._refresh()
+            except sqlite3.Error as e:
+                print(f"Error refreshing product catalog: {e}")
+            return self._lookup(product_id)
+
+    def get_product_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Gets a product from the cache by its name.
+
+        Args:
+            name: Product name
+
+        Returns:
+            Product dictionary (shared, do not modify) or None if unknown
+        """
+        with self._lock:
+            try:
+                self._refresh()
+            except sqlite3.Error as e:
+                print(f"Error refreshing product catalog: {e}")
+            return self._lookup(self._ids_by_name.get(name))
+
+    def get_price(self, product_id: int) -> Optional[float]:
+        """Returns the cached price of a product, or None if it is unknown."""
+        product = self.get_product(product_id)
+        return product["price"] if product is not None else None
+
+    def get_products(self, available_only: bool = True) -> List[Dict[str, Any]]:
+        """
+        Gets all cached products ordered by name.
+
+        Args:
+            available_only: Only return products that are available for sale
+
+        Returns:
+            List of product dictionaries (copies)
+        """
+        with self._lock:
+            try:
+                self._refresh()
+            except sqlite3.Error as e:
+                print(f"Error refreshing product catalog: {e}")
+            products = [dict(product) for product in self._products.values()
+                        if product["is_available"] or not available_only]
+        return sorted(products, key=lambda product: product["name"])
+
+    def notify_products_changed(self) -> None:
+        """Applies pending catalog changes now, after a write made by this process."""
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._refresh(force=True)
+            except sqlite3.Error as e:
+                print(f"Error refreshing product catalog: {e}")
+
+    def invalidate(self) -> None:
+        """Drops the cached catalog; the next lookup reloads it in full."""
+        with self._lock:
+            self._data_version = None
+            self._checked_at = 0.0
+
+    def close(self) -> None:
+        """Closes the cache's connection and drops the cached catalog."""
+        with self._lock:
+            self._close_connection()
+            self._products = {}
+            self._ids_by_name = {}
+
+    def stats(self) -> Dict[str, int]:
+        """Returns lookup and reload counters and the number of cached products."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["products"] = len(self._products)
+        return stats
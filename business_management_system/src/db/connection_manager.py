@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+import random
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# PRAGMAs applied to every connection handed out by the manager
+DEFAULT_PRAGMAS = [
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("busy_timeout", "5000"),
+    ("foreign_keys", "ON"),
+]
+
+# Taking the write lock (BEGIN IMMEDIATE). Each attempt lets SQLite's busy
+# handler wait WRITE_ATTEMPT_TIMEOUT_MS; a busy attempt is retried after a
+# random delay of up to WRITE_RETRY_BASE_DELAY * 2**retry seconds (capped at
+# WRITE_RETRY_MAX_DELAY) until WRITE_RETRY_DEADLINE seconds have passed.
+WRITE_ATTEMPT_TIMEOUT_MS = 20
+WRITE_RETRY_BASE_DELAY = 0.005
+WRITE_RETRY_MAX_DELAY = 0.25
+WRITE_RETRY_DEADLINE = 5.0
+
+def is_busy_error(error: BaseException) -> bool:
+    """Returns True if an error means another connection holds the lock (SQLITE_BUSY or SQLITE_LOCKED)."""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    message = str(error)
+    return "database is locked" in message or "database is busy" in message
+
+def _close_quietly(conn: sqlite3.Connection) -> None:
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+class _ThreadConnection:
+    """
+    One thread's connection, closed when the thread's locals are discarded.
+
+    The thread-local storage is the only strong reference, so the finalizer
+    runs when the thread exits; calling close() runs it earlier.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.close = weakref.finalize(self, _close_quietly, conn)
+
+class ConnectionManager:
+    """
+    Hands out one persistent SQLite connection per thread.
+
+    Connections are opened lazily the first time a thread asks for one and are
+    closed when the thread exits or close_all() is called. The connections run
+    in autocommit mode and transactions are managed explicitly by
+    transaction(), which uses savepoints when calls are nested so that helpers
+    such as log_action() can be used from inside another function's
+    transaction.
+
+    after_commit() defers side effects (e.g. queuing an audit record) until
+    the outermost transaction commits; they are dropped with a rollback.
+
+    Write transactions (immediate=True) take the write lock up front and,
+    when another connection holds it, retry with jittered exponential
+    backoff; write_stats() reports how long writers waited and how often.
+
+    The connection class comes from get_factory() (e.g. an instrumented
+    connection while query statistics are on). After set_factory_changed(),
+    each thread closes and reopens its connection the next time it asks for
+    one outside a transaction.
+    """
+
+    def __init__(self, database_path: str, pragmas: Optional[List[tuple]] = None,
+                 get_factory: Optional[Callable[[], type]] = None):
+        self.database_path = database_path
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self.busy_timeout_ms = int(dict(self.pragmas).get("busy_timeout", 0))
+        self.get_factory = get_factory or (lambda: sqlite3.Connection)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._handles: "weakref.WeakSet[_ThreadConnection]" = weakref.WeakSet()
+        self._factory_version = 0
+        self._write_stats = {"write_transactions": 0, "lock_wait_ms": 0.0, "max_lock_wait_ms": 0.0,
+                             "contended": 0, "busy_retries": 0, "busy_failures": 0}
+
+    def _open_connection(self) -> sqlite3.Connection:
+        """Opens a new connection with the configured PRAGMAs applied."""
+        conn = sqlite3.connect(self.database_path, isolation_level=None, check_same_thread=False,
+                               factory=self.get_factory())
+        conn.row_factory = sqlite3.Row  # Access columns by name
+        for name, value in self.pragmas:
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def get_connection(self) -> sqlite3.Connection:
+        """
+        Gets the persistent connection for the calling thread.
+
+        Returns:
+            The thread's connection, opened on first use
+        """
+        handle = getattr(self._local, "handle", None)
+        if handle is not None and self._local.version != self._factory_version and self._local.depth == 0:
+            handle.close()
+            handle = None
+        if handle is None:
+            handle = _ThreadConnection(self._open_connection())
+            self._local.handle = handle
+            self._local.depth = 0
+            self._local.version = self._factory_version
+            with self._lock:
+                self._handles.add(handle)
+        return handle.conn
+
+    def set_factory_changed(self) -> None:
+        """Makes every thread reopen its connection with the current factory."""
+        self._factory_version += 1
+
+    def _begin_immediate(self, conn: sqlite3.Connection) -> None:
+        """Takes the write lock, retrying with jittered exponential backoff while the database is busy."""
+        started = time.perf_counter()
+        deadline = started + WRITE_RETRY_DEADLINE
+        retries = 0
+        conn.execute(f"PRAGMA busy_timeout = {WRITE_ATTEMPT_TIMEOUT_MS}")
+        try:
+            while True:
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    break
+                except sqlite3.OperationalError as e:
+                    if not is_busy_error(e) or time.perf_counter() >= deadline:
+                        with self._lock:
+                            self._write_stats["busy_failures"] += is_busy_error(e)
+                        raise
+                # Full jitter: writers that collided do not retry in step
+                delay = random.uniform(0, min(WRITE_RETRY_MAX_DELAY, WRITE_RETRY_BASE_DELAY * 2 ** retries))
+                time.sleep(min(delay, max(0.0, deadline - time.perf_counter())))
+                retries += 1
+        finally:
+            conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms}")
+        waited_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            stats = self._write_stats
+            stats["write_transactions"] += 1
+            stats["lock_wait_ms"] += waited_ms
+            stats["max_lock_wait_ms"] = max(stats["max_lock_wait_ms"], waited_ms)
+            stats["contended"] += retries > 0
+            stats["busy_retries"] += retries
+
+    def write_stats(self) -> Dict[str, Any]:
+        """Returns write lock counters: transactions, time waited, retries and transactions that gave up."""
+        with self._lock:
+            stats = dict(self._write_stats)
+        stats["average_lock_wait_ms"] = (stats["lock_wait_ms"] / stats["write_transactions"]
+                                         if stats["write_transactions"] else 0.0)
+        return stats
+
+    @contextmanager
+    def transaction(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        """
+        Context manager yielding the thread's connection inside a transaction.
+
+        The outermost block issues BEGIN and COMMIT (or ROLLBACK on error);
+        nested blocks use a SAVEPOINT so an inner failure only undoes the
+        inner block's work.
+
+        Args:
+            immediate: Take the write lock up front (BEGIN IMMEDIATE, retried
+                while busy) instead of on the first write; ignored for
+                nested blocks
+        """
+        conn = self.get_connection()
+        depth = self._local.depth
+        savepoint = f"sp_{depth}"
+        if depth == 0 and immediate:
+            self._begin_immediate(conn)
+        elif depth == 0:
+            conn.execute("BEGIN")
+        else:
+            conn.execute(f"SAVEPOINT {savepoint}")
+        self._local.depth = depth + 1
+        pending = self._pending_callbacks()
+        pending.append([])
+        try:
+            yield conn
+        except BaseException:
+            self._local.depth = depth
+            pending.pop()
+            if depth == 0:
+                conn.rollback()
+            else:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            callbacks = pending.pop()
+            try:
+                conn.execute("COMMIT" if depth == 0 else f"RELEASE {savepoint}")
+            except BaseException:
+                # A failed COMMIT (e.g. a deferred constraint) leaves the transaction open
+                if depth == 0:
+                    conn.rollback()
+                else:
+                    conn.execute(f"ROLLBACK TO {savepoint}")
+                    conn.execute(f"RELEASE {savepoint}")
+                raise
+            finally:
+                self._local.depth = depth
+            if depth > 0:
+                # Committed with the enclosing block, or rolled back with it
+                pending[-1].extend(callbacks)
+            else:
+                self._run_callbacks(callbacks)
+
+    def _pending_callbacks(self) -> List[List[Callable[[], None]]]:
+        """The calling thread's after_commit() callbacks, one list per open transaction level."""
+        pending = getattr(self._local, "pending", None)
+        if pending is None:
+            pending = self._local.pending = []
+        return pending
+
+    def _run_callbacks(self, callbacks: List[Callable[[], None]]) -> None:
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in after-commit callback: {e}")
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Runs a callback once the calling thread's transaction has committed.
+
+        Outside a transaction the callback runs immediately. Inside one it
+        waits for the outermost COMMIT and is discarded if the transaction,
+        or the savepoint it was registered in, rolls back.
+
+        Args:
+            callback: Zero-argument callable
+        """
+        if not self.in_transaction():
+            callback()
+            return
+        self._pending_callbacks()[-1].append(callback)
+
+    def in_transaction(self) -> bool:
+        """Returns True if the calling thread is inside a transaction() block."""
+        return getattr(self._local, "depth", 0) > 0
+
+    def close_thread_connection(self) -> None:
+        """Closes the calling thread's connection if it has one."""
+        handle = getattr(self._local, "handle", None)
+        if handle is not None:
+            self._local.handle = None
+            handle.close()
+
+    def close_all(self) -> None:
+        """Closes every connection opened by this manager."""
+        with self._lock:
+            handles = list(self._handles)
+            self._handles.clear()
+        for handle in handles:
+            handle.close()
+        self._local = threading.local()
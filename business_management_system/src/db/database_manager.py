@@ -1,13 +1,29 @@
 #!/usr/bin/env python3
 import sqlite3
-import bcrypt
 import os
 import uuid
-import platform
-import hashlib
 import json
 import datetime
-from typing import Tuple, Optional, Dict, Any, List
+import sys
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Tuple, Optional, Dict, Any, List, Iterator
+
+# Add the parent directory (src) to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from db.connection_manager import ConnectionManager
+from db.audit_sink import AuditSink
+from db.catalog_cache import CatalogCache
+from db.task_executor import DBTaskExecutor
+from db.query_stats import (QueryStats, query_stats, get_connection_factory, threshold_from_environment,
+                            QUERY_STATS_ENV, SLOW_QUERY_LOG_NAME)
+from db.license_service import LicenseState
+from db.hardware_fingerprint import fingerprint as hardware_fingerprint
+from db.password_service import PasswordService, password_service
+from db.license_codec import encode_license, decode_license
+from db.migrations import run_migrations
+from db import sales_summary
 
 # Constants
 DATABASE_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "business_management.db")
@@ -22,21 +38,192 @@ except ImportError:
 LICENSE_REGISTRY_KEY = r"SOFTWARE\BusinessManagementSystem"
 LICENSE_REGISTRY_VALUE = "LicenseData"
 
-def get_db_connection():
-    """Establishes a connection to the SQLite database."""
-    conn = sqlite3.connect(DATABASE_NAME)
-    conn.row_factory = sqlite3.Row  # Access columns by name
-    return conn
+# Audit actions written to disk before log_action() returns
+CRITICAL_ACTION_TYPES = {"LOGIN_FAILED", "PASSWORD_RESET", "SYSTEM_INITIALIZED", "USER_STATUS_CHANGED"}
+
+# Audit log rows fetched per page by the log viewer
+AUDIT_LOG_PAGE_SIZE = 200
+
+# InventoryLog reasons for stock changes other than sales
+STOCK_ADJUSTMENT_REASONS = ["Manual Stock Entry", "Spoilage", "Correction", "Initial Stock"]
+
+_connection_manager = ConnectionManager(DATABASE_NAME, get_factory=get_connection_factory)
+
+def configure_database(database_path: str) -> None:
+    """
+    Points the database layer at a different database file.
+    
+    Closes every pooled connection to the previous database.
+    
+    Args:
+        database_path: Path of the SQLite database file to use
+    """
+    global DATABASE_NAME, _connection_manager
+    _db_tasks.shutdown()
+    _audit_sink.close()
+    _catalog_cache.close()
+    _connection_manager.close_all()
+    DATABASE_NAME = database_path
+    _connection_manager = ConnectionManager(database_path, get_factory=get_connection_factory)
+    if query_stats.enabled:
+        # Keep the slow-query log next to the database in use
+        enable_query_stats()
+
+def get_connection_manager() -> ConnectionManager:
+    """Returns the connection manager backing the database layer."""
+    return _connection_manager
+
+def get_db_connection() -> sqlite3.Connection:
+    """
+    Returns the calling thread's persistent connection to the SQLite database.
+    
+    The connection is shared by every caller on the thread and must not be
+    closed; use db_connection() to run statements inside a transaction.
+    """
+    return _connection_manager.get_connection()
+
+@contextmanager
+def db_connection(immediate: bool = False) -> Iterator[sqlite3.Connection]:
+    """
+    Context manager yielding the thread's connection inside a transaction.
+    
+    Commits when the block exits normally and rolls back if it raises.
+    Nested blocks share the outer transaction through savepoints.
+    
+    Args:
+        immediate: Start the transaction with BEGIN IMMEDIATE (for writes)
+    """
+    with _connection_manager.transaction(immediate) as conn:
+        yield conn
+
+@contextmanager
+def write_transaction() -> Iterator[sqlite3.Connection]:
+    """
+    Context manager for every block that modifies the database.
+    
+    Takes the write lock before the block runs (BEGIN IMMEDIATE), so the
+    block's reads see the data it is about to change and it cannot fail
+    halfway with "database is locked". While another connection holds the
+    lock the begin is retried with jittered exponential backoff. Inside
+    another transaction the block becomes a savepoint of it.
+    """
+    with _connection_manager.transaction(immediate=True) as conn:
+        yield conn
+
+def get_write_stats() -> Dict[str, Any]:
+    """Returns write lock counters (transactions, lock wait, busy retries and failures) for this process."""
+    return _connection_manager.write_stats()
+
+def close_db_connections() -> None:
+    """Flushes the audit log and closes every pooled database connection (call at application shutdown)."""
+    _db_tasks.shutdown()
+    _audit_sink.close()
+    _catalog_cache.close()
+    _connection_manager.close_all()
+
+_audit_sink = AuditSink(get_connection_manager)
+_catalog_cache = CatalogCache(get_connection_manager)
+_db_tasks = DBTaskExecutor(get_connection_manager)
+
+def submit_db_task(func, *args, **kwargs) -> Future:
+    """
+    Runs a database call on the UI's database worker pool.
+    
+    Args:
+        func: Function to call on a worker thread, e.g. get_all_users
+        *args, **kwargs: Arguments for func
+        
+    Returns:
+        Future resolving to func's result
+    """
+    return _db_tasks.submit(func, *args, **kwargs)
+
+def get_catalog_cache() -> CatalogCache:
+    """Returns the in-memory product catalog used by the sales terminal and checkout."""
+    return _catalog_cache
+
+def flush_audit_log(timeout: Optional[float] = 5.0) -> bool:
+    """
+    Writes every queued AuditLog and LicenseValidation record to the database.
+    
+    Args:
+        timeout: Maximum seconds to wait (None waits indefinitely)
+        
+    Returns:
+        True if all records were written, False on timeout
+    """
+    return _audit_sink.flush(timeout)
+
+def get_audit_sink_stats() -> Dict[str, int]:
+    """Returns the audit writer's counters (records written, transactions, dropped, pending)."""
+    return _audit_sink.stats()
+
+def migrate_database() -> bool:
+    """
+    Applies any pending schema migrations (a single PRAGMA read when up to date).
+    
+    Returns:
+        True if the database is at the latest version, False on error
+    """
+    try:
+        run_migrations(get_db_connection())
+        return True
+    except sqlite3.Error as e:
+        print(f"Error migrating database: {e}")
+        return False
+
+def enable_query_stats(threshold_ms: Optional[float] = None) -> str:
+    """
+    Starts recording per-statement latency, rows and call sites.
+    
+    Each thread switches to an instrumented connection the next time it
+    asks for one outside a transaction.
+    
+    Args:
+        threshold_ms: Statements at least this slow go to the slow-query log
+            (unchanged if omitted)
+        
+    Returns:
+        Path of the slow-query log
+    """
+    log_path = os.path.join(os.path.dirname(os.path.abspath(DATABASE_NAME)), SLOW_QUERY_LOG_NAME)
+    query_stats.enable(log_path, threshold_ms)
+    _connection_manager.set_factory_changed()
+    return log_path
+
+def disable_query_stats() -> None:
+    """Stops recording query statistics; connections go back to plain sqlite3 connections."""
+    query_stats.disable()
+    _connection_manager.set_factory_changed()
+
+def get_query_stats() -> QueryStats:
+    """Returns the query statistics collector."""
+    return query_stats
+
+def get_query_stats_report(top_n: int = 20, order_by: str = "total_ms") -> str:
+    """
+    Formats the slowest statements recorded so far.
+    
+    Args:
+        top_n: Number of statements to list
+        order_by: total_ms, max_ms, mean_ms, calls or rows
+        
+    Returns:
+        Plain-text report
+    """
+    return query_stats.format_report(top_n, order_by)
+
+def get_password_service() -> PasswordService:
+    """Returns the password service (worker pool and bcrypt work factor)."""
+    return password_service
 
 def hash_password(password: str) -> bytes:
-    """Hashes a password using bcrypt."""
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password.encode("utf-8"), salt)
-    return hashed_password
+    """Hashes a password using bcrypt at the configured work factor."""
+    return password_service.hash_password(password)
 
 def check_password(password: str, hashed_password: bytes) -> bool:
     """Checks if the provided password matches the hashed password."""
-    return bcrypt.checkpw(password.encode("utf-8"), hashed_password)
+    return password_service.check_password(password, hashed_password)
 
 def add_user(username: str, password: str, role: str, full_name: str = "", is_owner: bool = False) -> bool:
     """
@@ -52,30 +239,30 @@ def add_user(username: str, password: str, role: str, full_name: str = "", is_ow
     Returns:
         True on success, False otherwise
     """
-    hashed_pw = hash_password(password)
-    conn = None
+    return _add_user_record(username, hash_password(password), role, full_name, is_owner)
+
+def _add_user_record(username: str, hashed_pw: bytes, role: str, full_name: str, is_owner: bool) -> bool:
+    """Inserts a user whose password is already hashed (bcrypt runs before the write lock is taken)."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if trying to create an Owner when one already exists
-        if role == "Owner" or is_owner:
-            cursor.execute("SELECT COUNT(*) FROM Users WHERE role = 'Owner' OR is_owner = 1")
-            owner_count = cursor.fetchone()[0]
-            if owner_count > 0:
-                print("Error: An Owner account already exists.")
-                return False
-        
-        cursor.execute("""
-            INSERT INTO Users (username, password_hash, role, full_name, is_owner)
-            VALUES (?, ?, ?, ?, ?)
-        """, (username, hashed_pw, role, full_name, 1 if is_owner else 0))
-        conn.commit()
-        
-        # Log the action
-        user_id = cursor.lastrowid
-        log_action(None, "USER_CREATED", f"Created user {username} with role {role}")
-        
+        with write_transaction() as conn:
+            cursor = conn.cursor()
+
+            # Check if trying to create an Owner when one already exists
+            if role == "Owner" or is_owner:
+                cursor.execute("SELECT COUNT(*) FROM Users WHERE role = 'Owner' OR is_owner = 1")
+                owner_count = cursor.fetchone()[0]
+                if owner_count > 0:
+                    print("Error: An Owner account already exists.")
+                    return False
+
+            cursor.execute("""
+                INSERT INTO Users (username, password_hash, role, full_name, is_owner)
+                VALUES (?, ?, ?, ?, ?)
+            """, (username, hashed_pw, role, full_name, 1 if is_owner else 0))
+
+            # Log the action
+            log_action(None, "USER_CREATED", f"Created user {username} with role {role}")
+
         print(f"User {username} added successfully with role {role}.")
         return True
     except sqlite3.IntegrityError:  # Handles UNIQUE constraint violation for username
@@ -84,9 +271,6 @@ def add_user(username: str, password: str, role: str, full_name: str = "", is_ow
     except sqlite3.Error as e:
         print(f"Database error while adding user: {e}")
         return False
-    finally:
-        if conn:
-            conn.close()
 
 def verify_user(username: str, password: str) -> Tuple[bool, Optional[str], Optional[int], Optional[bool]]:
     """
@@ -99,26 +283,29 @@ def verify_user(username: str, password: str) -> Tuple[bool, Optional[str], Opti
     Returns:
         Tuple of (success_status, user_role, user_id, is_owner)
     """
-    conn = None
     try:
         # First, verify the license is valid
         if not verify_license():
             print("License validation failed. Access denied.")
             return False, None, None, None
-            
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT user_id, password_hash, role, is_owner FROM Users WHERE username = ? AND is_active = 1", 
-            (username,)
-        )
-        user_record = cursor.fetchone()
+
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT user_id, password_hash, role, is_owner FROM Users WHERE username = ? AND is_active = 1",
+                (username,)
+            )
+            user_record = cursor.fetchone()
 
         if user_record:
             if check_password(password, user_record["password_hash"]):
                 is_owner = bool(user_record["is_owner"])
                 print(f"User {username} verified successfully. Role: {user_record['role']}, Owner: {is_owner}")
                 
+                # Upgrade hashes stored at an outdated work factor
+                if password_service.needs_rehash(user_record["password_hash"]):
+                    _rehash_password(user_record["user_id"], password)
+
                 # Log the successful login
                 log_action(user_record["user_id"], "USER_LOGIN", f"User {username} logged in")
                 
@@ -136,33 +323,34 @@ def verify_user(username: str, password: str) -> Tuple[bool, Optional[str], Opti
     except sqlite3.Error as e:
         print(f"Database error during user verification: {e}")
         return False, None, None, None
-    finally:
-        if conn:
-            conn.close()
+
+def _rehash_password(user_id: int, password: str) -> None:
+    """
+    Re-hashes a verified password at the current work factor.
+    
+    Args:
+        user_id: ID of the user whose password was just verified
+        password: The verified plain-text password
+    """
+    try:
+        new_hash = hash_password(password)
+        with write_transaction() as conn:
+            conn.execute("UPDATE Users SET password_hash = ? WHERE user_id = ?", (new_hash, user_id))
+        log_action(user_id, "PASSWORD_REHASHED", f"Password hash upgraded to cost {password_service.rounds}")
+    except sqlite3.Error as e:
+        print(f"Error upgrading password hash: {e}")
 
 def get_hardware_id() -> str:
     """
     Generates a unique hardware identifier based on system components.
     
+    The value is computed once per process and cached; see
+    db.hardware_fingerprint for the component breakdown.
+    
     Returns:
         A string representing the hardware identifier
     """
-    try:
-        # Collect hardware information
-        system_info = {
-            "processor": platform.processor(),
-            "machine": platform.machine(),
-            "node": platform.node(),
-            "system": platform.system(),
-            "system_uuid": get_system_uuid()
-        }
-        
-        # Create a stable string representation and hash it
-        hardware_str = json.dumps(system_info, sort_keys=True)
-        return hashlib.sha256(hardware_str.encode()).hexdigest()
-    except Exception as e:
-        print(f"Error generating hardware ID: {e}")
-        return "unknown_hardware"
+    return hardware_fingerprint.get_hardware_id()
 
 def get_system_uuid() -> str:
     """
@@ -171,24 +359,12 @@ def get_system_uuid() -> str:
     Returns:
         System UUID string
     """
-    try:
-        if platform.system() == "Windows":
-            try:
-                import wmi
-                c = wmi.WMI()
-                for system in c.Win32_ComputerSystemProduct():
-                    return system.UUID
-            except ImportError:
-                # WMI not available
-                pass
-        elif platform.system() == "Linux":
-            # Try to get machine-id on Linux
-            if os.path.exists('/etc/machine-id'):
-                with open('/etc/machine-id', 'r') as f:
-                    return f.read().strip()
-        return "unknown"
-    except:
-        return "unknown"
+    return hardware_fingerprint.get_system_uuid()
+
+def precompute_hardware_id() -> None:
+    """Starts computing the hardware fingerprint in the background so it is ready when first needed."""
+    if not hardware_fingerprint.is_cached():
+        hardware_fingerprint.precompute()
 
 def generate_license_key(hardware_id: str, owner_info: Dict[str, Any]) -> str:
     """
@@ -230,14 +406,7 @@ def simple_encrypt(text: str) -> str:
     """
     # This is a placeholder for actual encryption
     # In a real implementation, use proper encryption like AES
-    key = "BusinessManagementSystemSecretKey"
-    result = ""
-    for i, char in enumerate(text):
-        key_char = key[i % len(key)]
-        result += chr((ord(char) + ord(key_char)) % 256)
-    
-    # Convert to hex for storage
-    return ''.join(f'{ord(c):02x}' for c in result)
+    return encode_license(text)
 
 def simple_decrypt(encrypted_hex: str) -> str:
     """
@@ -249,16 +418,7 @@ def simple_decrypt(encrypted_hex: str) -> str:
     Returns:
         Decrypted string
     """
-    # Convert from hex
-    encrypted = ''.join(chr(int(encrypted_hex[i:i+2], 16)) for i in range(0, len(encrypted_hex), 2))
-    
-    key = "BusinessManagementSystemSecretKey"
-    result = ""
-    for i, char in enumerate(encrypted):
-        key_char = key[i % len(key)]
-        result += chr((ord(char) - ord(key_char)) % 256)
-    
-    return result
+    return decode_license(encrypted_hex)
 
 def store_license_in_registry(license_key: str) -> bool:
     """
@@ -322,77 +482,97 @@ def initialize_system(owner_username: str, owner_password: str, owner_full_name:
     Returns:
         True if successful, False otherwise
     """
-    conn = None
+    # Hash before taking the write lock; bcrypt takes a noticeable fraction of a second
+    owner_password_hash = hash_password(owner_password)
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if system is already initialized
-        cursor.execute("SELECT COUNT(*) FROM SystemConfig")
-        if cursor.fetchone()[0] > 0:
-            print("System is already initialized.")
-            return False
-        
-        # Create owner account
-        if not add_user(owner_username, owner_password, "Owner", owner_full_name, True):
-            print("Failed to create owner account.")
-            return False
-        
-        # Get owner ID
-        cursor.execute("SELECT user_id FROM Users WHERE username = ?", (owner_username,))
-        owner_id = cursor.fetchone()["user_id"]
-        
-        # Generate hardware ID
-        hardware_id = get_hardware_id()
-        
-        # Generate installation ID
-        installation_id = str(uuid.uuid4())
-        
-        # Generate license key
-        owner_info = {"user_id": owner_id, "full_name": owner_full_name}
-        license_key = generate_license_key(hardware_id, owner_info)
-        
-        # Store system configuration
-        cursor.execute("""
-            INSERT INTO SystemConfig 
-            (installation_id, license_key, business_name, hardware_id, owner_id)
-            VALUES (?, ?, ?, ?, ?)
-        """, (installation_id, license_key, business_name, hardware_id, owner_id))
-        
-        # Store license in registry (Windows only)
+        with write_transaction() as conn:
+            cursor = conn.cursor()
+
+            # Check if system is already initialized
+            cursor.execute("SELECT COUNT(*) FROM SystemConfig")
+            if cursor.fetchone()[0] > 0:
+                print("System is already initialized.")
+                return False
+
+            # Create owner account
+            if not _add_user_record(owner_username, owner_password_hash, "Owner", owner_full_name, True):
+                print("Failed to create owner account.")
+                return False
+
+            # Get owner ID
+            cursor.execute("SELECT user_id FROM Users WHERE username = ?", (owner_username,))
+            owner_id = cursor.fetchone()["user_id"]
+
+            # Generate hardware ID
+            hardware_id = get_hardware_id()
+
+            # Generate installation ID
+            installation_id = str(uuid.uuid4())
+
+            # Generate license key
+            owner_info = {"user_id": owner_id, "full_name": owner_full_name}
+            license_key = generate_license_key(hardware_id, owner_info)
+
+            # Store system configuration
+            cursor.execute("""
+                INSERT INTO SystemConfig
+                (installation_id, license_key, business_name, hardware_id, owner_id)
+                VALUES (?, ?, ?, ?, ?)
+            """, (installation_id, license_key, business_name, hardware_id, owner_id))
+
+            # Log the initialization
+            log_action(owner_id, "SYSTEM_INITIALIZED", f"System initialized for business: {business_name}")
+
+        # Store license in registry (Windows only), once the configuration is saved
         if WINDOWS_PLATFORM:
             store_license_in_registry(license_key)
-        
-        # Log the initialization
-        log_action(owner_id, "SYSTEM_INITIALIZED", f"System initialized for business: {business_name}")
-        
-        conn.commit()
+
         print(f"System initialized successfully for {business_name}.")
         return True
     except sqlite3.Error as e:
         print(f"Database error during system initialization: {e}")
-        if conn:
-            conn.rollback()
         return False
-    finally:
-        if conn:
-            conn.close()
 
-def verify_license() -> bool:
+def verify_license(force: bool = False) -> bool:
     """
     Verifies that the current license is valid.
     
+    The full check runs once and its result is cached by the license state
+    service until the TTL expires or the license in SystemConfig changes.
+    
+    Args:
+        force: Skip the cache and run the full check
+        
+    Returns:
+        True if license is valid, False otherwise
+    """
+    return _license_state.is_valid(force)
+
+def _read_license_signature() -> Optional[tuple]:
+    """Reads the SystemConfig fields that invalidate a cached license check when changed."""
+    try:
+        with db_connection() as conn:
+            row = conn.execute(
+                "SELECT config_id, license_key, hardware_id, is_valid FROM SystemConfig LIMIT 1"
+            ).fetchone()
+        return tuple(row) if row else None
+    except sqlite3.Error as e:
+        print(f"Error reading license configuration: {e}")
+        return None
+
+def _check_license() -> bool:
+    """
+    Runs the full license check: hardware ID, periodic online validation and logging.
+    
     Returns:
         True if license is valid, False otherwise
     """
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         # Get system configuration
-        cursor.execute("SELECT license_key, hardware_id, last_validation_date FROM SystemConfig LIMIT 1")
-        config = cursor.fetchone()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT license_key, hardware_id, last_validation_date FROM SystemConfig LIMIT 1")
+            config = cursor.fetchone()
         
         if not config:
             log_license_validation(False, "offline", "No system configuration found")
@@ -422,11 +602,11 @@ def verify_license() -> bool:
             
             if online_valid:
                 # Update last validation date
-                cursor.execute(
-                    "UPDATE SystemConfig SET last_validation_date = ?", 
-                    (datetime.datetime.now().isoformat(),)
-                )
-                conn.commit()
+                with write_transaction() as conn:
+                    conn.execute(
+                        "UPDATE SystemConfig SET last_validation_date = ?",
+                        (datetime.datetime.now().isoformat(),)
+                    )
                 log_license_validation(True, "online", "License validated online")
             else:
                 log_license_validation(False, "online", "Online validation failed")
@@ -439,9 +619,12 @@ def verify_license() -> bool:
         print(f"Error verifying license: {e}")
         log_license_validation(False, "offline", f"Error: {str(e)}")
         return False
-    finally:
-        if conn:
-            conn.close()
+
+_license_state = LicenseState(_check_license, _read_license_signature)
+
+def get_license_state() -> LicenseState:
+    """Returns the license state service (for cache statistics and TTL configuration)."""
+    return _license_state
 
 def simulate_online_validation(license_key: str) -> bool:
     """
@@ -462,51 +645,68 @@ def log_license_validation(is_successful: bool, validation_method: str, message:
     """
     Logs a license validation attempt.
     
+    The record is queued and written in the background by the audit sink.
+    
     Args:
         is_successful: Whether validation was successful
         validation_method: Method used for validation (online/offline)
         message: Additional message
     """
-    conn = None
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO LicenseValidation 
-            (is_successful, validation_method, error_message)
-            VALUES (?, ?, ?)
-        """, (1 if is_successful else 0, validation_method, message))
-        conn.commit()
-    except sqlite3.Error as e:
-        print(f"Error logging license validation: {e}")
-    finally:
-        if conn:
-            conn.close()
+    _audit_sink.log_license_validation(is_successful, validation_method, message)
 
 def log_action(user_id: Optional[int], action_type: str, action_details: str) -> None:
     """
     Logs a user action in the audit log.
     
+    The record is queued and written in the background by the audit sink.
+    Inside a transaction it is queued only once the transaction commits, so
+    a rolled-back change leaves no record. Actions listed in
+    CRITICAL_ACTION_TYPES are flushed before returning, unless the caller is
+    inside a transaction (the writer would have to wait for it to commit).
+    
     Args:
         user_id: ID of the user performing the action (can be None)
         action_type: Type of action
         action_details: Details of the action
     """
-    conn = None
+    _connection_manager.after_commit(lambda: _audit_sink.log_action(user_id, action_type, action_details))
+    if action_type in CRITICAL_ACTION_TYPES and not _connection_manager.in_transaction():
+        _audit_sink.flush()
+
+def get_audit_log_page(before: Optional[Tuple[str, int]] = None,
+                       limit: int = AUDIT_LOG_PAGE_SIZE) -> List[Dict[str, Any]]:
+    """
+    Gets one page of the audit log, newest first.
+    
+    Pages are keyed on (timestamp, log_id) rather than OFFSET, so each page
+    is a range read on idx_auditlog_timestamp and costs the same however far
+    back it is.
+    
+    Args:
+        before: (timestamp, log_id) of the last row of the previous page, or
+            None for the newest page
+        limit: Maximum number of rows to return
+        
+    Returns:
+        List of dictionaries with log_id, timestamp, username, action_type
+        and action_details
+    """
+    where = "WHERE (a.timestamp, a.log_id) < (?, ?)" if before is not None else ""
+    params = tuple(before) if before is not None else ()
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO AuditLog 
-            (user_id, action_type, action_details)
-            VALUES (?, ?, ?)
-        """, (user_id, action_type, action_details))
-        conn.commit()
+        with db_connection() as conn:
+            logs = conn.execute(f"""
+                SELECT a.log_id, a.timestamp, u.username, a.action_type, a.action_details
+                FROM AuditLog a
+                LEFT JOIN Users u ON a.user_id = u.user_id
+                {where}
+                ORDER BY a.timestamp DESC, a.log_id DESC
+                LIMIT ?
+            """, params + (limit,)).fetchall()
+        return [dict(log) for log in logs]
     except sqlite3.Error as e:
-        print(f"Error logging action: {e}")
-    finally:
-        if conn:
-            conn.close()
+        print(f"Error getting audit log page: {e}")
+        return []
 
 def is_system_initialized() -> bool:
     """
@@ -515,19 +715,13 @@ def is_system_initialized() -> bool:
     Returns:
         True if initialized, False otherwise
     """
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM SystemConfig")
-        count = cursor.fetchone()[0]
+        with db_connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM SystemConfig").fetchone()[0]
         return count > 0
     except sqlite3.Error as e:
         print(f"Error checking system initialization: {e}")
         return False
-    finally:
-        if conn:
-            conn.close()
 
 def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
     """
@@ -539,21 +733,15 @@ def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
     Returns:
         Dictionary with user information or None if not found
     """
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM Users WHERE user_id = ?", (user_id,))
-        user = cursor.fetchone()
+        with db_connection() as conn:
+            user = conn.execute("SELECT * FROM Users WHERE user_id = ?", (user_id,)).fetchone()
         if user:
             return dict(user)
         return None
     except sqlite3.Error as e:
         print(f"Error getting user: {e}")
         return None
-    finally:
-        if conn:
-            conn.close()
 
 def get_all_users() -> List[Dict[str, Any]]:
     """
@@ -562,19 +750,15 @@ def get_all_users() -> List[Dict[str, Any]]:
     Returns:
         List of dictionaries with user information
     """
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT user_id, username, role, full_name, is_active, is_owner FROM Users")
-        users = cursor.fetchall()
+        with db_connection() as conn:
+            users = conn.execute(
+                "SELECT user_id, username, role, full_name, is_active, is_owner FROM Users"
+            ).fetchall()
         return [dict(user) for user in users]
     except sqlite3.Error as e:
         print(f"Error getting users: {e}")
         return []
-    finally:
-        if conn:
-            conn.close()
 
 def update_user(user_id: int, role: Optional[str] = None, 
                 full_name: Optional[str] = None, is_active: Optional[bool] = None,
@@ -592,68 +776,62 @@ def update_user(user_id: int, role: Optional[str] = None,
     Returns:
         True if successful, False otherwise
     """
-    conn = None
+    # Build update query
+    query_parts = []
+    params = []
+
+    if role is not None:
+        query_parts.append("role = ?")
+        params.append(role)
+
+    if full_name is not None:
+        query_parts.append("full_name = ?")
+        params.append(full_name)
+
+    if is_active is not None:
+        query_parts.append("is_active = ?")
+        params.append(1 if is_active else 0)
+
+    if password is not None:
+        # Hash before opening the transaction so bcrypt does not hold it open
+        query_parts.append("password_hash = ?")
+        params.append(hash_password(password))
+
+    if not query_parts:
+        print("No updates specified.")
+        return False
+
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if user exists and is not the owner (if trying to change role)
-        cursor.execute("SELECT is_owner FROM Users WHERE user_id = ?", (user_id,))
-        user = cursor.fetchone()
-        if not user:
-            print(f"User with ID {user_id} not found.")
-            return False
-        
-        # Don't allow changing owner's role
-        if user["is_owner"] and role and role != "Owner":
-            print("Cannot change the role of the owner.")
-            return False
-        
-        # Build update query
-        query_parts = []
-        params = []
-        
-        if role is not None:
-            query_parts.append("role = ?")
-            params.append(role)
-        
-        if full_name is not None:
-            query_parts.append("full_name = ?")
-            params.append(full_name)
-        
-        if is_active is not None:
-            query_parts.append("is_active = ?")
-            params.append(1 if is_active else 0)
-        
-        if password is not None:
-            query_parts.append("password_hash = ?")
-            params.append(hash_password(password))
-        
-        if not query_parts:
-            print("No updates specified.")
-            return False
-        
-        # Complete the query
-        query = f"UPDATE Users SET {', '.join(query_parts)} WHERE user_id = ?"
-        params.append(user_id)
-        
-        # Execute the update
-        cursor.execute(query, params)
-        conn.commit()
-        
-        # Log the action
-        log_action(None, "USER_UPDATED", f"Updated user with ID {user_id}")
-        
+        with write_transaction() as conn:
+            cursor = conn.cursor()
+
+            # Check if user exists and is not the owner (if trying to change role)
+            cursor.execute("SELECT is_owner FROM Users WHERE user_id = ?", (user_id,))
+            user = cursor.fetchone()
+            if not user:
+                print(f"User with ID {user_id} not found.")
+                return False
+
+            # Don't allow changing owner's role
+            if user["is_owner"] and role and role != "Owner":
+                print("Cannot change the role of the owner.")
+                return False
+
+            # Complete the query
+            query = f"UPDATE Users SET {', '.join(query_parts)} WHERE user_id = ?"
+            params.append(user_id)
+
+            # Execute the update
+            cursor.execute(query, params)
+
+            # Log the action
+            log_action(None, "USER_UPDATED", f"Updated user with ID {user_id}")
+
         print(f"User with ID {user_id} updated successfully.")
         return True
     except sqlite3.Error as e:
         print(f"Database error updating user: {e}")
-        if conn:
-            conn.rollback()
         return False
-    finally:
-        if conn:
-            conn.close()
 
 def get_business_info() -> Optional[Dict[str, Any]]:
     """
@@ -662,21 +840,17 @@ def get_business_info() -> Optional[Dict[str, Any]]:
     Returns:
         Dictionary with business information or None if not found
     """
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT business_name, installation_date FROM SystemConfig LIMIT 1")
-        info = cursor.fetchone()
+        with db_connection() as conn:
+            info = conn.execute(
+                "SELECT business_name, installation_date FROM SystemConfig LIMIT 1"
+            ).fetchone()
         if info:
             return dict(info)
         return None
     except sqlite3.Error as e:
         print(f"Error getting business info: {e}")
         return None
-    finally:
-        if conn:
-            conn.close()
 
 def update_business_info(business_name: str) -> bool:
     """
@@ -688,26 +862,210 @@ def update_business_info(business_name: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE SystemConfig SET business_name = ?", (business_name,))
-        conn.commit()
-        
-        # Log the action
-        log_action(None, "BUSINESS_INFO_UPDATED", f"Updated business name to {business_name}")
-        
+        with write_transaction() as conn:
+            conn.execute("UPDATE SystemConfig SET business_name = ?", (business_name,))
+
+            # Log the action
+            log_action(None, "BUSINESS_INFO_UPDATED", f"Updated business name to {business_name}")
+
         print(f"Business information updated successfully.")
         return True
     except sqlite3.Error as e:
         print(f"Database error updating business info: {e}")
-        if conn:
-            conn.rollback()
         return False
-    finally:
-        if conn:
-            conn.close()
+
+def get_products(available_only: bool = True) -> List[Dict[str, Any]]:
+    """
+    Gets products with their category names.
+    
+    Args:
+        available_only: Only return products that are available for sale
+        
+    Returns:
+        List of dictionaries with product information
+    """
+    try:
+        with db_connection() as conn:
+            products = conn.execute(f"""
+                SELECT p.product_id, p.name, p.price, p.current_stock, p.is_available,
+                       p.category_id, c.name AS category_name
+                FROM Products p
+                JOIN Categories c ON c.category_id = p.category_id
+                {"WHERE p.is_available = 1" if available_only else ""}
+                ORDER BY p.name
+            """).fetchall()
+        return [dict(product) for product in products]
+    except sqlite3.Error as e:
+        print(f"Error getting products: {e}")
+        return []
+
+def adjust_stock(product_id: int, change_quantity: int, reason: str, user_id: Optional[int] = None) -> bool:
+    """
+    Changes a product's stock and records the change in the InventoryLog.
+    
+    The change is a single guarded UPDATE (current_stock + change >= 0), so
+    concurrent sales and adjustments never overwrite each other and stock
+    never goes negative.
+    
+    Args:
+        product_id: ID of the product
+        change_quantity: Units added (positive) or removed (negative)
+        reason: One of STOCK_ADJUSTMENT_REASONS
+        user_id: User making the change
+        
+    Returns:
+        True if successful, False if the product is unknown, the stock is
+        insufficient or a database error occurred
+    """
+    if reason not in STOCK_ADJUSTMENT_REASONS:
+        print(f"Invalid stock adjustment reason: {reason}")
+        return False
+    if change_quantity == 0:
+        print("No stock change specified.")
+        return False
+    # Stamped in local time like sales, so both follow the business day
+    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        with write_transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE Products SET current_stock = current_stock + ? WHERE product_id = ? AND current_stock >= ?",
+                (change_quantity, product_id, max(0, -change_quantity))
+            )
+            if cursor.rowcount == 0:
+                print(f"Product {product_id} not found or has insufficient stock.")
+                return False
+            conn.execute("""
+                INSERT INTO InventoryLog
+                (product_id, change_quantity, new_stock_level, reason, user_id_admin, log_time)
+                SELECT product_id, ?, current_stock, ?, ?, ? FROM Products WHERE product_id = ?
+            """, (change_quantity, reason, user_id, now, product_id))
+        _catalog_cache.notify_products_changed()
+        log_action(user_id, "STOCK_ADJUSTED", f"Product {product_id}: {change_quantity:+d} ({reason})")
+        return True
+    except sqlite3.Error as e:
+        print(f"Database error adjusting stock: {e}")
+        return False
+
+def get_sales_locations() -> List[Dict[str, Any]]:
+    """
+    Gets all sales locations.
+    
+    Returns:
+        List of dictionaries with location information
+    """
+    try:
+        with db_connection() as conn:
+            locations = conn.execute(
+                "SELECT location_id, location_name, capacity, status FROM SalesLocations ORDER BY location_id"
+            ).fetchall()
+        return [dict(location) for location in locations]
+    except sqlite3.Error as e:
+        print(f"Error getting sales locations: {e}")
+        return []
+
+def get_categories() -> List[Dict[str, Any]]:
+    """
+    Gets all product categories.
+    
+    Returns:
+        List of dictionaries with category information
+    """
+    try:
+        with db_connection() as conn:
+            categories = conn.execute(
+                "SELECT category_id, name, description FROM Categories ORDER BY name"
+            ).fetchall()
+        return [dict(category) for category in categories]
+    except sqlite3.Error as e:
+        print(f"Error getting categories: {e}")
+        return []
+
+def get_sales_summary(start_date: str, end_date: str, group_by: List[str]) -> List[Dict[str, Any]]:
+    """
+    Gets units and revenue for a date range from the daily sales summaries.
+    
+    Args:
+        start_date: First day ("YYYY-MM-DD")
+        end_date: Last day, inclusive
+        group_by: Groupings from sales_summary.SALES_GROUPINGS (day, month,
+            category, product, payment_method, location)
+        
+    Returns:
+        List of dictionaries with the grouping columns, line_count, units and revenue
+    """
+    try:
+        with db_connection() as conn:
+            return sales_summary.get_sales_report(conn, start_date, end_date, group_by)
+    except sqlite3.Error as e:
+        print(f"Error getting sales summary: {e}")
+        return []
+
+def get_order_summary(start_date: str, end_date: str, group_by: List[str]) -> List[Dict[str, Any]]:
+    """
+    Gets order counts, revenue and average ticket for a date range.
+    
+    Args:
+        start_date: First day ("YYYY-MM-DD")
+        end_date: Last day, inclusive
+        group_by: Groupings from sales_summary.ORDER_GROUPINGS
+        
+    Returns:
+        List of dictionaries with the grouping columns, order_count, revenue and average_ticket
+    """
+    try:
+        with db_connection() as conn:
+            return sales_summary.get_order_totals(conn, start_date, end_date, group_by)
+    except sqlite3.Error as e:
+        print(f"Error getting order summary: {e}")
+        return []
+
+def rebuild_sales_summary(start_date: Optional[str] = None, end_date: Optional[str] = None) -> bool:
+    """
+    Regenerates the daily sales summaries from the order tables, one month per transaction.
+    
+    Args:
+        start_date: First day to rebuild, or None for all history
+        end_date: Last day to rebuild, inclusive, or None for all history
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        rows = 0
+        for month_start, month_end in sales_summary.get_rebuild_ranges(get_db_connection(), start_date, end_date):
+            with write_transaction() as conn:
+                rows += sales_summary.rebuild_sales_summaries(conn, month_start, month_end)
+        print(f"Rebuilt {rows} daily sales summary rows.")
+        return True
+    except sqlite3.Error as e:
+        print(f"Error rebuilding sales summaries: {e}")
+        return False
+
+def get_sales_analysis(start: str, end: str, bucket: str, group_by: List[str]) -> List[Dict[str, Any]]:
+    """
+    Builds a sales analysis report from the order lines (slow on large ranges: call it from submit_db_task).
+    
+    The orders and their lines are read in chunks from a single read
+    transaction, so a sale committed meanwhile cannot be half counted.
+    
+    Args:
+        start: First instant, inclusive ("YYYY-MM-DD")
+        end: End instant, exclusive
+        bucket: Time bucket from reporting_engine.REPORT_BUCKETS (hour, day, week, month)
+        group_by: Groupings from reporting_engine.REPORT_GROUPINGS (category, location)
+        
+    Returns:
+        The report rows of reporting_engine.build_report()
+    """
+    # Imported on first use: NumPy adds about 100 ms to application startup
+    from db import reporting_engine
+    with db_connection() as conn:
+        return reporting_engine.build_report(conn, start, end, bucket, group_by)
+
+# BMS_QUERY_STATS=1 turns query statistics on from startup
+if os.environ.get(QUERY_STATS_ENV) == "1":
+    enable_query_stats(threshold_from_environment())
 
 # Example of how to add default users (run this once manually or via a setup script)
 if __name__ == "__main__":
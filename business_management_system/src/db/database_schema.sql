@@ -25,6 +25,7 @@ CREATE TABLE IF NOT EXISTS Products (
     name TEXT NOT NULL UNIQUE,
     description TEXT,
     price REAL NOT NULL CHECK(price >= 0),
+    cost_price REAL NOT NULL DEFAULT 0.0 CHECK(cost_price >= 0),
     category_id INTEGER NOT NULL,
     image_path TEXT,
     current_stock INTEGER DEFAULT 0 CHECK(current_stock >= 0),
@@ -64,6 +65,7 @@ CREATE TABLE IF NOT EXISTS OrderItems (
     quantity INTEGER NOT NULL CHECK(quantity > 0),
     price_at_order REAL NOT NULL CHECK(price_at_order >= 0),
     subtotal REAL NOT NULL CHECK(subtotal >= 0),
+    cost_at_order REAL NOT NULL DEFAULT 0.0 CHECK(cost_at_order >= 0),
     FOREIGN KEY (order_id) REFERENCES Orders (order_id) ON DELETE CASCADE,
     FOREIGN KEY (product_id) REFERENCES Products (product_id) ON DELETE RESTRICT
 );
@@ -115,3 +117,101 @@ CREATE TABLE IF NOT EXISTS LicenseValidation (
     validation_method TEXT NOT NULL,
     error_message TEXT
 );
+
+-- CatalogChanges Table - Product ids changed since a catalog cache last loaded (filled by triggers)
+CREATE TABLE IF NOT EXISTS CatalogChanges (
+    change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product_id INTEGER
+);
+
+-- A NULL product_id means the whole catalog must be reloaded (category changes)
+CREATE TRIGGER IF NOT EXISTS trg_products_insert_catalog AFTER INSERT ON Products
+BEGIN
+    INSERT INTO CatalogChanges (product_id) VALUES (NEW.product_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_update_catalog AFTER UPDATE ON Products
+BEGIN
+    INSERT INTO CatalogChanges (product_id) VALUES (NEW.product_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_delete_catalog AFTER DELETE ON Products
+BEGIN
+    INSERT INTO CatalogChanges (product_id) VALUES (OLD.product_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_categories_insert_catalog AFTER INSERT ON Categories
+BEGIN
+    INSERT INTO CatalogChanges (product_id) VALUES (NULL);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_categories_update_catalog AFTER UPDATE ON Categories
+BEGIN
+    INSERT INTO CatalogChanges (product_id) VALUES (NULL);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_categories_delete_catalog AFTER DELETE ON Categories
+BEGIN
+    INSERT INTO CatalogChanges (product_id) VALUES (NULL);
+END;
+
+-- Keeps the last 10000 changes whether or not a catalog cache is running; a
+-- cache or remote catalog that fell further behind reloads in full
+CREATE TRIGGER IF NOT EXISTS trg_catalogchanges_prune AFTER INSERT ON CatalogChanges
+BEGIN
+    DELETE FROM CatalogChanges WHERE change_id <= NEW.change_id - 10000;
+END;
+
+-- DailySales Table - Paid sales per day, product, category, payment method and location,
+-- kept current by the checkout transaction (sale_date is the local date of payment)
+CREATE TABLE IF NOT EXISTS DailySales (
+    sale_date TEXT NOT NULL,
+    product_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    payment_method TEXT NOT NULL,
+    location_id INTEGER NOT NULL,
+    line_count INTEGER NOT NULL DEFAULT 0,
+    units INTEGER NOT NULL DEFAULT 0,
+    revenue REAL NOT NULL DEFAULT 0.0,
+    PRIMARY KEY (sale_date, product_id, category_id, payment_method, location_id)
+) WITHOUT ROWID;
+
+-- DailyOrderTotals Table - Paid orders per day, payment method and location (for ticket averages)
+CREATE TABLE IF NOT EXISTS DailyOrderTotals (
+    sale_date TEXT NOT NULL,
+    payment_method TEXT NOT NULL,
+    location_id INTEGER NOT NULL,
+    order_count INTEGER NOT NULL DEFAULT 0,
+    revenue REAL NOT NULL DEFAULT 0.0,
+    PRIMARY KEY (sale_date, payment_method, location_id)
+) WITHOUT ROWID;
+
+-- InventoryCheckpoints Table - Stock of every product at a day or month close (checkpoint_time,
+-- exclusive: the InventoryLog rows logged before it), so point-in-time stock replays only the log after it
+CREATE TABLE IF NOT EXISTS InventoryCheckpoints (
+    checkpoint_time TEXT NOT NULL,
+    product_id INTEGER NOT NULL,
+    stock_level INTEGER NOT NULL,
+    PRIMARY KEY (checkpoint_time, product_id)
+) WITHOUT ROWID;
+
+-- InventoryCheckpointRuns Table - Completed checkpoints; rows of an unfinished checkpoint are never read
+CREATE TABLE IF NOT EXISTS InventoryCheckpointRuns (
+    checkpoint_time TEXT PRIMARY KEY,
+    period TEXT NOT NULL CHECK(period IN ('day', 'month')),
+    product_count INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Indexes for the columns the dashboards filter and sort on
+CREATE INDEX IF NOT EXISTS idx_auditlog_timestamp ON AuditLog (timestamp);
+CREATE INDEX IF NOT EXISTS idx_licensevalidation_date ON LicenseValidation (validation_date);
+CREATE INDEX IF NOT EXISTS idx_orders_status_order_time ON Orders (status, order_time);
+CREATE INDEX IF NOT EXISTS idx_orders_order_time ON Orders (order_time);
+CREATE INDEX IF NOT EXISTS idx_orders_status_payment_time ON Orders (status, payment_time);
+CREATE INDEX IF NOT EXISTS idx_orderitems_order_id ON OrderItems (order_id);
+CREATE INDEX IF NOT EXISTS idx_orderitems_product_id ON OrderItems (product_id);
+CREATE INDEX IF NOT EXISTS idx_inventorylog_product_log_time ON InventoryLog (product_id, log_time);
+CREATE INDEX IF NOT EXISTS idx_inventorylog_order_item_id ON InventoryLog (order_item_id);
+CREATE INDEX IF NOT EXISTS idx_inventorylog_log_time ON InventoryLog (log_time);
+CREATE INDEX IF NOT EXISTS idx_products_category_id ON Products (category_id);
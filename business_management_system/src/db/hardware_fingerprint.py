@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+import hashlib
+import json
+import os
+import platform
+import threading
+from typing import Dict, Optional
+
+UNKNOWN_HARDWARE_ID = "unknown_hardware"
+
+def read_system_uuid() -> str:
+    """
+    Gets the system UUID from Windows WMI or Linux system.
+
+    Returns:
+        System UUID string
+    """
+    try:
+        if platform.system() == "Windows":
+            try:
+                import wmi
+            except ImportError:
+                # WMI not available
+                return "unknown"
+
+            # WMI needs COM initialised on every thread other than the main one
+            com_initialized = False
+            if threading.current_thread() is not threading.main_thread():
+                try:
+                    import pythoncom
+                    pythoncom.CoInitialize()
+                    com_initialized = True
+                except ImportError:
+                    pass
+            try:
+                c = wmi.WMI()
+                for system in c.Win32_ComputerSystemProduct():
+                    return system.UUID
+            finally:
+                if com_initialized:
+                    pythoncom.CoUninitialize()
+        elif platform.system() == "Linux":
+            # Try to get machine-id on Linux
+            if os.path.exists('/etc/machine-id'):
+                with open('/etc/machine-id', 'r') as f:
+                    return f.read().strip()
+        return "unknown"
+    except:
+        return "unknown"
+
+def collect_components() -> Dict[str, str]:
+    """
+    Probes the system components that make up the hardware fingerprint.
+
+    Returns:
+        Dictionary of component name to value
+    """
+    return {
+        "processor": platform.processor(),
+        "machine": platform.machine(),
+        "node": platform.node(),
+        "system": platform.system(),
+        "system_uuid": read_system_uuid()
+    }
+
+def hash_components(components: Dict[str, str]) -> str:
+    """Creates a stable string representation of the components and hashes it."""
+    hardware_str = json.dumps(components, sort_keys=True)
+    return hashlib.sha256(hardware_str.encode()).hexdigest()
+
+class HardwareFingerprint:
+    """
+    Process-wide cache of the hardware fingerprint.
+
+    The platform probes (WMI on Windows, processor lookup, machine-id) run at
+    most once per process. precompute() starts them on a background thread so
+    they overlap with window construction; callers that need the value earlier
+    simply wait for the computation in progress. Failed probes are not cached.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._components: Optional[Dict[str, str]] = None
+        self._hardware_id: Optional[str] = None
+
+    def get_hardware_id(self) -> str:
+        """
+        Returns the hardware identifier, computing it on first use.
+
+        Returns:
+            A string representing the hardware identifier
+        """
+        if self._hardware_id is not None:
+            return self._hardware_id
+        with self._lock:
+            if self._hardware_id is None:
+                try:
+                    components = collect_components()
+                    self._hardware_id = hash_components(components)
+                    self._components = components
+                except Exception as e:
+                    print(f"Error generating hardware ID: {e}")
+                    return UNKNOWN_HARDWARE_ID
+            return self._hardware_id
+
+    def get_components(self) -> Dict[str, str]:
+        """Returns a copy of the component breakdown behind the fingerprint."""
+        self.get_hardware_id()
+        return dict(self._components or {})
+
+    def get_system_uuid(self) -> str:
+        """Returns the system UUID component of the fingerprint."""
+        return self.get_components().get("system_uuid", "unknown")
+
+    def precompute(self) -> threading.Thread:
+        """
+        Starts computing the fingerprint on a background thread.
+
+        Returns:
+            The started daemon thread
+        """
+        thread = threading.Thread(target=self.get_hardware_id, name="HardwareFingerprint", daemon=True)
+        thread.start()
+        return thread
+
+    def is_cached(self) -> bool:
+        """Returns True once the fingerprint has been computed."""
+        return self._hardware_id is not None
+
+    def reset(self) -> None:
+        """Discards the cached fingerprint (used by benchmarks to measure a cold computation)."""
+        with self._lock:
+            self._components = None
+            self._hardware_id = None
+
+fingerprint = HardwareFingerprint()
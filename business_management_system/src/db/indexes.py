@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+import os
+import re
+import sqlite3
+from typing import Dict, List, Tuple
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "database_schema.sql")
+
+# Queries run by the dashboards, with representative parameters. Each one must
+# be answered through an index rather than a full table scan.
+HOT_QUERIES: Dict[str, Tuple[str, tuple]] = {
+    "recent_audit_logs": ("""
+        SELECT a.log_id, a.action_type, a.action_details, a.timestamp, u.username
+        FROM AuditLog a
+        LEFT JOIN Users u ON a.user_id = u.user_id
+        ORDER BY a.timestamp DESC
+        LIMIT 100
+    """, ()),
+    "audit_log_page": ("""
+        SELECT a.log_id, a.timestamp, u.username, a.action_type, a.action_details
+        FROM AuditLog a
+        LEFT JOIN Users u ON a.user_id = u.user_id
+        WHERE (a.timestamp, a.log_id) < (?, ?)
+        ORDER BY a.timestamp DESC, a.log_id DESC
+        LIMIT ?
+    """, ("2025-02-01 00:00:00", 1000, 200)),
+    "orders_by_status_and_time": ("""
+        SELECT order_id, location_id, total_amount, order_time
+        FROM Orders
+        WHERE status = ? AND order_time >= ? AND order_time < ?
+        ORDER BY order_time
+    """, ("Paid", "2025-01-01", "2025-02-01")),
+    "paid_orders_by_payment_time": ("""
+        SELECT o.order_id, o.location_id, o.total_amount
+        FROM Orders o
+        WHERE o.status = 'Paid' AND o.payment_time >= ? AND o.payment_time < date(?, '+1 day')
+    """, ("2025-01-01", "2025-01-01")),
+    "orders_by_time": ("""
+        SELECT order_id, status, total_amount
+        FROM Orders
+        WHERE order_time >= ? AND order_time < ?
+    """, ("2025-01-01", "2025-02-01")),
+    "order_items_by_order": ("""
+        SELECT order_item_id, product_id, quantity, price_at_order, subtotal
+        FROM OrderItems
+        WHERE order_id = ?
+    """, (1,)),
+    "sales_summary_by_range": ("""
+        SELECT ds.product_id, SUM(ds.units), SUM(ds.revenue)
+        FROM DailySales ds
+        WHERE ds.sale_date BETWEEN ? AND ?
+        GROUP BY ds.product_id
+    """, ("2025-01-01", "2025-01-31")),
+    "order_totals_by_range": ("""
+        SELECT ds.payment_method, SUM(ds.order_count), SUM(ds.revenue)
+        FROM DailyOrderTotals ds
+        WHERE ds.sale_date BETWEEN ? AND ?
+        GROUP BY ds.payment_method
+    """, ("2025-01-01", "2025-01-31")),
+    "inventory_log_by_product": ("""
+        SELECT change_quantity, new_stock_level, reason, log_time
+        FROM InventoryLog
+        WHERE product_id = ? AND log_time <= ?
+        ORDER BY log_time DESC
+    """, (1, "2025-02-01")),
+    "inventory_log_since_checkpoint": ("""
+        SELECT product_id, SUM(change_quantity)
+        FROM InventoryLog
+        WHERE log_time >= ? AND log_time < ?
+        GROUP BY product_id
+    """, ("2025-02-01 00:00:00", "2025-02-14 00:00:00")),
+    "inventory_checkpoint": ("""
+        SELECT product_id, stock_level
+        FROM InventoryCheckpoints
+        WHERE checkpoint_time = ?
+    """, ("2025-02-01 00:00:00",)),
+    "report_paid_orders": ("""
+        SELECT order_id, CAST(strftime('%s', order_time) AS INTEGER), location_id
+        FROM Orders
+        WHERE status = 'Paid' AND order_time >= ? AND order_time < ?
+        ORDER BY order_id
+    """, ("2025-01-01", "2025-02-01")),
+    "report_order_items": ("""
+        SELECT order_id, product_id, quantity, subtotal, cost_at_order * quantity
+        FROM OrderItems
+        WHERE order_id BETWEEN ? AND ?
+    """, (1, 50000)),
+}
+
+_INDEX_PATTERN = re.compile(r"CREATE\s+INDEX\s+IF\s+NOT\s+EXISTS\s+[^;]+;", re.IGNORECASE)
+
+def get_index_statements() -> List[str]:
+    """
+    Reads the CREATE INDEX statements from database_schema.sql.
+
+    The schema file is the single source of the index set, for new and
+    existing databases alike.
+    """
+    with open(SCHEMA_PATH, "r") as f:
+        return _INDEX_PATTERN.findall(f.read())
+
+def ensure_indexes(conn: sqlite3.Connection) -> None:
+    """
+    Creates any missing indexes from the schema on an existing database.
+
+    Args:
+        conn: Open connection to the database
+    """
+    for statement in get_index_statements():
+        conn.execute(statement)
+
+def explain_query_plan(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> List[str]:
+    """
+    Returns the detail lines of EXPLAIN QUERY PLAN for a query.
+
+    Args:
+        conn: Open connection to the database
+        sql: Query to explain
+        params: Query parameters
+
+    Returns:
+        List of plan detail strings
+    """
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+
+def is_full_scan(detail: str) -> bool:
+    """Returns True if a plan line reads a whole table without an index."""
+    return detail.startswith("SCAN ") and "USING" not in detail
+
+def find_table_scans(conn: sqlite3.Connection) -> Dict[str, List[str]]:
+    """
+    Runs EXPLAIN QUERY PLAN on every hot query.
+
+    Args:
+        conn: Open connection to the database
+
+    Returns:
+        Dictionary of query name to the plan of each query that falls back to a full scan
+    """
+    scans = {}
+    for name, (sql, params) in HOT_QUERIES.items():
+        plan = explain_query_plan(conn, sql, params)
+        if any(is_full_scan(detail) for detail in plan):
+            scans[name] = plan
+    return scans
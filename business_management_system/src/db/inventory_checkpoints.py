@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+import datetime
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from db import database_manager
+
+CHECKPOINT_PERIODS = ("day", "month")
+CHECKPOINT_SETTLE_SECONDS = 60      # A close is only written once no write stamped before it can still commit
+CHECKPOINT_DAYS_KEPT = 35           # Day closes kept; month closes are kept for good
+CHECKPOINT_BATCH_PRODUCTS = 5000    # Products written per transaction
+CHECKPOINT_INTERVAL = 3600          # Seconds between runs of a long-running process
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Stock of each product at :at. A product in the checkpoint at :checkpoint
+# ('' for none) adds its InventoryLog rows in [checkpoint, at); any other
+# product (no checkpoint yet, or created since) takes current_stock minus the
+# rows logged since at, so stock a product was created with, which has no log
+# row, is counted. Both probe idx_inventorylog_product_log_time.
+STOCK_AT_SQL = """
+    SELECT p.product_id, p.name, p.price, p.cost_price,
+           COALESCE((SELECT c.stock_level
+                            + COALESCE((SELECT SUM(l.change_quantity) FROM InventoryLog l
+                                        WHERE l.product_id = p.product_id
+                                          AND l.log_time >= :checkpoint AND l.log_time < :at), 0)
+                     FROM InventoryCheckpoints c
+                     WHERE c.checkpoint_time = :checkpoint AND c.product_id = p.product_id),
+                    p.current_stock - COALESCE((SELECT SUM(l.change_quantity) FROM InventoryLog l
+                                                WHERE l.product_id = p.product_id AND l.log_time >= :at), 0))
+           AS stock_level
+    FROM Products p
+"""
+
+# The same for all products at once: the checkpointed products take one pass
+# over the log rows since the checkpoint (idx_inventorylog_log_time) instead
+# of a probe each; only the others are probed
+STOCK_LEVELS_SQL = """
+    SELECT p.product_id, p.name, p.price, p.cost_price,
+           CASE WHEN c.product_id IS NOT NULL THEN c.stock_level + COALESCE(t.change_quantity, 0)
+                ELSE p.current_stock - COALESCE((SELECT SUM(l.change_quantity) FROM InventoryLog l
+                                                 WHERE l.product_id = p.product_id AND l.log_time >= :at), 0)
+           END AS stock_level
+    FROM Products p
+    LEFT JOIN InventoryCheckpoints c ON c.checkpoint_time = :checkpoint AND c.product_id = p.product_id
+    LEFT JOIN (SELECT product_id, SUM(change_quantity) AS change_quantity FROM InventoryLog
+               WHERE log_time >= :checkpoint AND log_time < :at GROUP BY product_id) t
+        ON t.product_id = p.product_id
+"""
+
+def _instant(value: str) -> str:
+    """Normalizes "YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS" to the InventoryLog log_time format."""
+    return datetime.datetime.fromisoformat(value).strftime(TIME_FORMAT)
+
+def _nearest_checkpoint(conn: sqlite3.Connection, at: str) -> str:
+    """Returns the latest completed checkpoint at or before at, or '' if there is none."""
+    row = conn.execute(
+        "SELECT MAX(checkpoint_time) FROM InventoryCheckpointRuns WHERE checkpoint_time <= ?", (at,)
+    ).fetchone()
+    return row[0] or ""
+
+def create_checkpoint(checkpoint_time: str, period: str = "day",
+                      batch_size: int = CHECKPOINT_BATCH_PRODUCTS) -> int:
+    """
+    Writes the stock of every product as of a day or month close.
+
+    Each product's level is the previous checkpoint's plus the InventoryLog
+    rows logged since, so only that stretch of the log is read; the first
+    checkpoint, and products created since the previous one, start from
+    current_stock minus the rows logged after the close. Products are
+    written in batches, each in its own short write transaction; the
+    checkpoint is used by queries only once its InventoryCheckpointRuns row
+    is written after the last batch, and an interrupted run is simply redone.
+
+    Args:
+        checkpoint_time: The close, exclusive ("YYYY-MM-DD" for midnight)
+        period: "day" or "month"
+        batch_size: Products per transaction
+
+    Returns:
+        Number of products written, 0 if the checkpoint already existed
+
+    Raises:
+        ValueError: If period is unknown or the close is less than
+            CHECKPOINT_SETTLE_SECONDS in the past
+    """
+    if period not in CHECKPOINT_PERIODS:
+        raise ValueError(f"Unknown checkpoint period: {period}")
+    checkpoint_time = _instant(checkpoint_time)
+    settled = datetime.datetime.now() - datetime.timedelta(seconds=CHECKPOINT_SETTLE_SECONDS)
+    if checkpoint_time > settled.strftime(TIME_FORMAT):
+        raise ValueError(f"Cannot close {checkpoint_time} yet: writes stamped before it may still commit.")
+
+    conn = database_manager.get_db_connection()
+    if conn.execute("SELECT 1 FROM InventoryCheckpointRuns WHERE checkpoint_time = ?", (checkpoint_time,)).fetchone():
+        return 0
+    previous = _nearest_checkpoint(conn, checkpoint_time)
+
+    written, last_id = 0, 0
+    while True:
+        product_ids = [row[0] for row in conn.execute(
+            "SELECT product_id FROM Products WHERE product_id > ? ORDER BY product_id LIMIT ?", (last_id, batch_size)
+        ).fetchall()]
+        if not product_ids:
+            break
+        with database_manager.write_transaction() as write_conn:
+            write_conn.execute(f"""
+                INSERT OR REPLACE INTO InventoryCheckpoints (checkpoint_time, product_id, stock_level)
+                SELECT :checkpoint_time, product_id, stock_level
+                FROM ({STOCK_AT_SQL} WHERE p.product_id BETWEEN :first AND :last)
+            """, {"checkpoint_time": checkpoint_time, "checkpoint": previous, "at": checkpoint_time,
+                  "first": product_ids[0], "last": product_ids[-1]})
+        written += len(product_ids)
+        last_id = product_ids[-1]
+
+    with database_manager.write_transaction() as write_conn:
+        write_conn.execute(
+            "INSERT INTO InventoryCheckpointRuns (checkpoint_time, period, product_count) VALUES (?, ?, ?)",
+            (checkpoint_time, period, written)
+        )
+    return written
+
+def _month_starts(first: datetime.datetime, last: datetime.datetime) -> List[datetime.datetime]:
+    """Month starts after first, up to and including last."""
+    starts = []
+    month = datetime.datetime(first.year + first.month // 12, first.month % 12 + 1, 1)
+    while month <= last:
+        starts.append(month)
+        month = datetime.datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+    return starts
+
+def close_inventory_periods(now: Optional[datetime.datetime] = None) -> Dict[str, int]:
+    """
+    Writes the checkpoints missing since the first InventoryLog row and prunes old day closes.
+
+    Every month start gets a month checkpoint and each of the last
+    CHECKPOINT_DAYS_KEPT midnights a day checkpoint, oldest first, so each
+    new checkpoint only replays the log since the one before it. Safe to
+    interrupt; the next run picks up where this one stopped.
+
+    Args:
+        now: Current local time (for tests; defaults to now)
+
+    Returns:
+        Dictionary with the months and days closed and the day closes pruned
+    """
+    now = now or datetime.datetime.now()
+    settled = now - datetime.timedelta(seconds=CHECKPOINT_SETTLE_SECONDS)
+    oldest_day = datetime.datetime.combine(settled.date() - datetime.timedelta(days=CHECKPOINT_DAYS_KEPT),
+                                           datetime.time())
+    closed = {"months": 0, "days": 0, "pruned": 0}
+    try:
+        conn = database_manager.get_db_connection()
+        first_log = conn.execute("SELECT MIN(log_time) FROM InventoryLog").fetchone()[0]
+        if first_log is None:
+            return closed
+        first = datetime.datetime.fromisoformat(first_log)
+        existing = {row[0] for row in conn.execute("SELECT checkpoint_time FROM InventoryCheckpointRuns")}
+
+        closes = {start: "month" for start in _month_starts(first, settled)}
+        day = max(oldest_day, datetime.datetime.combine(first.date(), datetime.time()))
+        while day <= settled:
+            closes.setdefault(day, "day")
+            day += datetime.timedelta(days=1)
+        for close, period in sorted(closes.items()):
+            if close.strftime(TIME_FORMAT) not in existing and create_checkpoint(close.strftime(TIME_FORMAT), period):
+                closed["months" if period == "month" else "days"] += 1
+
+        for (checkpoint_time,) in conn.execute(
+                "SELECT checkpoint_time FROM InventoryCheckpointRuns WHERE period = 'day' AND checkpoint_time < ?",
+                (oldest_day.strftime(TIME_FORMAT),)).fetchall():
+            with database_manager.write_transaction() as write_conn:
+                write_conn.execute("DELETE FROM InventoryCheckpointRuns WHERE checkpoint_time = ?", (checkpoint_time,))
+                write_conn.execute("DELETE FROM InventoryCheckpoints WHERE checkpoint_time = ?", (checkpoint_time,))
+            closed["pruned"] += 1
+        if closed["months"] or closed["days"]:
+            print(f"Closed inventory periods: {closed}")
+    except sqlite3.Error as e:
+        print(f"Error writing inventory checkpoints: {e}")
+    return closed
+
+def start_inventory_checkpoints(interval: Optional[float] = None) -> threading.Thread:
+    """
+    Starts close_inventory_periods() on a background thread.
+
+    Args:
+        interval: Seconds between runs, or None to run once (e.g. at application startup)
+
+    Returns:
+        The started daemon thread
+    """
+    def run():
+        while True:
+            close_inventory_periods()
+            if interval is None:
+                break
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="InventoryCheckpoints", daemon=True)
+    thread.start()
+    return thread
+
+def get_stock_at(product_id: int, at: str) -> Optional[int]:
+    """
+    Gets a product's stock at a point in time.
+
+    Args:
+        product_id: ID of the product
+        at: Instant, exclusive ("YYYY-MM-DD" for the start of that day, so
+            the next day's date gives the stock at the end of a day)
+
+    Returns:
+        Units in stock after every change logged before at, or None if the
+        product is unknown or an error occurred
+    """
+    try:
+        at = _instant(at)
+        with database_manager.db_connection() as conn:
+            row = conn.execute(f"{STOCK_AT_SQL} WHERE p.product_id = :product_id",
+                               {"checkpoint": _nearest_checkpoint(conn, at), "at": at,
+                                "product_id": product_id}).fetchone()
+        return row["stock_level"] if row else None
+    except sqlite3.Error as e:
+        print(f"Error getting stock at {at}: {e}")
+        return None
+
+def get_stock_levels_at(at: str) -> List[Dict[str, Any]]:
+    """
+    Gets every product's stock at a point in time.
+
+    Args:
+        at: Instant, exclusive ("YYYY-MM-DD" for the start of that day)
+
+    Returns:
+        List of dictionaries with product_id, name, price, cost_price and stock_level
+    """
+    try:
+        at = _instant(at)
+        with database_manager.db_connection() as conn:
+            rows = conn.execute(f"{STOCK_LEVELS_SQL} ORDER BY p.product_id",
+                                {"checkpoint": _nearest_checkpoint(conn, at), "at": at}).fetchall()
+        return [dict(row) for row in rows]
+    except sqlite3.Error as e:
+        print(f"Error getting stock levels at {at}: {e}")
+        return []
+
+def get_stock_valuation(at: str) -> Optional[Dict[str, Any]]:
+    """
+    Values the stock held at a point in time, e.g. a month end.
+
+    Units are those of get_stock_levels_at(); they are valued at the
+    products' current cost and sale prices.
+
+    Args:
+        at: Instant, exclusive ("YYYY-MM-01" for the end of the previous month)
+
+    Returns:
+        Dictionary with at, checkpoint (the close replayed from, '' if none),
+        units, cost_value and retail_value, or None on error
+    """
+    try:
+        at = _instant(at)
+        with database_manager.db_connection() as conn:
+            checkpoint = _nearest_checkpoint(conn, at)
+            row = conn.execute(f"""
+                SELECT COALESCE(SUM(stock_level), 0) AS units,
+                       ROUND(COALESCE(SUM(stock_level * cost_price), 0), 2) AS cost_value,
+                       ROUND(COALESCE(SUM(stock_level * price), 0), 2) AS retail_value
+                FROM ({STOCK_LEVELS_SQL})
+            """, {"checkpoint": checkpoint, "at": at}).fetchone()
+        return dict(row, at=at, checkpoint=checkpoint)
+    except sqlite3.Error as e:
+        print(f"Error valuing stock at {at}: {e}")
+        return None
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+from typing import Iterable, List
+
+# Key used by the license format. Each character of the payload is shifted by
+# the matching key character (mod 256) and the result is stored as hex.
+LICENSE_CODEC_KEY = "BusinessManagementSystemSecretKey"
+
+_KEY_BYTES = LICENSE_CODEC_KEY.encode("latin-1")
+_KEY_LENGTH = len(_KEY_BYTES)
+
+# One 256-entry translation table per key position
+_ENCODE_TABLES = [bytes((value + k) % 256 for value in range(256)) for k in _KEY_BYTES]
+_DECODE_TABLES = [bytes((value - k) % 256 for value in range(256)) for k in _KEY_BYTES]
+
+def _to_bytes(text: str) -> bytes:
+    """
+    Converts text to one byte per character.
+
+    Characters above U+00FF keep only their low byte, which is what the
+    original character-by-character implementation effectively stored.
+    """
+    try:
+        return text.encode("latin-1")
+    except UnicodeEncodeError:
+        return bytes(ord(char) & 0xFF for char in text)
+
+def _apply_keystream(data: bytes, tables: List[bytes]) -> bytes:
+    """Applies the per-position tables to data, translating every key-length stride at once."""
+    out = bytearray(len(data))
+    for position, table in enumerate(tables):
+        out[position::_KEY_LENGTH] = data[position::_KEY_LENGTH].translate(table)
+    return bytes(out)
+
+def encode_license(text: str) -> str:
+    """
+    Encrypts a license payload into the hex license format.
+
+    Args:
+        text: Plain-text payload (normally the license JSON)
+
+    Returns:
+        Lower-case hex string
+    """
+    return _apply_keystream(_to_bytes(text), _ENCODE_TABLES).hex()
+
+def decode_license(encrypted_hex: str) -> str:
+    """
+    Decrypts a hex license string produced by encode_license() or simple_encrypt().
+
+    Args:
+        encrypted_hex: Encrypted hex string
+
+    Returns:
+        Decrypted payload
+
+    Raises:
+        ValueError: If the input is not valid hex
+    """
+    return _apply_keystream(bytes.fromhex(encrypted_hex), _DECODE_TABLES).decode("latin-1")
+
+def _apply_keystream_bulk(payloads: List[bytes], tables: List[bytes]) -> List[bytes]:
+    """
+    Applies the keystream to many payloads in a single pass.
+
+    Each payload is padded to a multiple of the key length so the key restarts
+    at the beginning of every payload, as it does for a single call.
+    """
+    buffer = bytearray()
+    spans = []
+    for data in payloads:
+        spans.append((len(buffer), len(data)))
+        buffer += data
+        buffer += bytes(-len(data) % _KEY_LENGTH)
+    out = _apply_keystream(bytes(buffer), tables)
+    return [out[start:start + length] for start, length in spans]
+
+def encode_licenses(texts: Iterable[str]) -> List[str]:
+    """
+    Encrypts many license payloads in one call.
+
+    Args:
+        texts: Plain-text payloads
+
+    Returns:
+        Hex license strings in the same order
+    """
+    return [data.hex() for data in _apply_keystream_bulk([_to_bytes(text) for text in texts], _ENCODE_TABLES)]
+
+def decode_licenses(encrypted_hexes: Iterable[str]) -> List[str]:
+    """
+    Decrypts many hex license strings in one call.
+
+    Args:
+        encrypted_hexes: Encrypted hex strings
+
+    Returns:
+        Decrypted payloads in the same order
+
+    Raises:
+        ValueError: If any input is not valid hex
+    """
+    payloads = [bytes.fromhex(value) for value in encrypted_hexes]
+    return [data.decode("latin-1") for data in _apply_keystream_bulk(payloads, _DECODE_TABLES)]
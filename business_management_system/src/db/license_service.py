@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# How long a successful license check is trusted before it is repeated
+LICENSE_CACHE_TTL_SECONDS = 3600
+
+class LicenseState:
+    """
+    Caches the result of the full license check in memory.
+
+    The full check (hardware fingerprint, SystemConfig lookup, validation log
+    rows) runs once and its result is reused until the TTL expires or the
+    license fields in SystemConfig change. Reading the SystemConfig signature is
+    a single-row query, so a cached check costs one small SELECT and writes
+    nothing. Failed checks are never cached.
+    """
+
+    def __init__(self, validate: Callable[[], bool], read_signature: Callable[[], Optional[tuple]],
+                 ttl_seconds: float = LICENSE_CACHE_TTL_SECONDS):
+        self._validate = validate
+        self._read_signature = read_signature
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._signature: Optional[tuple] = None
+        self._validated_at: Optional[float] = None
+        self._stats = {"cache_hits": 0, "full_checks": 0, "failed_checks": 0}
+
+    def is_valid(self, force: bool = False) -> bool:
+        """
+        Returns whether the license is valid, running the full check only when needed.
+
+        Args:
+            force: Ignore the cached result and run the full check
+
+        Returns:
+            True if the license is valid, False otherwise
+        """
+        signature = self._read_signature()
+        with self._lock:
+            if not force and self._is_fresh(signature):
+                self._stats["cache_hits"] += 1
+                return True
+
+        valid = self._validate()
+        with self._lock:
+            self._stats["full_checks"] += 1
+            if valid:
+                self._signature = signature
+                self._validated_at = time.monotonic()
+            else:
+                self._stats["failed_checks"] += 1
+                self._signature = None
+                self._validated_at = None
+        return valid
+
+    def invalidate(self) -> None:
+        """Discards the cached result so the next check runs in full."""
+        with self._lock:
+            self._signature = None
+            self._validated_at = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns cache counters and the age of the cached result in seconds."""
+        with self._lock:
+            age = None if self._validated_at is None else time.monotonic() - self._validated_at
+            return dict(self._stats, cached_result_age=age, ttl_seconds=self.ttl_seconds)
+
+    def _is_fresh(self, signature: Optional[tuple]) -> bool:
+        return (
+            self._validated_at is not None
+            and signature is not None
+            and signature == self._signature
+            and time.monotonic() - self._validated_at < self.ttl_seconds
+        )
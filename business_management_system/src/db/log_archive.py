@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+import datetime
+import glob
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from db import database_manager
+
+# Retention configuration. BMS_LOG_RETENTION_DAYS in the environment overrides
+# how long AuditLog and LicenseValidation rows stay in the live database.
+LOG_RETENTION_DAYS_ENV = "BMS_LOG_RETENTION_DAYS"
+LOG_RETENTION_DAYS = 365
+
+ARCHIVE_DIRECTORY_NAME = "archives"
+ARCHIVE_BATCH_SIZE = 5000      # Rows moved (archived and deleted) per live transaction
+ARCHIVE_BLOCK_ROWS = 1000      # Rows compressed together into one archive block
+ARCHIVE_VACUUM_PAGES = 1000    # Free pages returned to the file system per vacuum step
+
+class ArchivedTable:
+    """
+    How one log table is read from the live database and stored in the archives.
+
+    select_sql must return the row id first and the row time second; archive
+    blocks are ordered on (time, id), the same key the log viewer pages on.
+    """
+
+    def __init__(self, name: str, id_column: str, time_column: str, select_sql: str):
+        self.name = name
+        self.id_column = id_column
+        self.time_column = time_column
+        self.select_sql = select_sql
+        self.blocks_table = f"{name}Blocks"
+
+AUDIT_LOG = ArchivedTable("AuditLog", "log_id", "timestamp", """
+    SELECT a.log_id, a.timestamp, u.username, a.action_type, a.action_details, a.user_id
+    FROM AuditLog a
+    LEFT JOIN Users u ON a.user_id = u.user_id
+    WHERE a.log_id < ? AND a.timestamp < ?
+    ORDER BY a.log_id
+    LIMIT ?
+""")
+
+LICENSE_VALIDATION = ArchivedTable("LicenseValidation", "validation_id", "validation_date", """
+    SELECT validation_id, validation_date, is_successful, validation_method, error_message
+    FROM LicenseValidation
+    WHERE validation_id < ? AND validation_date < ?
+    ORDER BY validation_id
+    LIMIT ?
+""")
+
+ARCHIVED_TABLES = [AUDIT_LOG, LICENSE_VALIDATION]
+
+def get_retention_days() -> int:
+    """Returns the configured log retention in days."""
+    value = os.environ.get(LOG_RETENTION_DAYS_ENV, "")
+    return int(value) if value.isdigit() else LOG_RETENTION_DAYS
+
+def get_archive_directory() -> str:
+    """Returns the directory holding the monthly archive files, next to the live database."""
+    database_path = database_manager.get_connection_manager().database_path
+    return os.path.join(os.path.dirname(os.path.abspath(database_path)), ARCHIVE_DIRECTORY_NAME)
+
+def list_archive_files() -> List[str]:
+    """Returns the monthly archive files, newest month first."""
+    return sorted(glob.glob(os.path.join(get_archive_directory(), "logs_*.db")), reverse=True)
+
+def _archive_path(month: str) -> str:
+    return os.path.join(get_archive_directory(), f"logs_{month.replace('-', '_')}.db")
+
+def _archive_month(path: str) -> str:
+    """Returns the "YYYY-MM" month stored in an archive file."""
+    return os.path.basename(path)[len("logs_"):-len(".db")].replace("_", "-")
+
+def _compress_rows(rows: List[tuple]) -> bytes:
+    return zlib.compress(json.dumps(rows, separators=(",", ":")).encode("utf-8"), 9)
+
+def _decompress_rows(payload: bytes) -> List[list]:
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+def _row_key(row) -> Tuple[str, int]:
+    return (row[1], row[0])
+
+def _write_archive(month: str, table: ArchivedTable, rows: List[tuple]) -> int:
+    """
+    Appends rows to a month's archive file as compressed blocks.
+
+    Rows already in the file are skipped, so repeating a batch after a crash
+    between the archive commit and the live delete does not duplicate it.
+    This relies on rows being archived in id order: every archived id is
+    smaller than every id still in the live table.
+
+    Returns:
+        Number of rows written
+    """
+    os.makedirs(get_archive_directory(), exist_ok=True)
+    conn = sqlite3.connect(_archive_path(month), isolation_level=None)
+    try:
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table.blocks_table} (
+                block_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                first_time TEXT NOT NULL,
+                first_id INTEGER NOT NULL,
+                last_time TEXT NOT NULL,
+                last_id INTEGER NOT NULL,
+                max_id INTEGER NOT NULL,
+                row_count INTEGER NOT NULL,
+                payload BLOB NOT NULL
+            )
+        """)
+        conn.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{table.blocks_table.lower()}_last
+            ON {table.blocks_table} (last_time, last_id)
+        """)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            archived_through = conn.execute(
+                f"SELECT COALESCE(MAX(max_id), 0) FROM {table.blocks_table}"
+            ).fetchone()[0]
+            rows = [row for row in rows if row[0] > archived_through]
+            for start in range(0, len(rows), ARCHIVE_BLOCK_ROWS):
+                block = rows[start:start + ARCHIVE_BLOCK_ROWS]
+                first, last = min(block, key=_row_key), max(block, key=_row_key)
+                conn.execute(f"""
+                    INSERT INTO {table.blocks_table}
+                    (first_time, first_id, last_time, last_id, max_id, row_count, payload)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (first[1], first[0], last[1], last[0], block[-1][0], len(block), _compress_rows(block)))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.rollback()
+            raise
+        return len(rows)
+    finally:
+        conn.close()
+
+def enable_incremental_vacuum(conn: sqlite3.Connection) -> bool:
+    """
+    Switches an existing database to auto_vacuum = INCREMENTAL.
+
+    The mode of a database that already has tables only changes with a full
+    VACUUM, which rewrites the whole file and keeps every other connection
+    out until it finishes, so this is a maintenance command
+    (setup_database.py --enable-incremental-vacuum) and never part of a
+    migration. New databases are created in this mode. Until it is run,
+    archival leaves the pages freed by its deletes on the free list, where
+    new rows reuse them.
+
+    Args:
+        conn: Connection in autocommit mode
+
+    Returns:
+        True if the database was converted, False if it already was
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 0:
+        return False
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    return True
+
+def _vacuum_step(conn: sqlite3.Connection) -> None:
+    # Only databases in incremental mode; the others keep their free pages for reuse
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        return
+    # executescript steps the pragma to completion; execute() frees a single page
+    conn.executescript(f"PRAGMA incremental_vacuum({ARCHIVE_VACUUM_PAGES});")
+
+def archive_table(table: ArchivedTable, cutoff: str, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Moves a table's rows older than cutoff into the monthly archive files.
+
+    Each batch is written to the archives first and then deleted from the
+    live database in its own short transaction, followed by an incremental
+    vacuum step if the database is in incremental auto_vacuum mode. Only the run of ids that are all older than the cutoff is
+    moved, so the archives always hold an id prefix of the table.
+
+    Args:
+        table: Table to archive
+        cutoff: Rows with a time before this ("YYYY-MM-DD HH:MM:SS") are moved
+        batch_size: Rows per batch
+
+    Returns:
+        Number of rows moved
+    """
+    conn = database_manager.get_db_connection()
+    boundary = conn.execute(f"""
+        SELECT COALESCE(
+            (SELECT MIN({table.id_column}) FROM {table.name} WHERE {table.time_column} >= ?),
+            (SELECT MAX({table.id_column}) + 1 FROM {table.name}),
+            0)
+    """, (cutoff,)).fetchone()[0]
+
+    moved = 0
+    while True:
+        rows = [tuple(row) for row in conn.execute(table.select_sql, (boundary, cutoff, batch_size)).fetchall()]
+        if not rows:
+            break
+        for month, month_rows in itertools.groupby(sorted(rows, key=lambda row: (row[1][:7], row[0])),
+                                                  key=lambda row: row[1][:7]):
+            _write_archive(month, table, list(month_rows))
+
+        with database_manager.write_transaction() as write_conn:
+            write_conn.execute(f"""
+                DELETE FROM {table.name}
+                WHERE {table.id_column} BETWEEN ? AND ? AND {table.time_column} < ?
+            """, (rows[0][0], rows[-1][0], cutoff))
+        _vacuum_step(conn)
+        moved += len(rows)
+    return moved
+
+def archive_old_logs(retention_days: Optional[int] = None, batch_size: int = ARCHIVE_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Moves AuditLog and LicenseValidation rows past the retention period into the archives.
+
+    Safe to interrupt at any point; the next run picks up where this one stopped.
+
+    Args:
+        retention_days: Days of logs kept in the live database (configured value if None)
+        batch_size: Rows per batch
+
+    Returns:
+        Rows moved per table
+    """
+    retention_days = get_retention_days() if retention_days is None else retention_days
+    # Log timestamps are stored in UTC
+    cutoff = (datetime.datetime.now(datetime.timezone.utc)
+              - datetime.timedelta(days=retention_days)).strftime("%Y-%m-%d %H:%M:%S")
+    moved = {}
+    try:
+        # Queued records must reach the table before ids are compared
+        database_manager.flush_audit_log()
+        for table in ARCHIVED_TABLES:
+            moved[table.name] = archive_table(table, cutoff, batch_size)
+        if any(moved.values()):
+            print(f"Archived logs older than {cutoff}: {moved}")
+    except (sqlite3.Error, OSError) as e:
+        print(f"Error archiving logs: {e}")
+    return moved
+
+def start_log_archival() -> threading.Thread:
+    """
+    Starts archive_old_logs() on a background thread.
+
+    Returns:
+        The started daemon thread
+    """
+    thread = threading.Thread(target=archive_old_logs, name="LogArchival", daemon=True)
+    thread.start()
+    return thread
+
+def iter_archived_rows(table: ArchivedTable, before: Optional[Tuple[str, int]] = None) -> Iterator[list]:
+    """
+    Reads archived rows newest first, across all archive files.
+
+    Blocks are read in descending order of their newest row and only as far
+    as the caller iterates. Block ranges can overlap slightly (rows are
+    archived in id order), so rows are buffered until no later block can
+    contain a newer one.
+
+    Args:
+        table: Archived table to read
+        before: Only rows with (time, id) below this key
+
+    Yields:
+        Rows in the column order of the table's select_sql
+    """
+    for path in list_archive_files():
+        if before is not None and _archive_month(path) > before[0][:7]:
+            continue
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (table.blocks_table,)).fetchone():
+                continue
+            where = "WHERE (first_time, first_id) < (?, ?)" if before is not None else ""
+            blocks = conn.execute(f"""
+                SELECT last_time, last_id, payload FROM {table.blocks_table}
+                {where}
+                ORDER BY last_time DESC, last_id DESC
+            """, tuple(before) if before is not None else ())
+
+            pending: List[list] = []
+            for last_time, last_id, payload in blocks:
+                # Nothing in this or any later block is newer than (last_time, last_id)
+                pending.sort(key=_row_key, reverse=True)
+                ready = 0
+                while ready < len(pending) and _row_key(pending[ready]) > (last_time, last_id):
+                    ready += 1
+                yield from pending[:ready]
+                pending = pending[ready:]
+                pending.extend(row for row in _decompress_rows(payload)
+                               if before is None or _row_key(row) < tuple(before))
+            pending.sort(key=_row_key, reverse=True)
+            yield from pending
+        finally:
+            conn.close()
+
+def count_archived_rows(table: ArchivedTable) -> int:
+    """Returns the number of rows of a table held in the archives."""
+    total = 0
+    for path in list_archive_files():
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (table.blocks_table,)).fetchone():
+                total += conn.execute(f"SELECT COALESCE(SUM(row_count), 0) FROM {table.blocks_table}").fetchone()[0]
+        finally:
+            conn.close()
+    return total
+
+def _audit_log_dict(row: list) -> Dict[str, Any]:
+    return {
+        "log_id": row[0],
+        "timestamp": row[1],
+        "username": row[2],
+        "action_type": row[3],
+        "action_details": row[4],
+    }
+
+def get_audit_log_history_page(before: Optional[Tuple[str, int]] = None,
+                               limit: int = database_manager.AUDIT_LOG_PAGE_SIZE) -> List[Dict[str, Any]]:
+    """
+    Gets one page of the audit log, newest first, continuing into the archives.
+
+    Same paging contract as database_manager.get_audit_log_page(): pass the
+    (timestamp, log_id) of the last row received to get the next page.
+
+    Returns:
+        List of dictionaries with log_id, timestamp, username, action_type
+        and action_details
+    """
+    logs = database_manager.get_audit_log_page(before, limit)
+    if len(logs) == limit:
+        return logs
+    # Continue below the oldest live row, so rows archived meanwhile are not repeated
+    if logs:
+        before = (logs[-1]["timestamp"], logs[-1]["log_id"])
+    try:
+        archived = itertools.islice(iter_archived_rows(AUDIT_LOG, before), limit - len(logs))
+        return logs + [_audit_log_dict(row) for row in archived]
+    except (sqlite3.Error, OSError) as e:
+        print(f"Error reading archived audit log: {e}")
+        return logs
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+import csv
+import itertools
+import os
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from db.database_manager import db_connection, flush_audit_log
+from db.log_archive import AUDIT_LOG, count_archived_rows, iter_archived_rows
+
+# Rows read from the cursor and written to the file per step
+LOG_EXPORT_CHUNK_SIZE = 2000
+
+LOG_EXPORT_HEADER = ["Log ID", "Timestamp", "User", "Action Type", "Details"]
+
+LOG_EXPORT_SQL = """
+    SELECT a.log_id, a.timestamp, COALESCE(u.username, 'System'), a.action_type, a.action_details
+    FROM AuditLog a
+    LEFT JOIN Users u ON a.user_id = u.user_id
+    ORDER BY a.timestamp DESC, a.log_id DESC
+"""
+
+_export_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def iter_audit_log_chunks(conn: sqlite3.Connection, chunk_size: int = LOG_EXPORT_CHUNK_SIZE) -> Iterator[List[tuple]]:
+    """
+    Streams the audit log, newest first, a chunk at a time.
+
+    Args:
+        conn: Open connection (rows are read with fetchmany, never all at once)
+        chunk_size: Rows per chunk
+
+    Yields:
+        Lists of (log_id, timestamp, username, action_type, action_details) tuples
+    """
+    cursor = conn.cursor()
+    # Plain tuples go straight to csv.writer without building Row objects
+    cursor.row_factory = None
+    cursor.execute(LOG_EXPORT_SQL)
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield rows
+
+def iter_archived_audit_log_chunks(before: Optional[Tuple[str, int]] = None,
+                                   chunk_size: int = LOG_EXPORT_CHUNK_SIZE) -> Iterator[List[tuple]]:
+    """
+    Streams the archived audit log, newest first, in the same row format as iter_audit_log_chunks().
+
+    Args:
+        before: Only rows with (timestamp, log_id) below this key
+        chunk_size: Rows per chunk
+    """
+    rows = ((row[0], row[1], row[2] or "System", row[3], row[4]) for row in iter_archived_rows(AUDIT_LOG, before))
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            break
+        yield chunk
+
+def _iter_export_chunks(conn: sqlite3.Connection, chunk_size: int) -> Iterator[List[tuple]]:
+    last_key = None
+    for rows in iter_audit_log_chunks(conn, chunk_size):
+        last_key = (rows[-1][1], rows[-1][0])
+        yield rows
+    # Rows archived while the export runs are still in the live snapshot;
+    # reading the archives below the last live row skips them
+    yield from iter_archived_audit_log_chunks(last_key, chunk_size)
+
+def export_audit_log_csv(file_path: str,
+                         progress: Optional[Callable[[int, int], None]] = None,
+                         cancel_event: Optional[threading.Event] = None,
+                         chunk_size: int = LOG_EXPORT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Writes the whole audit log, including the archives, to a CSV file without holding it in memory.
+
+    Live rows are read in chunks from a single read transaction, so they are a
+    consistent snapshot, and written as they arrive; archived rows older than
+    the last live row follow. The data goes to a temporary file that replaces
+    file_path only when the export completes; a cancelled or failed export
+    leaves no partial file behind.
+
+    Args:
+        file_path: Destination CSV file
+        progress: Called with (rows written, total rows) after every chunk
+        cancel_event: Export stops at the next chunk once this is set
+        chunk_size: Rows per fetchmany() call
+
+    Returns:
+        Dictionary with success, rows and cancelled, or success False and an error message
+    """
+    temp_path = file_path + ".part"
+    written = 0
+    try:
+        # Make sure queued audit records are included
+        flush_audit_log()
+        with db_connection() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM AuditLog").fetchone()[0] + count_archived_rows(AUDIT_LOG)
+            with open(temp_path, "w", newline="", encoding="utf-8") as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(LOG_EXPORT_HEADER)
+                for rows in _iter_export_chunks(conn, chunk_size):
+                    if cancel_event is not None and cancel_event.is_set():
+                        break
+                    writer.writerows(rows)
+                    written += len(rows)
+                    if progress is not None:
+                        progress(written, total)
+
+        if cancel_event is not None and cancel_event.is_set():
+            os.remove(temp_path)
+            return {"success": False, "rows": written, "cancelled": True, "error": "Export cancelled."}
+        os.replace(temp_path, file_path)
+        return {"success": True, "rows": written, "cancelled": False}
+    except (sqlite3.Error, OSError) as e:
+        print(f"Error exporting audit log: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return {"success": False, "rows": written, "cancelled": False, "error": str(e)}
+
+def export_audit_log_csv_async(file_path: str,
+                               progress: Optional[Callable[[int, int], None]] = None,
+                               cancel_event: Optional[threading.Event] = None) -> Future:
+    """
+    Runs export_audit_log_csv() on the export worker thread.
+
+    progress is called on the worker thread; UI code should only store the
+    values and read them from the Tk thread.
+
+    Returns:
+        Future resolving to the export_audit_log_csv() result
+    """
+    global _export_executor
+    with _executor_lock:
+        if _export_executor is None:
+            _export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-export")
+    return _export_executor.submit(export_audit_log_csv, file_path, progress, cancel_event)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+import os
+import sqlite3
+import time
+from typing import Callable, List, Optional
+
+from db.indexes import ensure_indexes
+from db.sales_summary import backfill_sales_summaries
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "database_schema.sql")
+
+# Rows touched per transaction by batched migration steps
+MIGRATION_BATCH_SIZE = 5000
+# Seconds between batches, so writers waiting on other connections get the lock
+MIGRATION_BATCH_PAUSE = 0.1
+
+class Migration:
+    """
+    One numbered schema change.
+
+    apply runs inside a single transaction together with the user_version bump.
+    batch_step, if given, runs before apply and is called repeatedly, each call
+    in its own short transaction followed by a short pause so other
+    connections can write in between, until it returns 0. Batch steps must be
+    idempotent (select only rows not yet converted) so an interrupted upgrade
+    simply resumes on the next start.
+    """
+
+    def __init__(self, version: int, description: str,
+                 apply: Optional[Callable[[sqlite3.Connection], None]] = None,
+                 batch_step: Optional[Callable[[sqlite3.Connection, int], int]] = None):
+        self.version = version
+        self.description = description
+        self.apply = apply
+        self.batch_step = batch_step
+
+def read_schema_statements() -> List[str]:
+    """Splits database_schema.sql into individual statements."""
+    with open(SCHEMA_PATH, "r") as f:
+        lines = [line for line in f.read().splitlines() if not line.strip().startswith("--")]
+    statements, current = [], ""
+    for line in lines:
+        current += line + "\n"
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ""
+    return statements
+
+def table_exists(conn: sqlite3.Connection, table: str) -> bool:
+    """Returns True if the table exists."""
+    return conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()[0] > 0
+
+def table_has_column(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    """Returns True if the table already has the column."""
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})").fetchall())
+
+def add_column_if_missing(conn: sqlite3.Connection, table: str, column: str, definition: str) -> None:
+    """Adds a column unless an earlier, interrupted run already added it."""
+    if not table_has_column(conn, table, column):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+def apply_schema_statements(*markers: str) -> Callable[[sqlite3.Connection], None]:
+    """
+    Builds a migration that runs the database_schema.sql statements mentioning any marker.
+
+    Keeps the schema file the single definition of new tables, triggers and
+    indexes; the statements must be idempotent (IF NOT EXISTS).
+
+    Args:
+        markers: Substrings identifying the statements, e.g. a table name
+
+    Returns:
+        An apply function for Migration
+    """
+    def apply(conn: sqlite3.Connection) -> None:
+        for statement in read_schema_statements():
+            if any(marker in statement for marker in markers):
+                conn.execute(statement)
+    return apply
+
+create_sales_summary_tables = apply_schema_statements("DailySales", "DailyOrderTotals", "idx_orders_status_payment_time")
+
+def fill_sales_summaries(conn: sqlite3.Connection, batch_size: int) -> int:
+    """Creates the daily summary tables on the first call, then fills them from the existing orders a few days at a time."""
+    if not table_exists(conn, "DailyOrderTotals"):
+        create_sales_summary_tables(conn)
+    return backfill_sales_summaries(conn, batch_size)
+
+def add_cost_columns(conn: sqlite3.Connection) -> None:
+    """Adds unit cost to products and to order lines, for margin reporting."""
+    add_column_if_missing(conn, "Products", "cost_price", "REAL NOT NULL DEFAULT 0.0 CHECK(cost_price >= 0)")
+    add_column_if_missing(conn, "OrderItems", "cost_at_order", "REAL NOT NULL DEFAULT 0.0 CHECK(cost_at_order >= 0)")
+
+def cap_catalog_changes(conn: sqlite3.Connection) -> None:
+    """Prunes CatalogChanges on every insert instead of from the catalog cache's lookups."""
+    apply_schema_statements("trg_catalogchanges_prune")(conn)
+    conn.execute("DELETE FROM CatalogChanges WHERE change_id <= (SELECT MAX(change_id) FROM CatalogChanges) - 10000")
+
+# Version 1 is the original schema, as shipped before migrations existed.
+MIGRATIONS: List[Migration] = [
+    Migration(2, "Indexes for hot queries", apply=ensure_indexes),
+    Migration(3, "Catalog change tracking for the product cache", apply=apply_schema_statements("CatalogChanges")),
+    Migration(4, "Log retention: LicenseValidation date index",
+              apply=apply_schema_statements("idx_licensevalidation_date")),
+    Migration(5, "Daily sales summary tables", batch_step=fill_sales_summaries, apply=create_sales_summary_tables),
+    Migration(6, "Product and order line costs", apply=add_cost_columns),
+    Migration(7, "Inventory checkpoints", apply=apply_schema_statements("InventoryCheckpoint", "idx_inventorylog_log_time")),
+    Migration(8, "Catalog change history capped by a trigger", apply=cap_catalog_changes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version if MIGRATIONS else 1
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Reads the schema version stored in PRAGMA user_version."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def _set_schema_version(conn: sqlite3.Connection, version: int) -> None:
+    conn.execute(f"PRAGMA user_version = {int(version)}")
+
+def _has_tables(conn: sqlite3.Connection) -> bool:
+    return table_exists(conn, "Users")
+
+def _create_schema(conn: sqlite3.Connection) -> None:
+    """Creates a new database directly at the latest version from database_schema.sql."""
+    # Only takes effect before the first table is created, outside a transaction
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for statement in read_schema_statements():
+            conn.execute(statement)
+        _set_schema_version(conn, LATEST_VERSION)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.rollback()
+        raise
+
+def _apply_migration(conn: sqlite3.Connection, migration: Migration, batch_size: int) -> None:
+    if migration.batch_step is not None:
+        while True:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                changed = migration.batch_step(conn, batch_size)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.rollback()
+                raise
+            if not changed:
+                break
+            time.sleep(MIGRATION_BATCH_PAUSE)
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if migration.apply is not None:
+            migration.apply(conn)
+        _set_schema_version(conn, migration.version)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.rollback()
+        raise
+
+def run_migrations(conn: sqlite3.Connection, batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """
+    Brings a database up to the latest schema version.
+
+    On an up-to-date database this costs a single PRAGMA read. The connection
+    must be in autocommit mode (isolation_level=None).
+
+    Args:
+        conn: Open connection to the database
+        batch_size: Rows per transaction for batched steps
+
+    Returns:
+        The schema version after migrating
+    """
+    version = get_schema_version(conn)
+    if version >= LATEST_VERSION:
+        return version
+
+    if version == 0:
+        if not _has_tables(conn):
+            _create_schema(conn)
+            print(f"Database schema created at version {LATEST_VERSION}.")
+            return LATEST_VERSION
+        # Databases created before migrations existed carry the original schema
+        version = 1
+
+    for migration in MIGRATIONS:
+        if migration.version > version:
+            print(f"Applying database migration {migration.version}: {migration.description}")
+            _apply_migration(conn, migration, batch_size)
+            version = migration.version
+    return version
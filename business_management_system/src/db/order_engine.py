@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+import datetime
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+from db.database_manager import write_transaction, get_catalog_cache, get_connection_manager, log_action
+from db.sales_summary import record_order_sales
+
+PAYMENT_METHODS = ["Cash", "Card"]
+
+_stats_lock = threading.Lock()
+_checkout_stats = {"checkouts": 0, "failed": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0}
+
+def merge_cart_lines(cart: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Combines cart lines for the same product, keeping first-seen order.
+
+    Args:
+        cart: (product_id, quantity) pairs
+
+    Returns:
+        One (product_id, quantity) pair per product
+    """
+    merged: Dict[int, int] = {}
+    for product_id, quantity in cart:
+        merged[product_id] = merged.get(product_id, 0) + quantity
+    return list(merged.items())
+
+def _values_placeholders(count: int, width: int) -> str:
+    row = "(" + ", ".join("?" * width) + ")"
+    return ", ".join([row] * count)
+
+def _record_latency(elapsed_ms: float, success: bool) -> None:
+    with _stats_lock:
+        if success:
+            _checkout_stats["checkouts"] += 1
+            _checkout_stats["total_ms"] += elapsed_ms
+            _checkout_stats["max_ms"] = max(_checkout_stats["max_ms"], elapsed_ms)
+            _checkout_stats["last_ms"] = elapsed_ms
+        else:
+            _checkout_stats["failed"] += 1
+
+def get_checkout_stats() -> Dict[str, float]:
+    """Returns checkout counters and latency (average, maximum and last, in milliseconds)."""
+    with _stats_lock:
+        stats = dict(_checkout_stats)
+    stats["average_ms"] = stats["total_ms"] / stats["checkouts"] if stats["checkouts"] else 0.0
+    return stats
+
+def checkout(cart: Iterable[Tuple[int, int]], location_id: int, user_id: int,
+             payment_method: str = "Cash") -> Dict[str, Any]:
+    """
+    Commits a paid sale in a single BEGIN IMMEDIATE transaction.
+
+    The number of statements does not depend on the cart size: one price
+    lookup, one Orders insert, one executemany for the OrderItems, one
+    set-based stock decrement, one INSERT ... SELECT for the InventoryLog and
+    two upserts into the daily sales summaries.
+
+    Args:
+        cart: (product_id, quantity) pairs; repeated products are combined
+        location_id: Sales location (checkout) the sale happened at
+        user_id: Cashier processing the sale
+        payment_method: How the order was paid, one of PAYMENT_METHODS
+
+    Returns:
+        Dictionary with success, order_id, total, line_count and latency_ms,
+        or success False and an error message
+    """
+    start = time.perf_counter()
+    lines = merge_cart_lines(cart)
+    if not lines:
+        return {"success": False, "error": "The cart is empty."}
+    if any(quantity <= 0 for _, quantity in lines):
+        return {"success": False, "error": "Quantities must be positive."}
+    if payment_method not in PAYMENT_METHODS:
+        return {"success": False, "error": f"Unknown payment method: {payment_method}."}
+
+    product_ids = [product_id for product_id, _ in lines]
+    cart_params = [value for line in lines for value in line]
+    # Sales are stamped in local time so daily reports follow the business day
+    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    try:
+        with write_transaction() as conn:
+            cursor = conn.cursor()
+
+            # Current prices and stock for every product in the cart
+            cursor.execute(f"""
+                SELECT product_id, name, price, cost_price, current_stock, is_available
+                FROM Products
+                WHERE product_id IN ({", ".join("?" * len(product_ids))})
+            """, product_ids)
+            products = {row["product_id"]: row for row in cursor.fetchall()}
+
+            for product_id, quantity in lines:
+                product = products.get(product_id)
+                if product is None or not product["is_available"]:
+                    raise ValueError(f"Product {product_id} is not available for sale.")
+                if product["current_stock"] < quantity:
+                    raise ValueError(f"Insufficient stock for {product['name']} "
+                                     f"({product['current_stock']} left, {quantity} requested).")
+
+            items = [
+                (product_id, quantity, products[product_id]["price"],
+                 round(products[product_id]["price"] * quantity, 2), products[product_id]["cost_price"])
+                for product_id, quantity in lines
+            ]
+            total = round(sum(item[3] for item in items), 2)
+
+            cursor.execute("""
+                INSERT INTO Orders
+                (location_id, user_id_creator, user_id_processor, order_time, status,
+                 total_amount, payment_time, payment_method)
+                VALUES (?, ?, ?, ?, 'Paid', ?, ?, ?)
+            """, (location_id, user_id, user_id, now, total, now, payment_method))
+            order_id = cursor.lastrowid
+
+            cursor.executemany("""
+                INSERT INTO OrderItems
+                (order_id, product_id, quantity, price_at_order, subtotal, cost_at_order)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [(order_id,) + item for item in items])
+
+            # Set-based guarded decrement: a product without enough stock
+            # is left alone, and a short row count rejects the whole sale
+            # (column1 and column2 of the cart are product_id and quantity)
+            cursor.execute(f"""
+                UPDATE Products
+                SET current_stock = current_stock - cart.column2
+                FROM (VALUES {_values_placeholders(len(lines), 2)}) AS cart
+                WHERE Products.product_id = cart.column1 AND Products.current_stock >= cart.column2
+            """, cart_params)
+            if cursor.rowcount != len(lines):
+                raise ValueError("Stock changed during checkout. Please try again.")
+
+            cursor.execute("""
+                INSERT INTO InventoryLog
+                (product_id, change_quantity, new_stock_level, reason, order_item_id, user_id_admin, log_time)
+                SELECT oi.product_id, -oi.quantity, p.current_stock, 'Sale', oi.order_item_id, ?, ?
+                FROM OrderItems oi
+                JOIN Products p ON p.product_id = oi.product_id
+                WHERE oi.order_id = ?
+            """, (user_id, now, order_id))
+
+            record_order_sales(conn, order_id)
+    except ValueError as e:
+        _record_latency(0.0, False)
+        print(f"Checkout rejected: {e}")
+        return {"success": False, "error": str(e)}
+    except sqlite3.IntegrityError as e:
+        _record_latency(0.0, False)
+        print(f"Checkout failed, stock or reference check: {e}")
+        return {"success": False, "error": "Stock changed during checkout. Please try again."}
+    except sqlite3.Error as e:
+        _record_latency(0.0, False)
+        print(f"Database error during checkout: {e}")
+        return {"success": False, "error": f"Database error: {e}"}
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    def record_sale():
+        _record_latency(elapsed_ms, True)
+        # Pick up the new stock levels in the terminal's catalog
+        get_catalog_cache().notify_products_changed()
+
+    # Inside a caller's transaction (the service's write batches) the sale only
+    # counts once that transaction commits
+    get_connection_manager().after_commit(record_sale)
+    log_action(user_id, "ORDER_PAID", f"Order {order_id}: {len(lines)} lines, total {total:.2f} ({payment_method})")
+    return {
+        "success": True,
+        "order_id": order_id,
+        "total": total,
+        "line_count": len(lines),
+        "latency_ms": elapsed_ms,
+    }
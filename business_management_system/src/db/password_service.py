@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+import math
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Union
+
+import bcrypt
+
+# Work factor configuration. BMS_BCRYPT_ROUNDS in the environment pins the
+# cost; otherwise it is calibrated on this host to take about BCRYPT_TARGET_MS.
+BCRYPT_ROUNDS_ENV = "BMS_BCRYPT_ROUNDS"
+BCRYPT_TARGET_MS = 250
+BCRYPT_MIN_ROUNDS = 12
+BCRYPT_MAX_ROUNDS = 15
+BCRYPT_CALIBRATION_ROUNDS = 8
+PASSWORD_WORKERS = 2
+
+def _as_bytes(value: Union[str, bytes]) -> bytes:
+    return value.encode("utf-8") if isinstance(value, str) else value
+
+def get_hash_rounds(hashed_password: Union[str, bytes]) -> Optional[int]:
+    """
+    Reads the work factor out of a bcrypt hash ("$2b$12$...").
+
+    Returns:
+        The cost as an integer, or None if the hash is not in bcrypt format
+    """
+    parts = _as_bytes(hashed_password).split(b"$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+def calibrate_work_factor(target_ms: float = BCRYPT_TARGET_MS) -> int:
+    """
+    Picks the bcrypt cost whose hash time on this host is closest to target_ms.
+
+    Each extra round doubles the cost, so a single measurement at a low cost
+    is enough to extrapolate.
+
+    Args:
+        target_ms: Desired time for one hash in milliseconds
+
+    Returns:
+        Number of rounds, clamped to BCRYPT_MIN_ROUNDS..BCRYPT_MAX_ROUNDS
+    """
+    salt = bcrypt.gensalt(BCRYPT_CALIBRATION_ROUNDS)
+    start = time.perf_counter()
+    bcrypt.hashpw(b"calibration-password", salt)
+    elapsed_ms = max((time.perf_counter() - start) * 1000, 0.01)
+    rounds = BCRYPT_CALIBRATION_ROUNDS + round(math.log2(target_ms / elapsed_ms))
+    return max(BCRYPT_MIN_ROUNDS, min(BCRYPT_MAX_ROUNDS, rounds))
+
+def rounds_from_environment() -> Optional[int]:
+    """
+    Returns the work factor pinned by BMS_BCRYPT_ROUNDS.
+
+    Returns:
+        The rounds, or None to calibrate (unset, or not an integer in
+        BCRYPT_MIN_ROUNDS..BCRYPT_MAX_ROUNDS, with a warning)
+    """
+    value = os.environ.get(BCRYPT_ROUNDS_ENV, "").strip()
+    if not value:
+        return None
+    try:
+        rounds = int(value)
+    except ValueError:
+        rounds = None
+    if rounds is None or not BCRYPT_MIN_ROUNDS <= rounds <= BCRYPT_MAX_ROUNDS:
+        print(f"Warning: ignoring {BCRYPT_ROUNDS_ENV}={value!r}, expected a whole number from "
+              f"{BCRYPT_MIN_ROUNDS} to {BCRYPT_MAX_ROUNDS}; calibrating the work factor instead.")
+        return None
+    return rounds
+
+class PasswordService:
+    """
+    Runs bcrypt hashing and verification on a small worker pool.
+
+    The synchronous methods are used by the database layer (which is itself
+    called from worker threads); the *_async methods and submit() return
+    futures that the UI polls with after() instead of blocking the Tk loop.
+    """
+
+    def __init__(self, rounds: Optional[int] = None, target_ms: float = BCRYPT_TARGET_MS,
+                 max_workers: int = PASSWORD_WORKERS):
+        self._rounds = rounds if rounds is not None else rounds_from_environment()
+        self.target_ms = target_ms
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._rounds_lock = threading.Lock()
+
+    @property
+    def rounds(self) -> int:
+        """The configured work factor, calibrating it on first use if not pinned."""
+        if self._rounds is None:
+            with self._rounds_lock:
+                if self._rounds is None:
+                    self._rounds = calibrate_work_factor(self.target_ms)
+        return self._rounds
+
+    def hash_password(self, password: str) -> bytes:
+        """Hashes a password using bcrypt at the configured cost."""
+        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(self.rounds))
+
+    def check_password(self, password: str, hashed_password: Union[str, bytes]) -> bool:
+        """Checks if the provided password matches the hashed password."""
+        return bcrypt.checkpw(password.encode("utf-8"), _as_bytes(hashed_password))
+
+    def needs_rehash(self, hashed_password: Union[str, bytes]) -> bool:
+        """Returns True if the hash was made with a lower cost than the configured one."""
+        hash_rounds = get_hash_rounds(hashed_password)
+        return hash_rounds is not None and hash_rounds < self.rounds
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> Future:
+        """Runs func(*args, **kwargs) on the worker pool and returns its future."""
+        return self._get_executor().submit(func, *args, **kwargs)
+
+    def hash_password_async(self, password: str) -> Future:
+        """Hashes a password on the worker pool."""
+        return self.submit(self.hash_password, password)
+
+    def check_password_async(self, password: str, hashed_password: Union[str, bytes]) -> Future:
+        """Verifies a password on the worker pool."""
+        return self.submit(self.check_password, password, hashed_password)
+
+    def calibrate_async(self) -> Future:
+        """Calibrates the work factor on the worker pool so the first login does not pay for it."""
+        return self.submit(lambda: self.rounds)
+
+    def shutdown(self) -> None:
+        """Waits for running jobs and stops the worker pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                                    thread_name_prefix="PasswordWorker")
+            return self._executor
+
+password_service = PasswordService()
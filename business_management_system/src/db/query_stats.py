@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+import logging
+import logging.handlers
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+# Configuration. BMS_QUERY_STATS=1 in the environment turns statistics on at
+# startup and BMS_SLOW_QUERY_MS sets the slow-query threshold.
+QUERY_STATS_ENV = "BMS_QUERY_STATS"
+SLOW_QUERY_MS_ENV = "BMS_SLOW_QUERY_MS"
+SLOW_QUERY_MS = 100.0
+SLOW_QUERY_LOG_NAME = "slow_queries.log"
+SLOW_QUERY_LOG_BYTES = 1024 * 1024
+SLOW_QUERY_LOG_BACKUPS = 3
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+# Statements whose plan is worth logging
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+_NORMALIZE_CACHE_SIZE = 2000
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEATED_ROWS = re.compile(r"\(\?\.\.\.\)(?:\s*,\s*\(\?\.\.\.\))+")
+
+# Frames from these files are skipped when looking for a statement's call site
+_INTERNAL_FILES = {"query_stats.py", "connection_manager.py", "contextlib.py"}
+
+def normalize_sql(sql: str) -> str:
+    """
+    Reduces a statement to its shape: literals become ?, whitespace is
+    collapsed and placeholder lists such as IN (?, ?, ?) or multi-row VALUES
+    collapse to one entry, so statements that differ only in their values or
+    list lengths share one key.
+    """
+    text = _WHITESPACE.sub(" ", _LITERAL.sub("?", sql)).strip()
+    text = _PLACEHOLDER_LIST.sub("(?...)", text)
+    return _REPEATED_ROWS.sub("(?...), ...", text)
+
+class _StatementStats:
+    __slots__ = ("calls", "total_ms", "max_ms", "rows", "buckets", "call_sites", "errors")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.call_sites: Counter = Counter()
+        self.errors = 0
+
+    def percentile_ms(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of calls."""
+        wanted = self.calls * fraction
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= wanted and count:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+class QueryStats:
+    """
+    Per-statement latency histograms, row counts and call sites.
+
+    Statistics are collected by InstrumentedConnection, which the connection
+    manager only uses while statistics are enabled: disabled connections are
+    plain sqlite3.Connection objects and cost nothing extra. Statements
+    slower than the threshold are written with their EXPLAIN QUERY PLAN to a
+    rotating slow-query log.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.threshold_ms = SLOW_QUERY_MS
+        self.log_path: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _StatementStats] = {}
+        self._normalized: Dict[str, str] = {}
+        self._logger = logging.getLogger("bms.slow_queries")
+        self._logger.propagate = False
+        self._handler: Optional[logging.Handler] = None
+        self._started = time.time()
+
+    def enable(self, log_path: str, threshold_ms: Optional[float] = None) -> None:
+        """
+        Starts collecting statistics.
+
+        Args:
+            log_path: File for the slow-query log (rotated at SLOW_QUERY_LOG_BYTES)
+            threshold_ms: Statements at least this slow are logged (SLOW_QUERY_MS if omitted)
+        """
+        with self._lock:
+            if threshold_ms is not None:
+                self.threshold_ms = threshold_ms
+            if self._handler is None or self.log_path != log_path:
+                self._close_handler()
+                os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+                self._handler = logging.handlers.RotatingFileHandler(
+                    log_path, maxBytes=SLOW_QUERY_LOG_BYTES, backupCount=SLOW_QUERY_LOG_BACKUPS, delay=True)
+                self._handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                self._logger.addHandler(self._handler)
+                self._logger.setLevel(logging.INFO)
+                self.log_path = log_path
+            self.enabled = True
+
+    def disable(self) -> None:
+        """Stops collecting; the statistics gathered so far are kept."""
+        with self._lock:
+            self.enabled = False
+            self._close_handler()
+
+    def _close_handler(self) -> None:
+        if self._handler is not None:
+            self._logger.removeHandler(self._handler)
+            self._handler.close()
+            self._handler = None
+
+    def reset(self) -> None:
+        """Drops all statistics."""
+        with self._lock:
+            self._stats.clear()
+            self._started = time.time()
+
+    def _key(self, sql: str) -> str:
+        key = self._normalized.get(sql)
+        if key is None:
+            if len(self._normalized) >= _NORMALIZE_CACHE_SIZE:
+                self._normalized.clear()
+            key = self._normalized[sql] = normalize_sql(sql)
+        return key
+
+    def record(self, conn: sqlite3.Connection, sql: str, parameters: Any, elapsed_ms: float,
+               rows: int, failed: bool = False, explain_parameters: bool = True) -> str:
+        """
+        Adds one execution of a statement.
+
+        Args:
+            conn: Connection the statement ran on (used for EXPLAIN QUERY PLAN)
+            sql: Statement text
+            parameters: Its parameters (only used to explain slow statements, never logged)
+            elapsed_ms: Time taken
+            rows: Rows changed or fetched
+            failed: The statement raised an error
+            explain_parameters: Bind parameters when explaining; NULLs are bound otherwise
+
+        Returns:
+            The statement's key, for add_fetch()
+        """
+        key = self._key(sql)
+        call_site = _call_site()
+        bucket = _bucket(elapsed_ms)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _StatementStats()
+            stats.calls += 1
+            stats.total_ms += elapsed_ms
+            stats.rows += max(rows, 0)
+            stats.buckets[bucket] += 1
+            stats.call_sites[call_site] += 1
+            if elapsed_ms > stats.max_ms:
+                stats.max_ms = elapsed_ms
+            if failed:
+                stats.errors += 1
+        if elapsed_ms >= self.threshold_ms and not failed:
+            self._log_slow(conn, sql, parameters if explain_parameters else None, elapsed_ms, call_site, "execute")
+        return key
+
+    def add_fetch(self, conn: sqlite3.Connection, key: str, sql: str, elapsed_ms: float, rows: int) -> None:
+        """Adds the time and rows of fetching a statement's results to its entry."""
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                return
+            stats.total_ms += elapsed_ms
+            stats.rows += rows
+        if elapsed_ms >= self.threshold_ms:
+            self._log_slow(conn, sql, None, elapsed_ms, _call_site(), "fetch")
+
+    def _log_slow(self, conn: sqlite3.Connection, sql: str, parameters: Any, elapsed_ms: float,
+                  call_site: str, phase: str) -> None:
+        plan = explain(conn, sql, parameters)
+        lines = [f"SLOW {elapsed_ms:.1f} ms ({phase}) at {call_site}", "    " + _WHITESPACE.sub(" ", sql).strip()]
+        lines += ["    plan: " + detail for detail in plan]
+        self._logger.info("\n".join(lines))
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Returns the statistics per statement.
+
+        Returns:
+            One dictionary per normalized statement with sql, calls, total_ms,
+            mean_ms, p50_ms, p95_ms, max_ms, rows, errors and call_sites
+            (most frequent first)
+        """
+        with self._lock:
+            return [{
+                "sql": key,
+                "calls": stats.calls,
+                "total_ms": stats.total_ms,
+                "mean_ms": stats.total_ms / stats.calls if stats.calls else 0.0,
+                "p50_ms": stats.percentile_ms(0.5),
+                "p95_ms": stats.percentile_ms(0.95),
+                "max_ms": stats.max_ms,
+                "rows": stats.rows,
+                "errors": stats.errors,
+                "call_sites": stats.call_sites.most_common(),
+            } for key, stats in self._stats.items()]
+
+    def format_report(self, top_n: int = 20, order_by: str = "total_ms") -> str:
+        """
+        Formats the top_n statements as a plain-text table.
+
+        Args:
+            top_n: Number of statements to list
+            order_by: Sort key from snapshot() (total_ms, max_ms, calls, rows, ...)
+
+        Returns:
+            The report text
+        """
+        entries = sorted(self.snapshot(), key=lambda entry: entry[order_by], reverse=True)[:top_n]
+        since = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self._started))
+        lines = [
+            f"Query statistics since {since} ({'enabled' if self.enabled else 'disabled'}, "
+            f"slow threshold {self.threshold_ms:g} ms), top {len(entries)} by {order_by}",
+            "",
+            f"{'calls':>8} {'total ms':>10} {'mean':>8} {'p95':>8} {'max':>8} {'rows':>10}  call site / statement",
+        ]
+        for entry in entries:
+            site, _ = entry["call_sites"][0] if entry["call_sites"] else ("?", 0)
+            lines.append(f"{entry['calls']:>8} {entry['total_ms']:>10.1f} {entry['mean_ms']:>8.2f} "
+                         f"{entry['p95_ms']:>8.2f} {entry['max_ms']:>8.2f} {entry['rows']:>10}  {site}")
+            lines.append(f"{'':>57}{entry['sql'][:160]}")
+        if not entries:
+            lines.append("No statements recorded.")
+        return "\n".join(lines)
+
+def _bucket(elapsed_ms: float) -> int:
+    for index, bound in enumerate(LATENCY_BUCKETS_MS):
+        if elapsed_ms <= bound:
+            return index
+    return len(LATENCY_BUCKETS_MS)
+
+def _call_site() -> str:
+    """file:line function of the first frame outside the database plumbing."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.basename(frame.f_code.co_filename)
+        if filename not in _INTERNAL_FILES:
+            return f"{filename}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+def explain(conn: sqlite3.Connection, sql: str, parameters: Any = None) -> List[str]:
+    """
+    Runs EXPLAIN QUERY PLAN for a statement on a plain (uninstrumented) cursor.
+
+    Args:
+        conn: Connection to explain on
+        sql: Statement text
+        parameters: Parameters to bind, or None to bind NULL to every ? placeholder
+
+    Returns:
+        The plan's detail lines; empty for statements that have no plan
+    """
+    if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return []
+    if parameters is None:
+        parameters = (None,) * sql.count("?")
+    try:
+        cursor = sqlite3.Cursor(conn)
+        cursor.row_factory = None
+        return [row[3] for row in cursor.execute("EXPLAIN QUERY PLAN " + sql, parameters).fetchall()]
+    except (sqlite3.Error, ValueError) as e:
+        return [f"unavailable: {e}"]
+
+query_stats = QueryStats()
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that reports each statement and fetch to query_stats."""
+
+    _stats_key: Optional[str] = None
+    _stats_sql = ""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = super().execute(sql, parameters)
+            failed = False
+            return result
+        finally:
+            self._stats_sql = sql
+            self._stats_key = query_stats.record(self.connection, sql, parameters,
+                                                 (time.perf_counter() - start) * 1000, self.rowcount, failed)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = super().executemany(sql, seq_of_parameters)
+            failed = False
+            return result
+        finally:
+            self._stats_sql = sql
+            self._stats_key = query_stats.record(self.connection, sql, None, (time.perf_counter() - start) * 1000,
+                                                 self.rowcount, failed, explain_parameters=False)
+
+    def _fetched(self, start: float, rows: int) -> None:
+        if self._stats_key is not None:
+            query_stats.add_fetch(self.connection, self._stats_key, self._stats_sql,
+                                  (time.perf_counter() - start) * 1000, rows)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows))
+        return rows
+
+class InstrumentedConnection(sqlite3.Connection):
+    """
+    Connection whose statements are recorded in query_stats.
+
+    Rows read by iterating a cursor directly (rather than with the fetch
+    methods) are not counted, and their reading time is not included.
+    """
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+def get_connection_factory():
+    """Returns the connection class the connection manager should open connections with."""
+    return InstrumentedConnection if query_stats.enabled else sqlite3.Connection
+
+def threshold_from_environment() -> float:
+    """Returns BMS_SLOW_QUERY_MS if set to a number, else SLOW_QUERY_MS."""
+    try:
+        return float(os.environ.get(SLOW_QUERY_MS_ENV, ""))
+    except ValueError:
+        return SLOW_QUERY_MS
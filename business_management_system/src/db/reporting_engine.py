@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+import datetime
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# NumPy is optional: without it reports are computed by the pure-Python path
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Orders whose lines are pulled from SQLite per chunk (about four lines each)
+REPORT_CHUNK_ORDERS = 50000
+
+REPORT_BUCKETS = ("hour", "day", "week", "month")
+REPORT_GROUPINGS = ("category", "location")
+
+# Bits per field of the combined group key: bucket, category_id, location_id.
+# Ids or buckets that do not fit send the report down the row-by-row path.
+_KEY_BITS = 21
+_KEY_MASK = (1 << _KEY_BITS) - 1
+
+# Paid orders in a range: order_id, epoch seconds, location_id
+PAID_ORDERS_SQL = """
+    SELECT order_id, CAST(strftime('%s', order_time) AS INTEGER), location_id
+    FROM Orders
+    WHERE status = 'Paid' AND order_time >= ? AND order_time < ?
+    ORDER BY order_id
+"""
+
+# Lines of a contiguous range of order ids: order_id, product_id, quantity, subtotal, line cost
+ORDER_ITEMS_SQL = """
+    SELECT order_id, product_id, quantity, subtotal, cost_at_order * quantity
+    FROM OrderItems
+    WHERE order_id BETWEEN ? AND ?
+"""
+
+# Row-by-row equivalent of the two queries above, used without NumPy.
+# Columns: order_id, epoch seconds, month index ((year - 1970) * 12 + month - 1),
+# category_id, location_id, quantity, subtotal, line cost
+ORDER_LINES_SQL = """
+    SELECT o.order_id,
+           CAST(strftime('%s', o.order_time) AS INTEGER),
+           (CAST(substr(o.order_time, 1, 4) AS INTEGER) - 1970) * 12 + CAST(substr(o.order_time, 6, 2) AS INTEGER) - 1,
+           p.category_id, o.location_id, oi.quantity, oi.subtotal, oi.cost_at_order * oi.quantity
+    FROM Orders o
+    JOIN OrderItems oi ON oi.order_id = o.order_id
+    JOIN Products p ON p.product_id = oi.product_id
+    WHERE o.status = 'Paid' AND o.order_time >= ? AND o.order_time < ?
+"""
+
+def _bucket_of(bucket: str, seconds: int, month_index: int) -> int:
+    """Bucket number of one line; the vectorized path applies the same arithmetic to arrays."""
+    if bucket == "hour":
+        return seconds // 3600
+    if bucket == "day":
+        return seconds // 86400
+    if bucket == "week":
+        # Weeks start on Monday; 1970-01-01 was a Thursday
+        return (seconds // 86400 + 3) // 7
+    return month_index
+
+def bucket_label(bucket: str, number: int) -> str:
+    """Returns the start of a bucket as text ("2025-01-31 14:00", "2025-01-31", "2025-01")."""
+    if bucket == "month":
+        return f"{1970 + number // 12:04d}-{number % 12 + 1:02d}"
+    epoch = datetime.datetime(1970, 1, 1)
+    if bucket == "hour":
+        return (epoch + datetime.timedelta(hours=number)).strftime("%Y-%m-%d %H:00")
+    if bucket == "week":
+        return (epoch + datetime.timedelta(days=number * 7 - 3)).strftime("%Y-%m-%d")
+    return (epoch + datetime.timedelta(days=number)).strftime("%Y-%m-%d")
+
+def _check_arguments(bucket: str, group_by: Sequence[str]) -> None:
+    if bucket not in REPORT_BUCKETS:
+        raise ValueError(f"Unknown report bucket: {bucket}")
+    for name in group_by:
+        if name not in REPORT_GROUPINGS:
+            raise ValueError(f"Unknown report grouping: {name}")
+
+def _finish(totals: Dict[Tuple[int, int, int], List[float]], bucket: str,
+            group_by: Sequence[str]) -> List[Dict[str, Any]]:
+    """Turns {(bucket, category_id, location_id): [revenue, units, cost, orders]} into report rows."""
+    report, labels = [], {}
+    for (number, category_id, location_id), (revenue, units, cost, orders) in sorted(totals.items()):
+        if number not in labels:
+            labels[number] = bucket_label(bucket, number)
+        row = {"bucket": labels[number]}
+        if "category" in group_by:
+            row["category_id"] = category_id
+        if "location" in group_by:
+            row["location_id"] = location_id
+        margin = revenue - cost
+        row.update({
+            "revenue": round(revenue, 2),
+            "units": int(units),
+            "orders": int(orders),
+            "average_ticket": round(revenue / orders, 2) if orders else 0.0,
+            "cost": round(cost, 2),
+            "margin": round(margin, 2),
+            "margin_pct": round(margin * 100 / revenue, 1) if revenue else 0.0,
+        })
+        report.append(row)
+    return report
+
+def aggregate_lines_python(lines: Iterable[Sequence], bucket: str = "day",
+                           group_by: Sequence[str] = ()) -> List[Dict[str, Any]]:
+    """
+    Aggregates order lines one row at a time (used when NumPy is not installed).
+
+    Args:
+        lines: Rows in the column order of ORDER_LINES_SQL
+        bucket: One of REPORT_BUCKETS
+        group_by: Names from REPORT_GROUPINGS
+
+    Returns:
+        Report rows, see build_report()
+    """
+    _check_arguments(bucket, group_by)
+    by_category, by_location = "category" in group_by, "location" in group_by
+    totals: Dict[Tuple[int, int, int], List[float]] = {}
+    orders_seen = set()
+    for order_id, seconds, month_index, category_id, location_id, quantity, subtotal, cost in lines:
+        key = (_bucket_of(bucket, seconds, month_index),
+               category_id if by_category else 0,
+               location_id if by_location else 0)
+        entry = totals.get(key)
+        if entry is None:
+            entry = totals[key] = [0.0, 0, 0.0, 0]
+        entry[0] += subtotal
+        entry[1] += quantity
+        entry[2] += cost
+        if (key, order_id) not in orders_seen:
+            orders_seen.add((key, order_id))
+            entry[3] += 1
+    return _finish(totals, bucket, group_by)
+
+def _bucket_array(bucket: str, seconds: "np.ndarray") -> "np.ndarray":
+    if bucket == "hour":
+        return seconds // 3600
+    if bucket == "day":
+        return seconds // 86400
+    if bucket == "week":
+        return (seconds // 86400 + 3) // 7
+    return seconds.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+
+def _category_lookup(conn: sqlite3.Connection) -> "np.ndarray":
+    """Array mapping product_id to category_id (0 for unknown products)."""
+    rows = conn.execute("SELECT product_id, COALESCE(category_id, 0) FROM Products").fetchall()
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    lookup = np.zeros(int(ids.max()) + 1 if len(ids) else 1, dtype=np.int64)
+    lookup[ids] = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+    return lookup
+
+def _build_report_numpy(conn: sqlite3.Connection, start: str, end: str, bucket: str,
+                        group_by: Sequence[str], chunk_orders: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Vectorized build_report(): the paid orders of the range are streamed
+    into arrays, then their OrderItems are pulled in order-id ranges of
+    chunk_orders orders. Each chunk is joined to its orders with
+    searchsorted and reduced with np.unique/np.bincount on an int64 key that
+    packs bucket, category_id and location_id. Chunks never split an order,
+    so per-chunk order counts add up exactly.
+
+    Returns None, before reading any order lines, when a bucket,
+    category_id or location_id does not fit in _KEY_BITS.
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(PAID_ORDERS_SQL, (start, end))
+    id_parts, bucket_parts, location_parts = [], [], []
+    while True:
+        orders = cursor.fetchmany(chunk_orders)
+        if not orders:
+            break
+        id_parts.append(np.fromiter((row[0] for row in orders), dtype=np.int64, count=len(orders)))
+        bucket_parts.append(_bucket_array(bucket, np.fromiter((row[1] for row in orders), dtype=np.int64,
+                                                              count=len(orders))))
+        if "location" in group_by:
+            location_parts.append(np.fromiter((row[2] or 0 for row in orders), dtype=np.int64, count=len(orders)))
+    if not id_parts:
+        return []
+    order_ids = np.concatenate(id_parts)
+    order_buckets = np.concatenate(bucket_parts)
+    fields = [order_buckets]
+    order_keys = order_buckets << (2 * _KEY_BITS)
+    if location_parts:
+        order_locations = np.concatenate(location_parts)
+        fields.append(order_locations)
+        order_keys |= order_locations
+    del id_parts, bucket_parts, location_parts
+    categories = _category_lookup(conn) if "category" in group_by else None
+    if categories is not None:
+        fields.append(categories)
+    if any(field.min() < 0 or field.max() > _KEY_MASK for field in fields):
+        return None
+
+    keys, sums = [], []
+    for first in range(0, len(order_ids), chunk_orders):
+        chunk_ids = order_ids[first:first + chunk_orders]
+        rows = cursor.execute(ORDER_ITEMS_SQL, (int(chunk_ids[0]), int(chunk_ids[-1]))).fetchall()
+        if not rows:
+            continue
+        lines = np.array(rows, dtype=np.float64)
+        # Lines of orders that are not paid or outside the range share the id span; drop them
+        line_orders = lines[:, 0].astype(np.int64)
+        position = np.minimum(np.searchsorted(chunk_ids, line_orders), len(chunk_ids) - 1)
+        lines = lines[chunk_ids[position] == line_orders]
+        position = position[chunk_ids[position] == line_orders]
+        if not len(lines):
+            continue
+
+        line_keys = order_keys[first + position]
+        if categories is not None:
+            product_ids = np.minimum(lines[:, 1].astype(np.int64), len(categories) - 1)
+            line_keys = line_keys | (categories[product_ids] << _KEY_BITS)
+        unique_keys, inverse = np.unique(line_keys, return_inverse=True)
+        groups = len(unique_keys)
+        # Distinct (group, order) pairs give the order count of each group
+        pairs = np.unique(inverse.astype(np.int64) * len(chunk_ids) + position)
+        keys.append(unique_keys)
+        sums.append(np.stack([
+            np.bincount(inverse, weights=lines[:, 3], minlength=groups),
+            np.bincount(inverse, weights=lines[:, 2], minlength=groups),
+            np.bincount(inverse, weights=lines[:, 4], minlength=groups),
+            np.bincount(pairs // len(chunk_ids), minlength=groups),
+        ], axis=1))
+    if not keys:
+        return []
+
+    unique_keys, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+    sums = np.concatenate(sums)
+    revenue, units, cost, order_count = (np.bincount(inverse, weights=sums[:, column], minlength=len(unique_keys))
+                                         for column in range(4))
+    margin = revenue - cost
+    with np.errstate(divide="ignore", invalid="ignore"):
+        average_ticket = np.where(order_count > 0, np.round(revenue / order_count, 2), 0.0)
+        margin_pct = np.where(revenue != 0, np.round(margin * 100 / revenue, 1), 0.0)
+    columns = {
+        "revenue": np.round(revenue, 2).tolist(),
+        "units": units.astype(np.int64).tolist(),
+        "orders": order_count.astype(np.int64).tolist(),
+        "average_ticket": average_ticket.tolist(),
+        "cost": np.round(cost, 2).tolist(),
+        "margin": np.round(margin, 2).tolist(),
+        "margin_pct": margin_pct.tolist(),
+    }
+    if "location" in group_by:
+        columns = {"location_id": (unique_keys & _KEY_MASK).tolist(), **columns}
+    if "category" in group_by:
+        columns = {"category_id": ((unique_keys >> _KEY_BITS) & _KEY_MASK).tolist(), **columns}
+    labels = {}
+    bucket_column = []
+    for number in (unique_keys >> (2 * _KEY_BITS)).tolist():
+        if number not in labels:
+            labels[number] = bucket_label(bucket, number)
+        bucket_column.append(labels[number])
+    names = ["bucket", *columns]
+    return [dict(zip(names, values)) for values in zip(bucket_column, *columns.values())]
+
+def build_report(conn: sqlite3.Connection, start: str, end: str, bucket: str = "day",
+                 group_by: Sequence[str] = (), chunk_orders: int = REPORT_CHUNK_ORDERS,
+                 use_numpy: Optional[bool] = None) -> List[Dict[str, Any]]:
+    """
+    Computes revenue, units, orders, average ticket and margin per time bucket.
+
+    Paid order lines in [start, end) are pulled in chunks and aggregated
+    with vectorized NumPy group-bys, or row by row when NumPy is not
+    available or an id is too large for the packed group key.
+
+    Args:
+        conn: Open connection
+        start: First instant, inclusive ("YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS", as stored in order_time)
+        end: End instant, exclusive
+        bucket: Time bucket, one of REPORT_BUCKETS
+        group_by: Further groupings from REPORT_GROUPINGS (category, location)
+        chunk_orders: Orders whose lines are pulled per chunk
+        use_numpy: Use the vectorized (True) or Python (False) path; None picks automatically
+
+    Returns:
+        Rows sorted by bucket, each with bucket (label), category_id and
+        location_id when grouped, revenue, units, orders, average_ticket,
+        cost, margin and margin_pct
+    """
+    _check_arguments(bucket, group_by)
+    if NUMPY_AVAILABLE if use_numpy is None else use_numpy:
+        report = _build_report_numpy(conn, start, end, bucket, group_by, chunk_orders)
+        if report is not None:
+            return report
+
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(ORDER_LINES_SQL, (start, end))
+    return aggregate_lines_python(cursor, bucket, group_by)
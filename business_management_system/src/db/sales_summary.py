@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence
+
+# Report groupings: name -> (select expression, GROUP BY expression)
+SALES_GROUPINGS = {
+    "day": ("ds.sale_date AS day", "ds.sale_date"),
+    "month": ("substr(ds.sale_date, 1, 7) AS month", "substr(ds.sale_date, 1, 7)"),
+    "category": ("COALESCE(c.name, 'Category ' || ds.category_id) AS category", "ds.category_id"),
+    "product": ("COALESCE(p.name, 'Product ' || ds.product_id) AS product", "ds.product_id"),
+    "payment_method": ("ds.payment_method AS payment_method", "ds.payment_method"),
+    "location": ("COALESCE(l.location_name, 'Location ' || ds.location_id) AS location", "ds.location_id"),
+}
+
+# Groupings available for order-level figures (order count, average ticket)
+ORDER_GROUPINGS = ("day", "month", "payment_method", "location")
+
+def record_order_sales(conn: sqlite3.Connection, order_id: int) -> None:
+    """
+    Adds a paid order to the daily summary tables.
+
+    Must run in the transaction that marks the order paid, after its
+    OrderItems are written, so the summaries commit or roll back with it.
+
+    Args:
+        conn: Connection inside the order's write transaction
+        order_id: The paid order
+    """
+    conn.execute("""
+        INSERT INTO DailySales
+        (sale_date, product_id, category_id, payment_method, location_id, line_count, units, revenue)
+        SELECT date(o.payment_time), oi.product_id, p.category_id, COALESCE(o.payment_method, ''),
+               o.location_id, COUNT(*), SUM(oi.quantity), SUM(oi.subtotal)
+        FROM Orders o
+        JOIN OrderItems oi ON oi.order_id = o.order_id
+        JOIN Products p ON p.product_id = oi.product_id
+        WHERE o.order_id = ?
+        GROUP BY oi.product_id
+        ON CONFLICT (sale_date, product_id, category_id, payment_method, location_id) DO UPDATE SET
+            line_count = line_count + excluded.line_count,
+            units = units + excluded.units,
+            revenue = revenue + excluded.revenue
+    """, (order_id,))
+    conn.execute("""
+        INSERT INTO DailyOrderTotals (sale_date, payment_method, location_id, order_count, revenue)
+        SELECT date(payment_time), COALESCE(payment_method, ''), location_id, 1, total_amount
+        FROM Orders
+        WHERE order_id = ?
+        ON CONFLICT (sale_date, payment_method, location_id) DO UPDATE SET
+            order_count = order_count + 1,
+            revenue = revenue + excluded.revenue
+    """, (order_id,))
+
+def _date_range_condition(column: str, start_date: Optional[str], end_date: Optional[str]) -> tuple:
+    conditions, params = [], []
+    if start_date:
+        conditions.append(f"{column} >= ?")
+        params.append(start_date)
+    if end_date:
+        conditions.append(f"{column} <= ?")
+        params.append(end_date)
+    return (" AND ".join(conditions) or "1 = 1"), params
+
+def _payment_range_condition(start_date: Optional[str], end_date: Optional[str]) -> tuple:
+    # A range on payment_time itself, so idx_orders_status_payment_time can serve it
+    conditions, params = [], []
+    if start_date:
+        conditions.append("o.payment_time >= ?")
+        params.append(start_date)
+    if end_date:
+        conditions.append("o.payment_time < date(?, '+1 day')")
+        params.append(end_date)
+    return (" AND ".join(conditions) or "1 = 1"), params
+
+def rebuild_sales_summaries(conn: sqlite3.Connection, start_date: Optional[str] = None,
+                            end_date: Optional[str] = None) -> int:
+    """
+    Regenerates the summary tables from Orders and OrderItems.
+
+    Only paid orders are counted. Should run inside a write transaction.
+
+    Args:
+        conn: Open connection
+        start_date: First day to rebuild ("YYYY-MM-DD"), or None for no lower bound
+        end_date: Last day to rebuild, inclusive, or None for no upper bound
+
+    Returns:
+        Number of DailySales rows written
+    """
+    summary_range, params = _date_range_condition("sale_date", start_date, end_date)
+    order_range, order_params = _payment_range_condition(start_date, end_date)
+    conn.execute(f"DELETE FROM DailySales WHERE {summary_range}", params)
+    conn.execute(f"DELETE FROM DailyOrderTotals WHERE {summary_range}", params)
+    cursor = conn.execute(f"""
+        INSERT INTO DailySales
+        (sale_date, product_id, category_id, payment_method, location_id, line_count, units, revenue)
+        SELECT date(o.payment_time), oi.product_id, p.category_id, COALESCE(o.payment_method, ''),
+               o.location_id, COUNT(*), SUM(oi.quantity), SUM(oi.subtotal)
+        FROM Orders o
+        JOIN OrderItems oi ON oi.order_id = o.order_id
+        JOIN Products p ON p.product_id = oi.product_id
+        WHERE o.status = 'Paid' AND o.payment_time IS NOT NULL AND {order_range}
+        GROUP BY 1, 2, 3, 4, 5
+    """, order_params)
+    rows = cursor.rowcount
+    conn.execute(f"""
+        INSERT INTO DailyOrderTotals (sale_date, payment_method, location_id, order_count, revenue)
+        SELECT date(o.payment_time), COALESCE(o.payment_method, ''), o.location_id, COUNT(*), SUM(o.total_amount)
+        FROM Orders o
+        WHERE o.status = 'Paid' AND o.payment_time IS NOT NULL AND {order_range}
+        GROUP BY 1, 2, 3
+    """, order_params)
+    return rows
+
+def get_rebuild_ranges(conn: sqlite3.Connection, start_date: Optional[str] = None,
+                       end_date: Optional[str] = None) -> List[tuple]:
+    """
+    Splits a rebuild into calendar months, one short write transaction each.
+
+    The first and last ranges keep the caller's open bounds, so summary rows
+    outside the months with paid orders are still cleared.
+
+    Args:
+        conn: Open connection
+        start_date: First day to rebuild, or None for no lower bound
+        end_date: Last day to rebuild, inclusive, or None for no upper bound
+
+    Returns:
+        List of (start_date, end_date) pairs for rebuild_sales_summaries
+    """
+    first, last = conn.execute(
+        "SELECT date(MIN(payment_time)), date(MAX(payment_time)) FROM Orders WHERE status = 'Paid'"
+    ).fetchone()
+    first = max(first, start_date) if first and start_date else first or start_date
+    last = min(last, end_date) if last and end_date else last or end_date
+    if not first or not last or first > last:
+        return [(start_date, end_date)]
+
+    ranges = []
+    month = first[:7] + "-01"
+    while month <= last:
+        next_month = conn.execute("SELECT date(?, '+1 month')", (month,)).fetchone()[0]
+        month_end = conn.execute("SELECT date(?, '-1 day')", (next_month,)).fetchone()[0]
+        ranges.append((month, month_end))
+        month = next_month
+    ranges[0] = (start_date, ranges[0][1])
+    ranges[-1] = (ranges[-1][0], end_date)
+    return ranges
+
+def backfill_sales_summaries(conn: sqlite3.Connection, batch_size: int) -> int:
+    """
+    Fills the summary tables from existing orders, newest day first, a few days per call.
+
+    Batch step for the migration that adds the tables: each call rebuilds
+    the day before the oldest day summarized so far, and further days while
+    fewer than batch_size orders have been rebuilt. Resumes from the
+    summaries already written if the upgrade is interrupted.
+
+    Args:
+        conn: Connection inside a write transaction
+        batch_size: Orders to rebuild per call, at least one whole day
+
+    Returns:
+        Number of days rebuilt, 0 once every day with paid orders is summarized
+    """
+    days = orders = 0
+    while orders < batch_size:
+        oldest = conn.execute("SELECT MIN(sale_date) FROM DailyOrderTotals").fetchone()[0]
+        day = conn.execute(f"""
+            SELECT date(MAX(payment_time)) FROM Orders
+            WHERE status = 'Paid' {"AND payment_time < ?" if oldest else ""}
+        """, (oldest,) if oldest else ()).fetchone()[0]
+        if day is None:
+            break
+        rebuild_sales_summaries(conn, day, day)
+        orders += conn.execute(
+            "SELECT COALESCE(SUM(order_count), 0) FROM DailyOrderTotals WHERE sale_date = ?", (day,)
+        ).fetchone()[0]
+        days += 1
+    return days
+
+def _check_groupings(group_by: Sequence[str], allowed: Sequence[str]) -> None:
+    for name in group_by:
+        if name not in allowed:
+            raise ValueError(f"Unknown report grouping: {name}")
+
+def get_sales_report(conn: sqlite3.Connection, start_date: str, end_date: str,
+                     group_by: Sequence[str] = ("day",)) -> List[Dict[str, Any]]:
+    """
+    Aggregates units and revenue from DailySales for a date range.
+
+    Args:
+        conn: Open connection
+        start_date: First day ("YYYY-MM-DD")
+        end_date: Last day, inclusive
+        group_by: Names from SALES_GROUPINGS; an empty list gives one total row
+
+    Returns:
+        One dictionary per group with the grouping columns, line_count, units and revenue
+    """
+    _check_groupings(group_by, list(SALES_GROUPINGS))
+    select = [SALES_GROUPINGS[name][0] for name in group_by]
+    group = [SALES_GROUPINGS[name][1] for name in group_by]
+    rows = conn.execute(f"""
+        SELECT {"".join(column + ", " for column in select)}
+               SUM(ds.line_count) AS line_count, SUM(ds.units) AS units, ROUND(SUM(ds.revenue), 2) AS revenue
+        FROM DailySales ds
+        LEFT JOIN Products p ON p.product_id = ds.product_id
+        LEFT JOIN Categories c ON c.category_id = ds.category_id
+        LEFT JOIN SalesLocations l ON l.location_id = ds.location_id
+        WHERE ds.sale_date BETWEEN ? AND ?
+        {"GROUP BY " + ", ".join(group) if group else ""}
+        ORDER BY {", ".join(str(i + 1) for i in range(len(group))) or "1"}
+    """, (start_date, end_date)).fetchall()
+    return [dict(row) for row in rows if row["units"] is not None]
+
+def get_order_totals(conn: sqlite3.Connection, start_date: str, end_date: str,
+                     group_by: Sequence[str] = ()) -> List[Dict[str, Any]]:
+    """
+    Aggregates order counts, revenue and average ticket from DailyOrderTotals.
+
+    Args:
+        conn: Open connection
+        start_date: First day ("YYYY-MM-DD")
+        end_date: Last day, inclusive
+        group_by: Names from ORDER_GROUPINGS; an empty list gives one total row
+
+    Returns:
+        One dictionary per group with the grouping columns, order_count,
+        revenue and average_ticket
+    """
+    _check_groupings(group_by, ORDER_GROUPINGS)
+    select = [SALES_GROUPINGS[name][0] for name in group_by]
+    group = [SALES_GROUPINGS[name][1] for name in group_by]
+    rows = conn.execute(f"""
+        SELECT {"".join(column + ", " for column in select)}
+               SUM(ds.order_count) AS order_count, ROUND(SUM(ds.revenue), 2) AS revenue,
+               ROUND(SUM(ds.revenue) / SUM(ds.order_count), 2) AS average_ticket
+        FROM DailyOrderTotals ds
+        LEFT JOIN SalesLocations l ON l.location_id = ds.location_id
+        WHERE ds.sale_date BETWEEN ? AND ?
+        {"GROUP BY " + ", ".join(group) if group else ""}
+        ORDER BY {", ".join(str(i + 1) for i in range(len(group))) or "1"}
+    """, (start_date, end_date)).fetchall()
+    return [dict(row) for row in rows if row["order_count"] is not None]
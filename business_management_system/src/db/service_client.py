@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+import atexit
+import functools
+import http.client
+import inspect
+import json
+import threading
+import time
+import urllib.parse
+from typing import Any, Callable, Dict, List, Optional
+
+# BMS_SERVICE_URL points the desktop app at a database service (see
+# service_server.py) instead of the local database file
+SERVICE_URL_ENV = "BMS_SERVICE_URL"
+SERVICE_TOKEN_ENV = "BMS_SERVICE_TOKEN"
+SERVICE_TOKEN_HEADER = "X-BMS-Token"
+SERVICE_TIMEOUT = 30.0
+
+# Seconds between catalog change checks; lookups in between are pure dict reads
+REMOTE_CATALOG_CHECK_INTERVAL = 0.5
+
+# Audit records sent to the service per request at most, and how long one may wait
+REMOTE_AUDIT_BATCH_SIZE = 200
+REMOTE_AUDIT_FLUSH_INTERVAL = 0.5
+
+_RAISE = object()
+
+# The client installed by use_service(), if this process works through a service
+_active_client: Optional["ServiceClient"] = None
+
+# database_manager functions answered by the service, with the value each
+# returns when the service cannot be reached (the local function's error value)
+REMOTE_OPERATIONS: Dict[str, Any] = {
+    "is_system_initialized": False,
+    "initialize_system": False,
+    "verify_license": False,
+    "verify_user": (False, None, None, None),
+    "add_user": False,
+    "update_user": False,
+    "get_user_by_id": None,
+    "get_all_users": [],
+    "get_business_info": None,
+    "update_business_info": False,
+    "get_products": [],
+    "adjust_stock": False,
+    "get_sales_locations": [],
+    "get_categories": [],
+    "get_sales_summary": [],
+    "get_order_summary": [],
+    "rebuild_sales_summary": False,
+    "get_sales_analysis": _RAISE,
+    "get_audit_log_page": [],
+}
+
+# Operations that only read, so they can be resent after a dropped connection
+READ_OPERATIONS = {
+    "is_system_initialized", "verify_license", "get_user_by_id", "get_all_users", "get_business_info",
+    "get_products", "get_sales_locations", "get_categories", "get_sales_summary", "get_order_summary",
+    "get_sales_analysis", "get_audit_log_page", "get_checkout_stats", "get_catalog_changes",
+    "get_stock_at", "get_stock_levels_at", "get_stock_valuation",
+}
+
+class ServiceError(Exception):
+    """Raised when the database service cannot be reached or rejects a call."""
+
+class ServiceClient:
+    """
+    Calls the database service over HTTP/JSON.
+
+    Each thread keeps its own keep-alive connection, so the UI thread and
+    the database worker pool never queue behind each other. A read is sent
+    again once if the connection turns out to have been closed by the
+    service; a write is not, because the service may already have run it.
+    """
+
+    def __init__(self, base_url: str, token: Optional[str] = None, timeout: float = SERVICE_TIMEOUT):
+        """
+        Args:
+            base_url: Service address, e.g. http://127.0.0.1:8765
+            token: Shared secret expected by the service, if it has one
+            timeout: Seconds to wait for a response
+        """
+        parsed = urllib.parse.urlsplit(base_url)
+        if parsed.scheme != "http" or not parsed.hostname:
+            raise ValueError(f"Unsupported service URL: {base_url}")
+        self.base_url = base_url
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.token = token
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _drop_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None) -> Any:
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers[SERVICE_TOKEN_HEADER] = self.token
+        conn = self._connection()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self._drop_connection()
+            raise ServiceError(f"Database service unreachable at {self.base_url}: {e}") from e
+        try:
+            data = json.loads(payload)
+        except ValueError as e:
+            raise ServiceError(f"Invalid response from the database service: {e}") from e
+        if response.status != 200:
+            raise ServiceError(data.get("error", f"HTTP {response.status}"))
+        return data.get("result")
+
+    def call(self, operation: str, **kwargs) -> Any:
+        """
+        Runs an operation on the service.
+
+        Args:
+            operation: Name from service_server.SERVICE_OPERATIONS
+            **kwargs: The operation's arguments (JSON serializable)
+
+        Returns:
+            The operation's result as decoded from JSON (tuples become lists)
+
+        Raises:
+            ServiceError: If the service cannot be reached or the call fails
+        """
+        body = json.dumps(kwargs).encode("utf-8")
+        path = f"/api/{operation}"
+        reused = getattr(self._local, "conn", None) is not None
+        try:
+            return self._request("POST", path, body)
+        except ServiceError:
+            # An idle keep-alive connection may have been closed by the service
+            if not reused or operation not in READ_OPERATIONS or getattr(self._local, "conn", None) is not None:
+                raise
+            return self._request("POST", path, body)
+
+    def health(self) -> bool:
+        """Returns True if the service answers."""
+        try:
+            return self._request("GET", "/health") == "ok"
+        except ServiceError:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the service's request and write batching counters."""
+        return self._request("GET", "/stats")
+
+    def close(self) -> None:
+        """Closes the calling thread's connection."""
+        self._drop_connection()
+
+class RemoteCatalog:
+    """
+    Product catalog of a terminal working through the database service.
+
+    Offers the lookups of CatalogCache. At most every check_interval seconds
+    it asks the service for the products changed since its last update
+    (get_catalog_changes), so a lookup is normally a dict access and a check
+    transfers only the changed products.
+    """
+
+    def __init__(self, client: ServiceClient, check_interval: float = REMOTE_CATALOG_CHECK_INTERVAL):
+        self._client = client
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._products: Dict[int, Dict[str, Any]] = {}
+        self._ids_by_name: Dict[str, int] = {}
+        self._last_change_id: Optional[int] = None
+        self._checked_at = 0.0
+        self._stats = {"hits": 0, "misses": 0, "full_reloads": 0, "incremental_reloads": 0, "products_reloaded": 0}
+
+    def _refresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and self._last_change_id is not None and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            changes = self._client.call("get_catalog_changes", since=self._last_change_id)
+        except ServiceError as e:
+            print(f"Error refreshing product catalog: {e}")
+            return
+        if changes["full"]:
+            self._products = {}
+            self._ids_by_name = {}
+            self._stats["full_reloads"] += 1
+        elif changes["product_ids"]:
+            for product_id in changes["product_ids"]:
+                old = self._products.pop(product_id, None)
+                if old is not None and self._ids_by_name.get(old["name"]) == product_id:
+                    del self._ids_by_name[old["name"]]
+            self._stats["incremental_reloads"] += 1
+            self._stats["products_reloaded"] += len(changes["product_ids"])
+        for product in changes["products"]:
+            self._products[product["product_id"]] = product
+            self._ids_by_name[product["name"]] = product["product_id"]
+        self._last_change_id = changes["last_change_id"]
+
+    def _lookup(self, product_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        product = self._products.get(product_id) if product_id is not None else None
+        self._stats["hits" if product is not None else "misses"] += 1
+        return product
+
+    def get_product(self, product_id: int) -> Optional[Dict[str, Any]]:
+        """Gets a product by ID (shared, do not modify), or None if unknown."""
+        with self._lock:
+            self._refresh()
+            return self._lookup(product_id)
+
+    def get_product_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """Gets a product by name (shared, do not modify), or None if unknown."""
+        with self._lock:
+            self._refresh()
+            return self._lookup(self._ids_by_name.get(name))
+
+    def get_price(self, product_id: int) -> Optional[float]:
+        """Returns the price of a product, or None if it is unknown."""
+        product = self.get_product(product_id)
+        return product["price"] if product is not None else None
+
+    def get_products(self, available_only: bool = True) -> List[Dict[str, Any]]:
+        """Gets all products ordered by name (copies)."""
+        with self._lock:
+            self._refresh()
+            products = [dict(product) for product in self._products.values()
+                        if product["is_available"] or not available_only]
+        return sorted(products, key=lambda product: product["name"])
+
+    def notify_products_changed(self) -> None:
+        """Fetches pending catalog changes now, after a sale made by this terminal."""
+        with self._lock:
+            if self._last_change_id is not None:
+                self._refresh(force=True)
+
+    def invalidate(self) -> None:
+        """Drops the catalog; the next lookup fetches it in full."""
+        with self._lock:
+            self._last_change_id = None
+
+    def close(self) -> None:
+        """Drops the catalog."""
+        with self._lock:
+            self._products = {}
+            self._ids_by_name = {}
+            self._last_change_id = None
+
+    def stats(self) -> Dict[str, int]:
+        """Returns lookup and reload counters and the number of products held."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["products"] = len(self._products)
+        return stats
+
+class RemoteAuditLog:
+    """
+    Sends AuditLog records to the service in the background.
+
+    log_action() only queues the record, as it does locally; a daemon thread
+    sends queued records together (log_actions) every flush_interval seconds
+    or once batch_size are waiting, and pending records are sent at exit.
+    """
+
+    def __init__(self, client: ServiceClient, batch_size: int = REMOTE_AUDIT_BATCH_SIZE,
+                 flush_interval: float = REMOTE_AUDIT_FLUSH_INTERVAL):
+        self._client = client
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._condition = threading.Condition()
+        self._pending: List[list] = []
+        self._sending = 0
+        self._thread: Optional[threading.Thread] = None
+        atexit.register(self.flush)
+
+    def log_action(self, user_id: Optional[int], action_type: str, action_details: str) -> None:
+        """Queues an AuditLog record for the service."""
+        with self._condition:
+            self._pending.append([user_id, action_type, action_details])
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="remote-audit", daemon=True)
+                self._thread.start()
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if len(self._pending) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                records, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+                self._sending = len(records)
+            if records:
+                try:
+                    self._client.call("log_actions", records=records)
+                except ServiceError as e:
+                    print(f"Error sending {len(records)} audit records: {e}")
+            with self._condition:
+                self._sending = 0
+                self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """
+        Sends every queued record and has the service write its queue to the database.
+
+        Args:
+            timeout: Maximum seconds to wait for each step (None waits indefinitely)
+
+        Returns:
+            True if all records were written, False on timeout or error
+        """
+        with self._condition:
+            self._condition.notify_all()
+            if not self._condition.wait_for(lambda: not self._pending and not self._sending, timeout):
+                return False
+        try:
+            return bool(self._client.call("flush_audit_log", timeout=timeout))
+        except ServiceError as e:
+            print(f"Error flushing the audit log on the database service: {e}")
+            return False
+
+def _remote_function(client: ServiceClient, operation: str, local: Callable[..., Any],
+                     fallback: Any) -> Callable[..., Any]:
+    """Wraps an operation so it takes the local function's arguments and error value."""
+    signature = inspect.signature(local)
+
+    @functools.wraps(local)
+    def remote(*args, **kwargs):
+        arguments = signature.bind(*args, **kwargs).arguments
+        try:
+            return client.call(operation, **arguments)
+        except ServiceError as e:
+            if fallback is _RAISE:
+                raise
+            print(f"Error calling {operation} on the database service: {e}")
+            return fallback
+    return remote
+
+def is_using_service() -> bool:
+    """Returns True if use_service() sent this process's database calls to a service."""
+    return _active_client is not None
+
+def use_service(base_url: str, token: Optional[str] = None) -> ServiceClient:
+    """
+    Sends the database calls of this process to a database service.
+
+    Replaces the database_manager functions in REMOTE_OPERATIONS, the
+    catalog, the audit log and order_engine.checkout with calls to the
+    service. Must run before the UI modules import them. Owner tools that
+    work on the local file (log export, query statistics) check
+    is_using_service() and stay off.
+
+    Args:
+        base_url: Service address, e.g. http://127.0.0.1:8765
+        token: Shared secret expected by the service, if it has one
+
+    Returns:
+        The client used for the calls
+    """
+    global _active_client
+    from db import database_manager
+    from db import order_engine
+
+    client = ServiceClient(base_url, token)
+    _active_client = client
+    for operation, fallback in REMOTE_OPERATIONS.items():
+        local = getattr(database_manager, operation)
+        setattr(database_manager, operation, _remote_function(client, operation, local, fallback))
+
+    catalog = RemoteCatalog(client)
+    audit_log = RemoteAuditLog(client)
+    database_manager.get_catalog_cache = lambda: catalog
+    database_manager.log_action = audit_log.log_action
+    database_manager.flush_audit_log = audit_log.flush
+
+    def checkout(cart, location_id: int, user_id: int, payment_method: str = "Cash") -> Dict[str, Any]:
+        try:
+            result = client.call("checkout", cart=[list(line) for line in cart], location_id=location_id,
+                                 user_id=user_id, payment_method=payment_method)
+        except ServiceError as e:
+            print(f"Error calling checkout on the database service: {e}")
+            return {"success": False, "error": f"The sale could not be sent to the server: {e}"}
+        if result["success"]:
+            catalog.notify_products_changed()
+        return result
+    checkout.__doc__ = order_engine.checkout.__doc__
+    order_engine.checkout = checkout
+    return client
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import hmac
+import ipaddress
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Add the parent directory (src) to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from db import database_manager
+from db import inventory_checkpoints
+from db import order_engine
+from db.catalog_cache import PRODUCT_SELECT_SQL
+from db.service_client import SERVICE_TOKEN_ENV, SERVICE_TOKEN_HEADER
+
+# Network configuration. The service listens on localhost unless told otherwise;
+# BMS_SERVICE_TOKEN, when set, must be sent by every client in SERVICE_TOKEN_HEADER,
+# and must be set to listen on any other address.
+DEFAULT_SERVICE_HOST = "127.0.0.1"
+DEFAULT_SERVICE_PORT = 8765
+
+SERVICE_WORKERS = 8            # Threads running database calls (one pooled connection each)
+WRITE_BATCH_SIZE = 64          # Batched writes committed together at most
+MAX_REQUEST_BYTES = 1 << 20    # Largest request body accepted
+IDLE_TIMEOUT = 300             # Seconds an idle keep-alive connection is kept open
+
+def is_loopback_host(host: str) -> bool:
+    """Returns True if host only accepts connections from this computer."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+def get_catalog_changes(since: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Gets the products changed since a CatalogChanges position, for remote catalogs.
+
+    Args:
+        since: last_change_id returned by the previous call, or None for the whole catalog
+
+    Returns:
+        Dictionary with full (True if products is the whole catalog),
+        last_change_id, product_ids (the changed products, when not full)
+        and products (their current rows; a changed id without a row was deleted)
+    """
+    with database_manager.db_connection() as conn:
+        oldest, last = conn.execute("SELECT MIN(change_id), COALESCE(MAX(change_id), 0) FROM CatalogChanges").fetchone()
+        # Rows pruned before the caller saw them (or another database) need the whole catalog
+        full = since is None or since > last or (oldest or 0) > since + 1
+        changes = [] if full else conn.execute(
+            "SELECT product_id FROM CatalogChanges WHERE change_id > ?", (since,)
+        ).fetchall()
+        # So does a category change
+        if full or any(row["product_id"] is None for row in changes):
+            rows = conn.execute(PRODUCT_SELECT_SQL).fetchall()
+            return {"full": True, "last_change_id": last, "product_ids": [],
+                    "products": [dict(row) for row in rows]}
+        product_ids = sorted({row["product_id"] for row in changes})
+        rows = conn.execute(
+            f"{PRODUCT_SELECT_SQL} WHERE p.product_id IN ({', '.join('?' * len(product_ids))})", product_ids
+        ).fetchall() if product_ids else []
+    return {"full": False, "last_change_id": last, "product_ids": product_ids,
+            "products": [dict(row) for row in rows]}
+
+def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
+    """Gets user information by ID without the password hash, which never leaves the service."""
+    user = database_manager.get_user_by_id(user_id)
+    if user is not None:
+        user.pop("password_hash", None)
+    return user
+
+def log_actions(records: List[List[Any]]) -> int:
+    """
+    Queues several AuditLog records sent together by a client.
+
+    Args:
+        records: [user_id, action_type, action_details] lists
+
+    Returns:
+        Number of records queued
+    """
+    for user_id, action_type, action_details in records:
+        database_manager.log_action(user_id, action_type, action_details)
+    return len(records)
+
+# Operations callable at POST /api/<name>; the JSON body holds the keyword arguments
+SERVICE_OPERATIONS: Dict[str, Callable[..., Any]] = {
+    "is_system_initialized": database_manager.is_system_initialized,
+    "initialize_system": database_manager.initialize_system,
+    "verify_license": database_manager.verify_license,
+    "verify_user": database_manager.verify_user,
+    "add_user": database_manager.add_user,
+    "update_user": database_manager.update_user,
+    "get_user_by_id": get_user_by_id,
+    "get_all_users": database_manager.get_all_users,
+    "get_business_info": database_manager.get_business_info,
+    "update_business_info": database_manager.update_business_info,
+    "get_products": database_manager.get_products,
+    "adjust_stock": database_manager.adjust_stock,
+    "get_sales_locations": database_manager.get_sales_locations,
+    "get_categories": database_manager.get_categories,
+    "get_sales_summary": database_manager.get_sales_summary,
+    "get_order_summary": database_manager.get_order_summary,
+    "rebuild_sales_summary": database_manager.rebuild_sales_summary,
+    "get_sales_analysis": database_manager.get_sales_analysis,
+    "get_audit_log_page": database_manager.get_audit_log_page,
+    "log_action": database_manager.log_action,
+    "log_actions": log_actions,
+    "flush_audit_log": database_manager.flush_audit_log,
+    "checkout": order_engine.checkout,
+    "get_checkout_stats": order_engine.get_checkout_stats,
+    "get_catalog_changes": get_catalog_changes,
+    "get_stock_at": inventory_checkpoints.get_stock_at,
+    "get_stock_levels_at": inventory_checkpoints.get_stock_levels_at,
+    "get_stock_valuation": inventory_checkpoints.get_stock_valuation,
+}
+
+# Short writes committed in groups by the write batcher
+BATCHED_OPERATIONS = {"checkout", "adjust_stock"}
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+                405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+def _json_default(value: Any) -> Any:
+    """Serializes NumPy scalars (sales analysis rows) and bytes."""
+    if hasattr(value, "item"):
+        return value.item()
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+class ServiceServer:
+    """
+    HTTP/JSON service giving several terminals access to one database.
+
+    The service owns the database file: terminals send POST /api/<operation>
+    with the operation's keyword arguments as a JSON object and receive
+    {"result": ...} or {"error": ...}. Requests are parsed on the asyncio
+    event loop and the database calls run on a pool of SERVICE_WORKERS
+    threads, each with its own pooled connection.
+
+    Writes in BATCHED_OPERATIONS are queued to a single writer, which commits
+    whatever has queued up while the previous group was being written (up to
+    batch_size calls) in one BEGIN IMMEDIATE transaction. Each call runs in
+    its own savepoint, so a rejected sale only undoes its own statements, and
+    concurrent sales share one lock acquisition and one commit. Their audit
+    records and checkout counters are recorded only once that commit
+    succeeds (ConnectionManager.after_commit). GET /health
+    and GET /stats report the service's state.
+    """
+
+    def __init__(self, host: str = DEFAULT_SERVICE_HOST, port: int = DEFAULT_SERVICE_PORT,
+                 workers: int = SERVICE_WORKERS, batch_size: int = WRITE_BATCH_SIZE,
+                 token: Optional[str] = None):
+        """
+        Args:
+            host: Address to listen on
+            port: Port to listen on (0 picks a free port)
+            workers: Threads running database calls
+            batch_size: Batched writes committed together at most (1 commits each on its own)
+            token: Shared secret clients must send, or None to accept any localhost client
+
+        Raises:
+            ValueError: If host is not a loopback address and there is no token
+        """
+        if not token and not is_loopback_host(host):
+            raise ValueError(f"Refusing to listen on {host} without a service token: "
+                             f"set {SERVICE_TOKEN_ENV} so only your terminals can change the database.")
+        self.host = host
+        self.port = port
+        self.batch_size = max(1, batch_size)
+        self.token = token.encode("utf-8") if token else None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="service-writer")
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._write_task: Optional[asyncio.Task] = None
+        self._stats = {"requests": 0, "errors": 0, "connections": 0, "batches": 0,
+                       "batched_writes": 0, "largest_batch": 0}
+        self._started_at = time.monotonic()
+
+    async def start(self) -> None:
+        """Starts listening; self.port holds the actual port afterwards."""
+        self._write_queue = asyncio.Queue()
+        self._write_task = asyncio.create_task(self._write_loop())
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """Starts the service if needed and serves until cancelled."""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stops accepting connections and waits for running database calls."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._write_task is not None:
+            self._write_task.cancel()
+        self._executor.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns request, connection and write batching counters."""
+        stats = dict(self._stats)
+        stats["average_batch"] = stats["batched_writes"] / stats["batches"] if stats["batches"] else 0.0
+        stats["uptime_s"] = round(time.monotonic() - self._started_at, 1)
+        stats["checkout"] = order_engine.get_checkout_stats()
+        stats["write_lock"] = database_manager.get_write_stats()
+        return stats
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._stats["connections"] += 1
+        try:
+            while True:
+                request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line."}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                length = int(headers.get("content-length", "0") or 0)
+                if length > MAX_REQUEST_BYTES:
+                    await self._respond(writer, 413, {"error": "Request body too large."}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._dispatch(method, target, headers, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any],
+                       keep_alive: bool) -> None:
+        body = json.dumps(payload, default=_json_default).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def _dispatch(self, method: str, target: str, headers: Dict[str, str],
+                        body: bytes) -> Tuple[int, Dict[str, Any]]:
+        self._stats["requests"] += 1
+        # Header values arrive decoded as latin-1; compare the raw bytes in constant time
+        received = headers.get(SERVICE_TOKEN_HEADER.lower(), "").encode("latin-1")
+        if self.token is not None and not hmac.compare_digest(received, self.token):
+            self._stats["errors"] += 1
+            return 401, {"error": "Missing or wrong service token."}
+
+        path = target.split("?", 1)[0]
+        if method == "GET" and path == "/health":
+            return 200, {"result": "ok"}
+        if method == "GET" and path == "/stats":
+            return 200, {"result": self.stats()}
+        if not path.startswith("/api/"):
+            self._stats["errors"] += 1
+            return 404, {"error": f"Unknown path {path}."}
+        if method != "POST":
+            self._stats["errors"] += 1
+            return 405, {"error": "Operations must be called with POST."}
+
+        name = path[len("/api/"):]
+        func = SERVICE_OPERATIONS.get(name)
+        if func is None:
+            self._stats["errors"] += 1
+            return 404, {"error": f"Unknown operation {name}."}
+        try:
+            kwargs = json.loads(body) if body else {}
+            if not isinstance(kwargs, dict):
+                raise ValueError("the body must be a JSON object")
+        except ValueError as e:
+            self._stats["errors"] += 1
+            return 400, {"error": f"Invalid request body: {e}"}
+
+        try:
+            if name in BATCHED_OPERATIONS and self.batch_size > 1:
+                future = asyncio.get_running_loop().create_future()
+                self._write_queue.put_nowait((func, kwargs, future))
+                result = await future
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(self._executor, lambda: func(**kwargs))
+        except TypeError as e:
+            self._stats["errors"] += 1
+            return 400, {"error": f"Invalid arguments for {name}: {e}"}
+        except Exception as e:
+            self._stats["errors"] += 1
+            print(f"Service error in {name}: {e}")
+            return 500, {"error": str(e), "type": type(e).__name__}
+        return 200, {"result": result}
+
+    async def _write_loop(self) -> None:
+        """Commits queued writes in groups; calls queued during a commit form the next group."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._write_queue.get()]
+            while len(batch) < self.batch_size and not self._write_queue.empty():
+                batch.append(self._write_queue.get_nowait())
+            outcomes = await loop.run_in_executor(self._writer, self._run_batch, batch)
+            self._stats["batches"] += 1
+            self._stats["batched_writes"] += len(batch)
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+            for (_, _, future), (error, result) in zip(batch, outcomes):
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+    def _run_batch(self, batch: List[tuple]) -> List[Tuple[Optional[BaseException], Any]]:
+        """Runs a group of writes in one transaction (on the writer thread)."""
+        outcomes = []
+        try:
+            with database_manager.write_transaction():
+                for func, kwargs, _ in batch:
+                    try:
+                        outcomes.append((None, func(**kwargs)))
+                    except Exception as e:
+                        outcomes.append((e, None))
+        except sqlite3.Error as e:
+            # BEGIN or COMMIT failed: nothing in the group was saved
+            print(f"Service write batch of {len(batch)} failed: {e}")
+            return [(e, None)] * len(batch)
+        # Checkouts inside the group could not see their own commit
+        database_manager.get_catalog_cache().notify_products_changed()
+        return outcomes
+
+async def _serve(args) -> None:
+    server = ServiceServer(args.host, args.port, args.workers, args.batch_size,
+                           os.environ.get(SERVICE_TOKEN_ENV) or None)
+    await server.start()
+    print(f"Serving {os.path.abspath(database_manager.DATABASE_NAME)} on http://{server.host}:{server.port}",
+          flush=True)
+    # The terminals leave period closes to the service; started after the line
+    # above so its output cannot run into it
+    inventory_checkpoints.start_inventory_checkpoints(inventory_checkpoints.CHECKPOINT_INTERVAL)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the business database to several terminals")
+    parser.add_argument("--host", default=DEFAULT_SERVICE_HOST, help="Address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_SERVICE_PORT, help="Port to listen on (0 for any)")
+    parser.add_argument("--database", default=None, help="Database file (the application database by default)")
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="Threads running database calls")
+    parser.add_argument("--batch-size", type=int, default=WRITE_BATCH_SIZE,
+                        help="Sales and stock adjustments committed together at most (1 disables batching)")
+    args = parser.parse_args()
+
+    if not os.environ.get(SERVICE_TOKEN_ENV) and not is_loopback_host(args.host):
+        print(f"Refusing to listen on {args.host} without a service token. "
+              f"Set {SERVICE_TOKEN_ENV} on the server and on every terminal.")
+        sys.exit(1)
+    if args.database:
+        database_manager.configure_database(args.database)
+    if not database_manager.migrate_database():
+        sys.exit(1)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        database_manager.close_db_connections()
+
+if __name__ == "__main__":
+    main()
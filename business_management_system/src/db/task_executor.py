@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+# Worker threads for database calls made on behalf of the UI
+DB_TASK_WORKERS = 2
+
+class DBTaskExecutor:
+    """
+    Thread pool that runs database calls off the Tk thread.
+
+    Each worker opens its own pooled connection from the connection manager
+    when it starts, so tasks never share a connection with the UI thread;
+    ConnectionManager.close_all() closes them with the rest. The pool is
+    created on first use and shutdown() cancels queued tasks; the next
+    submit() starts a fresh pool.
+    """
+
+    def __init__(self, get_manager: Callable[[], Any], max_workers: int = DB_TASK_WORKERS):
+        """
+        Args:
+            get_manager: Returns the current ConnectionManager
+            max_workers: Number of worker threads
+        """
+        self._get_manager = get_manager
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _open_worker_connection(self) -> None:
+        self._get_manager().get_connection()
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Runs func(*args, **kwargs) on a worker thread.
+
+        Returns:
+            Future resolving to the function's result
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="db-task",
+                                                    initializer=self._open_worker_connection)
+            return self._executor.submit(func, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancels queued tasks and waits for running ones; the connection manager closes the workers' connections."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -1,23 +1,60 @@
 #!/usr/bin/env python3
-import customtkinter as ctk
-from tkinter import messagebox
 import os
 import sys
-import platform
-import datetime
-import uuid
+import time
 
 # Add the parent directory (src) to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from db.database_manager import (
-    verify_user, add_user, get_db_connection, is_system_initialized,
-    initialize_system, verify_license, get_hardware_id, log_action
-)
+from startup_profile import profiler, report_path_from_argv, run_with_importtime
+
+# --profile-startup [report.json]: time the startup phases and exit once the first frame is drawn.
+# The app re-runs itself under -X importtime so the report also has per-module import times.
+STARTUP_REPORT = report_path_from_argv(sys.argv)
+if (STARTUP_REPORT and __name__ == "__main__" and "importtime" not in sys._xoptions
+        and not getattr(sys, "frozen", False)):
+    sys.exit(run_with_importtime(os.path.abspath(__file__), sys.argv[1:]))
+if STARTUP_REPORT:
+    profiler.enable(STARTUP_REPORT)
+
+with profiler.span("imports"):
+    with profiler.span("customtkinter"):
+        import customtkinter as ctk
+        from tkinter import messagebox
+    import platform
+    import datetime
+    import importlib
+    import threading
+    import uuid
+
+    with profiler.span("db"):
+        # BMS_SERVICE_URL: work through a database service instead of the local file
+        from db.service_client import SERVICE_URL_ENV, SERVICE_TOKEN_ENV, use_service
+        SERVICE_URL = os.environ.get(SERVICE_URL_ENV)
+        if SERVICE_URL:
+            use_service(SERVICE_URL, os.environ.get(SERVICE_TOKEN_ENV))
+        from db.database_manager import (
+            verify_user, add_user, get_db_connection, is_system_initialized,
+            initialize_system, verify_license, get_hardware_id, log_action,
+            close_db_connections, precompute_hardware_id, get_password_service,
+            migrate_database
+        )
+        from db.log_archive import start_log_archival
+        from db.inventory_checkpoints import start_inventory_checkpoints
+        from ui.async_utils import TaskRunner
 
 # --- Constants ---
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "business_management.db")
 
+# Page name -> (module, class) of each frame App.show_frame() can build
+FRAME_CLASSES = {
+    "LoginFrame": ("ui.login_view", "LoginFrame"),
+    "OwnerDashboard": ("ui.owner_dashboard_view", "OwnerDashboard"),
+    "ManagerDashboard": ("ui.manager_dashboard_view", "ManagerDashboard"),
+    "CashierDashboard": ("ui.cashier_dashboard_view", "CashierDashboard"),
+    "AccountingDashboard": ("ui.accounting_dashboard_view", "AccountingDashboard"),
+}
+
 class App(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -27,13 +64,18 @@ class App(ctk.CTk):
         self.current_user_id = None
         self.current_username = None
         self.is_owner = False
+        self.tasks = TaskRunner(self)
 
         # Check if system is initialized
-        if not is_system_initialized():
+        with profiler.span("is_system_initialized"):
+            initialized = is_system_initialized()
+        if not initialized:
             self.show_initialization_frame()
         else:
             # Verify license before proceeding
-            if not verify_license():
+            with profiler.span("verify_license"):
+                license_valid = verify_license()
+            if not license_valid:
                 messagebox.showerror("License Error", "Invalid or expired license. Please contact the software vendor.")
                 self.quit()
                 return
@@ -45,7 +87,10 @@ class App(ctk.CTk):
             self.container.grid_columnconfigure(0, weight=1)
 
             self.frames = {}  # Store instances of frames
-            self.show_login_frame()
+            self.first_paint_ms = {}  # Page name -> milliseconds from show_frame() to first paint
+            self.preload_thread = None
+            with profiler.span("login frame"):
+                self.show_login_frame()
 
     def show_initialization_frame(self):
         """Shows the first-run initialization frame for owner setup."""
@@ -144,8 +189,13 @@ class App(ctk.CTk):
                 messagebox.showerror("Validation Error", "Passwords do not match.")
                 return
             
-            # Initialize the system
-            if initialize_system(username, password, owner_name, business_name):
+            # Initialize the system (bcrypt runs on the password worker pool)
+            future = get_password_service().submit(initialize_system, username, password, owner_name, business_name)
+            self.tasks.watch(future, lambda success: initialized(success, username, business_name),
+                             busy=[init_button])
+            
+        def initialized(success, username, business_name):
+            if success:
                 messagebox.showinfo("Setup Complete", 
                                    f"Business Management System has been initialized for {business_name}.\n\n"
                                    f"You can now log in as {username} with the password you provided.")
@@ -176,35 +226,51 @@ class App(ctk.CTk):
         version_label.pack(pady=(20, 10))
 
     def show_frame(self, page_name, *args):
-        """Shows a frame for the given page name. Args are passed to the frame constructor."""
-        for widget in self.container.winfo_children():
-            widget.destroy()
+        """
+        Shows a frame for the given page name. Args are passed to the frame constructor.
 
-        frame_class = None
-        if page_name == "LoginFrame":
-            from ui.login_view import LoginFrame
-            frame_class = LoginFrame
-        elif page_name == "ManagerDashboard":
-            from ui.manager_dashboard_view import ManagerDashboard
-            frame_class = ManagerDashboard
-        elif page_name == "CashierDashboard":
-            from ui.cashier_dashboard_view import CashierDashboard
-            frame_class = CashierDashboard
-        elif page_name == "AccountingDashboard":
-            from ui.accounting_dashboard_view import AccountingDashboard
-            frame_class = AccountingDashboard
-        elif page_name == "OwnerDashboard":
-            from ui.owner_dashboard_view import OwnerDashboard
-            frame_class = OwnerDashboard
-        else:
-            # If the requested frame doesn't exist yet, create a placeholder
-            frame_class = self.create_placeholder_dashboard(page_name)
+        Frames are built once and kept in self.frames; showing a cached frame
+        hides the current one and raises it again, calling its on_show() hook
+        if it has one. Passing args always builds a fresh frame.
+        """
+        started = time.perf_counter()
+        frame = self.frames.get(page_name)
+        if frame is not None and args:
+            frame.destroy()
+            frame = None
 
-        if frame_class:
-            frame = frame_class(self.container, self, *args) 
-            self.frames[page_name] = frame 
-            frame.grid(row=0, column=0, sticky="nsew")
-            frame.tkraise()
+        if frame is None:
+            if page_name in FRAME_CLASSES:
+                module_name, class_name = FRAME_CLASSES[page_name]
+                frame_class = getattr(importlib.import_module(module_name), class_name)
+            else:
+                # If the requested frame doesn't exist yet, create a placeholder
+                frame_class = self.create_placeholder_dashboard(page_name)
+            frame = frame_class(self.container, self, *args)
+            self.frames[page_name] = frame
+        elif hasattr(frame, "on_show"):
+            frame.on_show()
+
+        for other in self.frames.values():
+            if other is not frame:
+                other.grid_remove()
+        frame.grid(row=0, column=0, sticky="nsew")
+        frame.tkraise()
+        
+        # Idle callbacks run after the pending geometry and redraw work
+        if profiler.enabled:
+            self.after_idle(lambda: self.record_first_paint(page_name, started))
+
+    def record_first_paint(self, page_name, started):
+        """Records the time from show_frame() until the frame has been drawn (while profiling startup)."""
+        self.update_idletasks()
+        self.first_paint_ms[page_name] = (time.perf_counter() - started) * 1000
+
+        # A startup profile ends with the first frame on screen
+        if not profiler.marks:
+            profiler.mark("first frame mapped")
+            profiler.write_report()
+            self.after(0, self.quit)
 
     def create_placeholder_dashboard(self, role_name):
         """Creates a generic placeholder dashboard frame."""
@@ -212,16 +278,19 @@ class App(ctk.CTk):
             def __init__(self, parent, controller, *args):
                 super().__init__(parent)
                 self.controller = controller
-                label = ctk.CTkLabel(
+                self.label = ctk.CTkLabel(
                     self, 
                     text=f"{role_name} Dashboard - Welcome {controller.current_username}!", 
                     font=ctk.CTkFont(size=20, weight="bold")
                 )
-                label.pack(pady=20, padx=20)
+                self.label.pack(pady=20, padx=20)
 
                 logout_button = ctk.CTkButton(self, text="Logout", command=self.logout)
                 logout_button.pack(pady=10)
 
+            def on_show(self):
+                self.label.configure(text=f"{role_name} Dashboard - Welcome {self.controller.current_username}!")
+
             def logout(self):
                 self.controller.current_user_role = None
                 self.controller.current_user_id = None
@@ -235,7 +304,27 @@ class App(ctk.CTk):
         return PlaceholderDashboard
 
     def show_login_frame(self):
+        # Cached dashboards drop the previous user's state before anyone else logs in
+        for frame in self.frames.values():
+            if hasattr(frame, "reset_user_state"):
+                frame.reset_user_state()
         self.show_frame("LoginFrame")
+        self.after_idle(self.preload_dashboards)
+
+    def preload_dashboards(self):
+        """Imports the dashboard modules on a background thread while the login screen is shown."""
+        if self.preload_thread is not None:
+            return
+        
+        def preload():
+            for module_name, _ in FRAME_CLASSES.values():
+                try:
+                    importlib.import_module(module_name)
+                except Exception as e:
+                    print(f"Error preloading {module_name}: {e}")
+        
+        self.preload_thread = threading.Thread(target=preload, name="preload-dashboards", daemon=True)
+        self.preload_thread.start()
 
     def login_successful(self, username, user_role, user_id, is_owner):
         self.current_username = username
@@ -262,7 +351,9 @@ class App(ctk.CTk):
         return self.frames.get(frame_name)
 
 if __name__ == "__main__":
-    if not os.path.exists(DB_PATH):
+    if SERVICE_URL:
+        print(f"Using the database service at {SERVICE_URL}")
+    elif not os.path.exists(DB_PATH):
         print(f"Database not found at {DB_PATH}. Running setup_database.py first.")
         # Run the database setup script
         setup_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "setup_database.py")
@@ -272,5 +363,31 @@ if __name__ == "__main__":
             print(f"Setup script not found at {setup_script}.")
             sys.exit(1)
     
-    app = App()
+    # Bring the schema of an existing database up to date (the service migrates its own)
+    with profiler.span("migrate_database"):
+        if not SERVICE_URL and not migrate_database():
+            sys.exit(1)
+
+    # Probe the hardware fingerprint and calibrate bcrypt while the window is being built
+    with profiler.span("start background warm-up"):
+        precompute_hardware_id()
+        get_password_service().calibrate_async()
+
+    # Move logs past the retention period into the monthly archives
+    with profiler.span("start_log_archival"):
+        if not SERVICE_URL:
+            start_log_archival()
+
+    # Write the day and month stock checkpoints missing since the last run
+    with profiler.span("start_inventory_checkpoints"):
+        if not SERVICE_URL:
+            start_inventory_checkpoints()
+
+    with profiler.span("App()"):
+        app = App()
     app.mainloop()
+    if profiler.enabled and not profiler.marks:
+        # No frame was drawn (e.g. first-run setup or a license error)
+        profiler.write_report()
+    get_password_service().shutdown()
+    close_db_connections()
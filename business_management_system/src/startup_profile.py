@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Startup profiling for the desktop app (main.py --profile-startup).
+
+Records wall-clock spans for the startup phases and, when the interpreter
+runs with -X importtime, the per-module import times. The report is
+written as JSON plus a collapsed-stack ("folded") file that flamegraph.pl,
+speedscope and similar tools read directly. Only the standard library is
+used so this module can be imported before anything else.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+PROFILE_FLAG = "--profile-startup"
+
+# "import time:       self |  cumulative | <indent>module" as printed by -X importtime
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+class StartupProfiler:
+    """
+    Collects nested wall-clock spans. Disabled profilers cost one attribute
+    check per span, so the calls can stay in the normal startup path.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.report_path: Optional[str] = None
+        self.origin = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self.marks: List[Dict[str, Any]] = []
+        self._stack: List[str] = []
+
+    def enable(self, report_path: str) -> None:
+        self.enabled = True
+        self.report_path = report_path
+
+    def _now_ms(self) -> float:
+        return (time.perf_counter() - self.origin) * 1000
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Times the enclosed block as a child of the enclosing span."""
+        if not self.enabled:
+            yield
+            return
+        start = self._now_ms()
+        self._stack.append(name)
+        try:
+            yield
+        finally:
+            self.spans.append({
+                "name": name,
+                "path": list(self._stack),
+                "start_ms": round(start, 3),
+                "duration_ms": round(self._now_ms() - start, 3),
+            })
+            self._stack.pop()
+
+    def mark(self, name: str) -> None:
+        """Records a point in time, e.g. the first frame being mapped."""
+        if self.enabled:
+            self.marks.append({"name": name, "at_ms": round(self._now_ms(), 3)})
+
+    def write_report(self) -> Optional[str]:
+        """
+        Writes the JSON report and the folded stacks next to it.
+
+        Returns:
+            Path of the JSON report, or None when profiling is disabled
+        """
+        if not self.enabled:
+            return None
+        report = {
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+            "spans": sorted(self.spans, key=lambda span: span["start_ms"]),
+            "marks": self.marks,
+            "imports": [],
+        }
+        with open(self.report_path, "w") as f:
+            json.dump(report, f, indent=2)
+        write_folded(self.report_path)
+        return self.report_path
+
+profiler = StartupProfiler()
+
+def parse_importtime(lines: List[str]) -> List[Dict[str, Any]]:
+    """
+    Parses -X importtime output into import records with their stack.
+
+    The interpreter prints a module when its import finishes, so children
+    come before their parent; the stack is rebuilt by reading the lines in
+    reverse.
+
+    Returns:
+        Records with module, path (outermost importer first), self_us and cumulative_us
+    """
+    entries = []
+    for line in lines:
+        match = _IMPORTTIME_LINE.match(line.rstrip("\n"))
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((len(indent) // 2, module, int(self_us), int(cumulative_us)))
+
+    records, stack = [], []
+    for depth, module, self_us, cumulative_us in reversed(entries):
+        del stack[depth:]
+        stack.append(module)
+        records.append({"module": module, "path": list(stack),
+                        "self_us": self_us, "cumulative_us": cumulative_us})
+    records.reverse()
+    return records
+
+def write_folded(report_path: str) -> str:
+    """
+    Writes "<report>.folded": one "frame;frame;frame value" line per span
+    (self time in microseconds) and per import.
+
+    Returns:
+        Path of the folded file
+    """
+    with open(report_path, "r") as f:
+        report = json.load(f)
+
+    lines = []
+    spans = report["spans"]
+    for span in spans:
+        children = sum(other["duration_ms"] for other in spans
+                       if len(other["path"]) == len(span["path"]) + 1 and other["path"][:-1] == span["path"])
+        self_us = int(max(span["duration_ms"] - children, 0) * 1000)
+        lines.append(";".join(["startup"] + span["path"]) + f" {self_us}")
+    for record in report.get("imports", []):
+        lines.append(";".join(["imports"] + record["path"]) + f" {record['self_us']}")
+
+    folded_path = os.path.splitext(report_path)[0] + ".folded"
+    with open(folded_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return folded_path
+
+def run_with_importtime(script: str, argv: List[str]) -> int:
+    """
+    Re-runs the app under -X importtime and merges the import times into its report.
+
+    The child writes the span report; its stderr is scanned for importtime
+    lines and everything else is passed through.
+
+    Args:
+        script: Path of main.py
+        argv: Arguments for the child, including PROFILE_FLAG and the report path
+
+    Returns:
+        The child's exit code
+    """
+    report_path = argv[argv.index(PROFILE_FLAG) + 1]
+    child = subprocess.run([sys.executable, "-X", "importtime", script] + argv,
+                           stderr=subprocess.PIPE, text=True)
+    importtime_lines = []
+    for line in child.stderr.splitlines():
+        if line.startswith("import time:"):
+            importtime_lines.append(line)
+        else:
+            print(line, file=sys.stderr)
+
+    if os.path.exists(report_path):
+        with open(report_path, "r") as f:
+            report = json.load(f)
+        report["imports"] = parse_importtime(importtime_lines)
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+        write_folded(report_path)
+        print(f"Startup profile written to {report_path}")
+    return child.returncode
+
+def report_path_from_argv(argv: List[str], default: str = "startup_profile.json") -> Optional[str]:
+    """
+    Returns the report path if PROFILE_FLAG is present, else None.
+
+    The flag takes an optional path argument; the result is always absolute
+    and the path is inserted into argv so a re-run child sees the same one.
+    """
+    if PROFILE_FLAG not in argv:
+        return None
+    index = argv.index(PROFILE_FLAG)
+    if index + 1 < len(argv) and not argv[index + 1].startswith("--"):
+        path = os.path.abspath(argv[index + 1])
+        argv[index + 1] = path
+    else:
+        path = os.path.abspath(default)
+        argv.insert(index + 1, path)
+    return path
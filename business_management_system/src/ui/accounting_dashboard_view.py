@@ -3,17 +3,44 @@ import customtkinter as ctk
 from tkinter import messagebox, filedialog
 import os
 import sys
+import datetime
 
 # Add the parent directory (src) to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from db.database_manager import log_action
+from db.database_manager import (log_action, get_sales_summary, get_order_summary, get_categories,
+                                 get_sales_locations, get_sales_analysis)
+from ui.async_utils import TaskRunner
+from ui.lazy_tabs import LazyTabview
+from ui.virtual_list import VirtualList
+
+# Report groupings offered in the Financial Reports tab
+REPORT_GROUPINGS = {
+    "Day": "day",
+    "Month": "month",
+    "Category": "category",
+    "Product": "product",
+    "Payment Method": "payment_method",
+    "Location": "location",
+}
+
+# Time buckets and groupings offered in the Sales Analysis tab
+ANALYSIS_BUCKETS = {"Hour": "hour", "Day": "day", "Week": "week", "Month": "month"}
+ANALYSIS_GROUPINGS = {
+    "None": [],
+    "Category": ["category"],
+    "Location": ["location"],
+    "Category and Location": ["category", "location"],
+}
 
 class AccountingDashboard(ctk.CTkFrame):
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
         
+        # Report queries run on the database worker pool
+        self.tasks = TaskRunner(self)
+        
         # Create the accounting dashboard UI
         self.create_widgets()
         
@@ -26,31 +53,29 @@ class AccountingDashboard(ctk.CTkFrame):
         )
         title_label.pack(pady=(20, 10))
         
-        welcome_label = ctk.CTkLabel(
+        self.welcome_label = ctk.CTkLabel(
             self, 
             text=f"Welcome, {self.controller.current_username}!",
             font=ctk.CTkFont(size=16)
         )
-        welcome_label.pack(pady=(0, 20))
+        self.welcome_label.pack(pady=(0, 20))
         
         # Create tabview for different accounting sections
-        self.tabview = ctk.CTkTabview(self)
+        self.tabview = LazyTabview(self)
         self.tabview.pack(fill="both", expand=True, padx=20, pady=20)
         
-        # Create tabs
-        self.tabview.add("Financial Reports")
-        self.tabview.add("Transaction History")
-        self.tabview.add("Expense Management")
-        self.tabview.add("Tax Reporting")
+        # Create tabs; each one is built the first time it is selected
+        self.tabview.add_lazy("Financial Reports", self.setup_financial_reports_tab)
+        self.tabview.add_lazy("Sales Analysis", self.setup_sales_analysis_tab)
+        self.tabview.add_lazy("Transaction History", self.setup_transaction_history_tab)
+        self.tabview.add_lazy("Expense Management", self.setup_expense_management_tab)
+        self.tabview.add_lazy("Tax Reporting", self.setup_tax_reporting_tab)
         
         # Set default tab
         self.tabview.set("Financial Reports")
         
-        # Populate tabs
-        self.setup_financial_reports_tab()
-        self.setup_transaction_history_tab()
-        self.setup_expense_management_tab()
-        self.setup_tax_reporting_tab()
+        # Load the data of the other tabs in the background once this one is shown
+        self.tabview.prefetch_tabs()
         
         # Logout button at bottom
         logout_button = ctk.CTkButton(
@@ -64,13 +89,213 @@ class AccountingDashboard(ctk.CTkFrame):
     def setup_financial_reports_tab(self):
         tab = self.tabview.tab("Financial Reports")
         
-        # Placeholder content
-        placeholder = ctk.CTkLabel(
+        # Report parameters
+        params_frame = ctk.CTkFrame(tab)
+        params_frame.pack(fill="x", padx=10, pady=(10, 5))
+        
+        today = datetime.date.today()
+        ctk.CTkLabel(params_frame, text="From:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.report_from_entry = ctk.CTkEntry(params_frame, width=110)
+        self.report_from_entry.insert(0, today.replace(day=1).isoformat())
+        self.report_from_entry.grid(row=0, column=1, padx=5, pady=5)
+        
+        ctk.CTkLabel(params_frame, text="To:").grid(row=0, column=2, padx=5, pady=5, sticky="w")
+        self.report_to_entry = ctk.CTkEntry(params_frame, width=110)
+        self.report_to_entry.insert(0, today.isoformat())
+        self.report_to_entry.grid(row=0, column=3, padx=5, pady=5)
+        
+        ctk.CTkLabel(params_frame, text="Group by:").grid(row=0, column=4, padx=5, pady=5, sticky="w")
+        self.report_group_combo = ctk.CTkComboBox(params_frame, values=list(REPORT_GROUPINGS), width=140)
+        self.report_group_combo.set("Day")
+        self.report_group_combo.grid(row=0, column=5, padx=5, pady=5)
+        
+        self.report_run_button = ctk.CTkButton(params_frame, text="Run Report", width=110, command=self.run_financial_report)
+        self.report_run_button.grid(row=0, column=6, padx=5, pady=5)
+        
+        # Totals for the whole range
+        self.report_totals_label = ctk.CTkLabel(tab, text="", font=ctk.CTkFont(size=14, weight="bold"))
+        self.report_totals_label.pack(pady=5)
+        
+        # Report rows
+        self.report_rows = []
+        self.report_list = VirtualList(
             tab,
-            text="Financial Reports Features Coming Soon",
-            font=ctk.CTkFont(size=16)
+            columns=[
+                ("group", "Group", 220),
+                ("units", "Units", 80),
+                ("revenue", "Revenue", 110),
+                ("order_count", "Orders", 80),
+                ("average_ticket", "Avg. Ticket", 100),
+            ],
+            fetch_page=lambda after, limit: self.report_rows[0 if after is None else after + 1:][:limit],
+            key_of=lambda row: row["index"],
+            visible_rows=12
         )
-        placeholder.pack(pady=100)
+        self.report_list.pack(fill="both", expand=True, padx=10, pady=(5, 10))
+        self.run_financial_report()
+        
+    def read_report_range(self, from_entry, to_entry):
+        try:
+            start_date = datetime.date.fromisoformat(from_entry.get().strip())
+            end_date = datetime.date.fromisoformat(to_entry.get().strip())
+        except ValueError:
+            messagebox.showerror("Reports", "Dates must be in YYYY-MM-DD format.")
+            return None
+        if start_date > end_date:
+            messagebox.showerror("Reports", "The start date must not be after the end date.")
+            return None
+        return start_date.isoformat(), end_date.isoformat()
+        
+    def run_financial_report(self):
+        date_range = self.read_report_range(self.report_from_entry, self.report_to_entry)
+        if date_range is None:
+            return
+        start_date, end_date = date_range
+        grouping = REPORT_GROUPINGS[self.report_group_combo.get()]
+        
+        self.tasks.run(self.load_financial_report, start_date, end_date, grouping,
+                       on_done=self.show_financial_report, busy=[self.report_run_button],
+                       status=self.report_totals_label, loading_text="Loading report...")
+        
+    def load_financial_report(self, start_date, end_date, grouping):
+        # Runs on a database worker thread: pre-aggregated rows from the daily summary tables
+        sales = get_sales_summary(start_date, end_date, [grouping])
+        orders = {}
+        if grouping in ("day", "month", "payment_method", "location"):
+            orders = {row[grouping]: row for row in get_order_summary(start_date, end_date, [grouping])}
+        
+        rows = []
+        for index, row in enumerate(sales):
+            order_row = orders.get(row[grouping], {})
+            rows.append({
+                "index": index,
+                "group": row[grouping],
+                "units": row["units"],
+                "revenue": f"{row['revenue']:.2f}",
+                "order_count": order_row.get("order_count", ""),
+                "average_ticket": f"{order_row['average_ticket']:.2f}" if order_row else "",
+            })
+        return rows, get_order_summary(start_date, end_date, [])
+        
+    def show_financial_report(self, report):
+        self.report_rows, totals = report
+        self.report_list.reset()
+        
+        if totals:
+            total = totals[0]
+            self.report_totals_label.configure(
+                text=f"Revenue: {total['revenue']:.2f}   Orders: {total['order_count']}   "
+                     f"Average ticket: {total['average_ticket']:.2f}"
+            )
+        else:
+            self.report_totals_label.configure(text="No paid orders in this period.")
+        
+    def setup_sales_analysis_tab(self):
+        tab = self.tabview.tab("Sales Analysis")
+        
+        # Analysis parameters
+        params_frame = ctk.CTkFrame(tab)
+        params_frame.pack(fill="x", padx=10, pady=(10, 5))
+        
+        today = datetime.date.today()
+        ctk.CTkLabel(params_frame, text="From:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.analysis_from_entry = ctk.CTkEntry(params_frame, width=110)
+        self.analysis_from_entry.insert(0, today.replace(day=1).isoformat())
+        self.analysis_from_entry.grid(row=0, column=1, padx=5, pady=5)
+        
+        ctk.CTkLabel(params_frame, text="To:").grid(row=0, column=2, padx=5, pady=5, sticky="w")
+        self.analysis_to_entry = ctk.CTkEntry(params_frame, width=110)
+        self.analysis_to_entry.insert(0, today.isoformat())
+        self.analysis_to_entry.grid(row=0, column=3, padx=5, pady=5)
+        
+        ctk.CTkLabel(params_frame, text="Bucket:").grid(row=0, column=4, padx=5, pady=5, sticky="w")
+        self.analysis_bucket_combo = ctk.CTkComboBox(params_frame, values=list(ANALYSIS_BUCKETS), width=100)
+        self.analysis_bucket_combo.set("Day")
+        self.analysis_bucket_combo.grid(row=0, column=5, padx=5, pady=5)
+        
+        ctk.CTkLabel(params_frame, text="Group by:").grid(row=0, column=6, padx=5, pady=5, sticky="w")
+        self.analysis_group_combo = ctk.CTkComboBox(params_frame, values=list(ANALYSIS_GROUPINGS), width=180)
+        self.analysis_group_combo.set("None")
+        self.analysis_group_combo.grid(row=0, column=7, padx=5, pady=5)
+        
+        self.analysis_run_button = ctk.CTkButton(params_frame, text="Analyze", width=100, command=self.run_sales_analysis)
+        self.analysis_run_button.grid(row=0, column=8, padx=5, pady=5)
+        
+        self.analysis_status_label = ctk.CTkLabel(tab, text="", font=ctk.CTkFont(size=14, weight="bold"))
+        self.analysis_status_label.pack(pady=5)
+        
+        # Analysis rows
+        self.analysis_rows = []
+        self.analysis_list = VirtualList(
+            tab,
+            columns=[
+                ("bucket", "Period", 130),
+                ("category", "Category", 130),
+                ("location", "Location", 120),
+                ("revenue", "Revenue", 100),
+                ("units", "Units", 70),
+                ("orders", "Orders", 70),
+                ("average_ticket", "Avg. Ticket", 90),
+                ("margin", "Margin", 100),
+                ("margin_pct", "Margin %", 80),
+            ],
+            fetch_page=lambda after, limit: self.analysis_rows[0 if after is None else after + 1:][:limit],
+            key_of=lambda row: row["index"],
+            visible_rows=12
+        )
+        self.analysis_list.pack(fill="both", expand=True, padx=10, pady=(5, 10))
+        
+    def run_sales_analysis(self):
+        date_range = self.read_report_range(self.analysis_from_entry, self.analysis_to_entry)
+        if date_range is None:
+            return
+        start_date, end_date = date_range
+        # The report end is exclusive; include the whole last day
+        end = (datetime.date.fromisoformat(end_date) + datetime.timedelta(days=1)).isoformat()
+        bucket = ANALYSIS_BUCKETS[self.analysis_bucket_combo.get()]
+        group_by = ANALYSIS_GROUPINGS[self.analysis_group_combo.get()]
+        
+        self.tasks.run(self.load_sales_analysis, start_date, end, bucket, group_by,
+                       on_done=self.on_sales_analysis_done, on_error=self.on_sales_analysis_failed,
+                       busy=[self.analysis_run_button], status=self.analysis_status_label,
+                       loading_text="Analyzing order lines...")
+        
+    def load_sales_analysis(self, start_date, end, bucket, group_by):
+        # Runs on a database worker thread, including the name lookups
+        report = get_sales_analysis(start_date, end, bucket, group_by)
+        categories = {category["category_id"]: category["name"] for category in get_categories()}
+        locations = {location["location_id"]: location["location_name"] for location in get_sales_locations()}
+        return report, categories, locations
+        
+    def on_sales_analysis_done(self, result):
+        report, categories, locations = result
+        self.analysis_rows = []
+        for index, row in enumerate(report):
+            self.analysis_rows.append({
+                "index": index,
+                "bucket": row["bucket"],
+                "category": categories.get(row["category_id"], "") if "category_id" in row else "All",
+                "location": locations.get(row["location_id"], "") if "location_id" in row else "All",
+                "revenue": f"{row['revenue']:.2f}",
+                "units": row["units"],
+                "orders": row["orders"],
+                "average_ticket": f"{row['average_ticket']:.2f}",
+                "margin": f"{row['margin']:.2f}",
+                "margin_pct": f"{row['margin_pct']:.1f}",
+            })
+        self.analysis_list.reset()
+        
+        revenue = sum(row["revenue"] for row in report)
+        margin = sum(row["margin"] for row in report)
+        if report:
+            self.analysis_status_label.configure(
+                text=f"{len(report)} rows   Revenue: {revenue:.2f}   Margin: {margin:.2f}"
+            )
+        else:
+            self.analysis_status_label.configure(text="No paid orders in this period.")
+        
+    def on_sales_analysis_failed(self, error):
+        messagebox.showerror("Sales Analysis", f"Failed to analyze sales: {error}")
         
     def setup_transaction_history_tab(self):
         tab = self.tabview.tab("Transaction History")
@@ -97,13 +322,104 @@ class AccountingDashboard(ctk.CTkFrame):
     def setup_tax_reporting_tab(self):
         tab = self.tabview.tab("Tax Reporting")
         
-        # Placeholder content
-        placeholder = ctk.CTkLabel(
+        # Report parameters
+        params_frame = ctk.CTkFrame(tab)
+        params_frame.pack(fill="x", padx=10, pady=(10, 5))
+        
+        today = datetime.date.today()
+        ctk.CTkLabel(params_frame, text="From:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.tax_from_entry = ctk.CTkEntry(params_frame, width=110)
+        self.tax_from_entry.insert(0, today.replace(month=1, day=1).isoformat())
+        self.tax_from_entry.grid(row=0, column=1, padx=5, pady=5)
+        
+        ctk.CTkLabel(params_frame, text="To:").grid(row=0, column=2, padx=5, pady=5, sticky="w")
+        self.tax_to_entry = ctk.CTkEntry(params_frame, width=110)
+        self.tax_to_entry.insert(0, today.isoformat())
+        self.tax_to_entry.grid(row=0, column=3, padx=5, pady=5)
+        
+        ctk.CTkLabel(params_frame, text="Tax rate included in prices (%):").grid(row=0, column=4, padx=5, pady=5, sticky="w")
+        self.tax_rate_entry = ctk.CTkEntry(params_frame, width=60)
+        self.tax_rate_entry.insert(0, "0")
+        self.tax_rate_entry.grid(row=0, column=5, padx=5, pady=5)
+        
+        self.tax_run_button = ctk.CTkButton(params_frame, text="Run Report", width=110, command=self.run_tax_report)
+        self.tax_run_button.grid(row=0, column=6, padx=5, pady=5)
+        
+        self.tax_totals_label = ctk.CTkLabel(tab, text="", font=ctk.CTkFont(size=14, weight="bold"))
+        self.tax_totals_label.pack(pady=5)
+        
+        # One row per month and payment method
+        self.tax_rows = []
+        self.tax_list = VirtualList(
             tab,
-            text="Tax Reporting Features Coming Soon",
-            font=ctk.CTkFont(size=16)
+            columns=[
+                ("month", "Month", 100),
+                ("payment_method", "Payment", 100),
+                ("order_count", "Orders", 80),
+                ("gross", "Gross Sales", 120),
+                ("tax", "Tax", 100),
+                ("net", "Net Sales", 120),
+            ],
+            fetch_page=lambda after, limit: self.tax_rows[0 if after is None else after + 1:][:limit],
+            key_of=lambda row: row["index"],
+            visible_rows=12
         )
-        placeholder.pack(pady=100)
+        self.tax_list.pack(fill="both", expand=True, padx=10, pady=(5, 10))
+        self.run_tax_report()
+        
+    def run_tax_report(self):
+        date_range = self.read_report_range(self.tax_from_entry, self.tax_to_entry)
+        if date_range is None:
+            return
+        try:
+            rate = float(self.tax_rate_entry.get())
+        except ValueError:
+            rate = -1
+        if rate < 0:
+            messagebox.showerror("Tax Reporting", "The tax rate must be a non-negative number.")
+            return
+        
+        self.tasks.run(self.load_tax_report, date_range[0], date_range[1], rate,
+                       on_done=self.show_tax_report, busy=[self.tax_run_button],
+                       status=self.tax_totals_label, loading_text="Loading report...")
+        
+    def load_tax_report(self, start_date, end_date, rate):
+        # Runs on a database worker thread
+        # Prices are tax-inclusive: tax = gross * rate / (100 + rate)
+        def split(gross):
+            tax = round(gross * rate / (100 + rate), 2)
+            return tax, round(gross - tax, 2)
+        
+        rows = []
+        for index, row in enumerate(get_order_summary(start_date, end_date, ["month", "payment_method"])):
+            tax, net = split(row["revenue"])
+            rows.append({
+                "index": index,
+                "month": row["month"],
+                "payment_method": row["payment_method"] or "-",
+                "order_count": row["order_count"],
+                "gross": f"{row['revenue']:.2f}",
+                "tax": f"{tax:.2f}",
+                "net": f"{net:.2f}",
+            })
+        
+        totals = get_order_summary(start_date, end_date, [])
+        gross = totals[0]["revenue"] if totals else 0.0
+        tax, net = split(gross)
+        return rows, f"Gross: {gross:.2f}   Tax: {tax:.2f}   Net: {net:.2f}"
+        
+    def show_tax_report(self, report):
+        self.tax_rows, totals_text = report
+        self.tax_list.reset()
+        self.tax_totals_label.configure(text=totals_text)
+        
+    def on_show(self):
+        # Called by App when this cached dashboard is shown again for a new login
+        self.welcome_label.configure(text=f"Welcome, {self.controller.current_username}!")
+        
+    def reset_user_state(self):
+        # Called by App on logout
+        self.tabview.set("Financial Reports")
         
     def logout(self):
         # Log the logout
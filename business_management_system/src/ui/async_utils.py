@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+import threading
+import tkinter
+from concurrent.futures import Future
+from tkinter import messagebox
+from typing import Any, Callable, Iterable, Optional, Set
+
+from db.database_manager import submit_db_task
+
+# How often pending futures are checked from the Tk event loop
+POLL_INTERVAL_MS = 30
+
+def poll_future(widget, future: Future, on_done: Callable[[Any], None],
+                on_error: Optional[Callable[[BaseException], None]] = None,
+                interval_ms: int = POLL_INTERVAL_MS) -> None:
+    """
+    Delivers a future's result to a callback on the Tk thread.
+
+    Checks the future with widget.after() until it is done, then calls
+    on_done(result) or on_error(exception). Nothing is called if the widget
+    has been destroyed in the meantime.
+
+    Args:
+        widget: Any Tk widget, used for scheduling
+        future: Future running on a worker thread
+        on_done: Called with the result on success
+        on_error: Called with the exception on failure (re-raised into Tk if omitted)
+        interval_ms: Polling interval in milliseconds
+    """
+    def check():
+        try:
+            if not widget.winfo_exists():
+                return
+        except Exception:
+            return
+        if not future.done():
+            widget.after(interval_ms, check)
+            return
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            on_done(future.result())
+        elif on_error is not None:
+            on_error(error)
+        else:
+            raise error
+
+    widget.after(interval_ms, check)
+
+class TaskRunner:
+    """
+    Runs a frame's blocking work off the Tk thread.
+
+    run() sends a call to the database worker pool and watch() follows any
+    other future (e.g. from the password service). Results are delivered on
+    the Tk thread through poll_future(). While a task is pending, its busy
+    widgets are disabled and its status label shows a loading text. When the
+    frame is destroyed, queued tasks are cancelled, cancel events of running
+    ones are set and no callback runs any more.
+    """
+
+    def __init__(self, widget):
+        """
+        Args:
+            widget: The frame that owns the tasks
+        """
+        self.widget = widget
+        self.pending: Set[Future] = set()
+        self.cancel_events: Set[threading.Event] = set()
+        # Bind on the Tk widget itself: CTk widgets redirect bind() to an inner canvas
+        tkinter.Misc.bind(widget, "<Destroy>", self._on_destroy, "+")
+
+    def run(self, func: Callable[..., Any], *args, **options) -> Future:
+        """
+        Runs func(*args) on the database worker pool.
+
+        Args:
+            func: Blocking function; must not touch widgets
+            *args: Arguments for func
+            **options: Passed to watch() (on_done, on_error, busy, status, loading_text)
+
+        Returns:
+            The task's future
+        """
+        return self.watch(submit_db_task(func, *args), **options)
+
+    def watch(self, future: Future, on_done: Optional[Callable[[Any], None]] = None,
+              on_error: Optional[Callable[[BaseException], None]] = None,
+              busy: Iterable = (), status=None, loading_text: str = "Loading...",
+              cancel_event: Optional[threading.Event] = None) -> Future:
+        """
+        Delivers a future's outcome to callbacks on the Tk thread.
+
+        Args:
+            future: Future running on any worker thread
+            on_done: Called with the result
+            on_error: Called with the exception (an error dialog is shown if omitted)
+            busy: Widgets disabled until the future completes
+            status: Label showing loading_text until the future completes
+            loading_text: Text for the status label
+            cancel_event: Set if the frame is destroyed while the future runs
+
+        Returns:
+            The same future
+        """
+        busy = [(widget, widget.cget("state")) for widget in busy]
+        for widget, _ in busy:
+            widget.configure(state="disabled")
+        if status is not None:
+            status.configure(text=loading_text)
+        self.pending.add(future)
+        if cancel_event is not None:
+            self.cancel_events.add(cancel_event)
+
+        def finish(callback, value):
+            self.pending.discard(future)
+            self.cancel_events.discard(cancel_event)
+            for widget, state in busy:
+                if widget.winfo_exists():
+                    widget.configure(state=state)
+            if status is not None and status.winfo_exists():
+                status.configure(text="")
+            if callback is not None:
+                callback(value)
+
+        poll_future(self.widget, future, lambda result: finish(on_done, result),
+                    lambda error: finish(on_error or self._show_error, error))
+        return future
+
+    def _show_error(self, error: BaseException) -> None:
+        print(f"Background task failed: {error}")
+        messagebox.showerror("Error", f"The operation failed: {error}")
+
+    def cancel_all(self) -> None:
+        """Cancels queued tasks and signals running ones that watch a cancel event."""
+        for future in list(self.pending):
+            future.cancel()
+        for event in list(self.cancel_events):
+            event.set()
+        self.pending.clear()
+        self.cancel_events.clear()
+
+    def _on_destroy(self, event) -> None:
+        if event.widget is self.widget:
+            self.cancel_all()
@@ -7,12 +7,19 @@ import sys
 # Add the parent directory (src) to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from db.database_manager import log_action
+from db.database_manager import log_action, get_catalog_cache, get_sales_locations
+from db.order_engine import checkout, PAYMENT_METHODS
+from ui.async_utils import TaskRunner
+from ui.lazy_tabs import LazyTabview
 
 class CashierDashboard(ctk.CTkFrame):
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
+        self.cart = {}  # product_id -> quantity
+        
+        # Checkouts run on the database worker pool
+        self.tasks = TaskRunner(self)
         
         # Create the cashier dashboard UI
         self.create_widgets()
@@ -26,29 +33,27 @@ class CashierDashboard(ctk.CTkFrame):
         )
         title_label.pack(pady=(20, 10))
         
-        welcome_label = ctk.CTkLabel(
+        self.welcome_label = ctk.CTkLabel(
             self, 
             text=f"Welcome, {self.controller.current_username}!",
             font=ctk.CTkFont(size=16)
         )
-        welcome_label.pack(pady=(0, 20))
+        self.welcome_label.pack(pady=(0, 20))
         
         # Create tabview for different cashier sections
-        self.tabview = ctk.CTkTabview(self)
+        self.tabview = LazyTabview(self)
         self.tabview.pack(fill="both", expand=True, padx=20, pady=20)
         
-        # Create tabs
-        self.tabview.add("Sales Terminal")
-        self.tabview.add("Open Orders")
-        self.tabview.add("Recent Transactions")
+        # Create tabs; each one is built the first time it is selected
+        self.tabview.add_lazy("Sales Terminal", self.setup_sales_terminal_tab, prefetch=self.load_sales_terminal_data)
+        self.tabview.add_lazy("Open Orders", self.setup_open_orders_tab)
+        self.tabview.add_lazy("Recent Transactions", self.setup_recent_transactions_tab)
         
         # Set default tab
         self.tabview.set("Sales Terminal")
         
-        # Populate tabs
-        self.setup_sales_terminal_tab()
-        self.setup_open_orders_tab()
-        self.setup_recent_transactions_tab()
+        # Load the data of the other tabs in the background once this one is shown
+        self.tabview.prefetch_tabs()
         
         # Logout button at bottom
         logout_button = ctk.CTkButton(
@@ -59,16 +64,157 @@ class CashierDashboard(ctk.CTkFrame):
         )
         logout_button.pack(pady=(0, 20), padx=20, anchor="se")
         
-    def setup_sales_terminal_tab(self):
+    def load_sales_terminal_data(self):
+        # Runs on a database worker thread: loads the catalog and the sales locations
+        products = get_catalog_cache().get_products()
+        return [product["name"] for product in products], get_sales_locations()
+        
+    def setup_sales_terminal_tab(self, data=None):
         tab = self.tabview.tab("Sales Terminal")
         
-        # Placeholder content
-        placeholder = ctk.CTkLabel(
-            tab,
-            text="Sales Terminal Features Coming Soon",
-            font=ctk.CTkFont(size=16)
+        # Products come from the in-memory catalog; lookups do not touch the database
+        self.catalog = get_catalog_cache()
+        if data is None:
+            data = self.load_sales_terminal_data()
+        self.product_names, locations = data
+        self.locations_by_name = {location["location_name"]: location for location in locations}
+        
+        # Item entry row
+        entry_frame = ctk.CTkFrame(tab)
+        entry_frame.pack(fill="x", padx=10, pady=(10, 5))
+        
+        ctk.CTkLabel(entry_frame, text="Location:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.location_combo = ctk.CTkComboBox(entry_frame, values=list(self.locations_by_name) or [""], width=150)
+        self.location_combo.grid(row=0, column=1, padx=5, pady=5)
+        
+        ctk.CTkLabel(entry_frame, text="Product:").grid(row=0, column=2, padx=5, pady=5, sticky="w")
+        self.product_combo = ctk.CTkComboBox(entry_frame, values=self.product_names or [""], width=200)
+        self.product_combo.grid(row=0, column=3, padx=5, pady=5)
+        
+        ctk.CTkLabel(entry_frame, text="Qty:").grid(row=0, column=4, padx=5, pady=5, sticky="w")
+        self.quantity_entry = ctk.CTkEntry(entry_frame, width=60)
+        self.quantity_entry.insert(0, "1")
+        self.quantity_entry.grid(row=0, column=5, padx=5, pady=5)
+        self.quantity_entry.bind("<Return>", lambda event: self.add_to_cart())
+        
+        self.add_button = ctk.CTkButton(entry_frame, text="Add", width=80, command=self.add_to_cart)
+        self.add_button.grid(row=0, column=6, padx=5, pady=5)
+        
+        # Cart list
+        self.cart_frame = ctk.CTkScrollableFrame(tab, height=250)
+        self.cart_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        
+        # Totals and payment
+        checkout_frame = ctk.CTkFrame(tab)
+        checkout_frame.pack(fill="x", padx=10, pady=(5, 10))
+        
+        self.total_label = ctk.CTkLabel(
+            checkout_frame,
+            text="Total: 0.00",
+            font=ctk.CTkFont(size=18, weight="bold")
         )
-        placeholder.pack(pady=100)
+        self.total_label.pack(side="left", padx=10, pady=10)
+        
+        self.checkout_button = ctk.CTkButton(checkout_frame, text="Checkout", width=120, command=self.checkout_cart)
+        self.checkout_button.pack(side="right", padx=10, pady=10)
+        
+        self.clear_button = ctk.CTkButton(checkout_frame, text="Clear", width=80, command=self.clear_cart)
+        self.clear_button.pack(side="right", padx=5, pady=10)
+        
+        self.checkout_status = ctk.CTkLabel(checkout_frame, text="")
+        self.checkout_status.pack(side="right", padx=5, pady=10)
+        
+        self.payment_combo = ctk.CTkComboBox(checkout_frame, values=PAYMENT_METHODS, width=100)
+        self.payment_combo.pack(side="right", padx=5, pady=10)
+        
+        self.refresh_cart()
+        
+    def add_to_cart(self):
+        product = self.catalog.get_product_by_name(self.product_combo.get())
+        if not product or not product["is_available"]:
+            messagebox.showerror("Sales Terminal", "Please select a product.")
+            return
+        
+        try:
+            quantity = int(self.quantity_entry.get())
+        except ValueError:
+            quantity = 0
+        if quantity <= 0:
+            messagebox.showerror("Sales Terminal", "Quantity must be a positive number.")
+            return
+        
+        self.cart[product["product_id"]] = self.cart.get(product["product_id"], 0) + quantity
+        self.quantity_entry.delete(0, 'end')
+        self.quantity_entry.insert(0, "1")
+        self.refresh_cart()
+        
+    def remove_from_cart(self, product_id):
+        self.cart.pop(product_id, None)
+        self.refresh_cart()
+        
+    def clear_cart(self):
+        self.cart.clear()
+        self.refresh_cart()
+        
+    def refresh_cart(self):
+        for widget in self.cart_frame.winfo_children():
+            widget.destroy()
+        
+        total = 0.0
+        for product_id, quantity in list(self.cart.items()):
+            product = self.catalog.get_product(product_id)
+            if product is None:
+                # Deleted since it was added to the cart
+                del self.cart[product_id]
+                continue
+            subtotal = product["price"] * quantity
+            total += subtotal
+            
+            row_frame = ctk.CTkFrame(self.cart_frame)
+            row_frame.pack(fill="x", pady=2)
+            ctk.CTkLabel(row_frame, text=product["name"], width=200, anchor="w").grid(row=0, column=0, padx=5, pady=5)
+            ctk.CTkLabel(row_frame, text=f"{quantity} x {product['price']:.2f}", width=120).grid(row=0, column=1, padx=5, pady=5)
+            ctk.CTkLabel(row_frame, text=f"{subtotal:.2f}", width=80).grid(row=0, column=2, padx=5, pady=5)
+            ctk.CTkButton(
+                row_frame,
+                text="Remove",
+                width=70,
+                command=lambda pid=product_id: self.remove_from_cart(pid)
+            ).grid(row=0, column=3, padx=5, pady=5)
+        
+        self.total_label.configure(text=f"Total: {total:.2f}")
+        
+    def checkout_cart(self):
+        location = self.locations_by_name.get(self.location_combo.get())
+        if not location:
+            messagebox.showerror("Sales Terminal", "Please select a sales location.")
+            return
+        if not self.cart:
+            messagebox.showerror("Sales Terminal", "The cart is empty.")
+            return
+        
+        # The cart cannot change until the checkout has finished
+        self.tasks.run(
+            checkout,
+            list(self.cart.items()),
+            location["location_id"],
+            self.controller.current_user_id,
+            self.payment_combo.get(),
+            on_done=self.on_checkout_done,
+            busy=[self.checkout_button, self.clear_button, self.add_button],
+            status=self.checkout_status,
+            loading_text="Processing..."
+        )
+        
+    def on_checkout_done(self, result):
+        if result["success"]:
+            messagebox.showinfo(
+                "Sale Complete",
+                f"Order #{result['order_id']} paid. Total: {result['total']:.2f}"
+            )
+            self.clear_cart()
+        else:
+            messagebox.showerror("Checkout Failed", result["error"])
         
     def setup_open_orders_tab(self):
         tab = self.tabview.tab("Open Orders")
@@ -92,6 +238,17 @@ class CashierDashboard(ctk.CTkFrame):
         )
         placeholder.pack(pady=100)
         
+    def on_show(self):
+        # Called by App when this cached dashboard is shown again for a new login
+        self.welcome_label.configure(text=f"Welcome, {self.controller.current_username}!")
+        
+    def reset_user_state(self):
+        # Called by App on logout: an abandoned cart must not carry over to the next cashier
+        self.cart.clear()
+        if self.tabview.is_built("Sales Terminal"):
+            self.refresh_cart()
+        self.tabview.set("Sales Terminal")
+        
     def logout(self):
         # Log the logout
         log_action(self.controller.current_user_id, "USER_LOGOUT", 
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+import customtkinter as ctk
+
+from ui.async_utils import TaskRunner
+
+# Delay after the first paint before unbuilt tabs start prefetching their data
+PREFETCH_DELAY_MS = 300
+
+class LazyTabview(ctk.CTkTabview):
+    """
+    CTkTabview whose tab contents are built the first time a tab is shown.
+
+    Tabs are registered with add_lazy(name, build, prefetch). build populates
+    the tab frame; if prefetch is given it runs on the database worker pool (started
+    by prefetch_tabs() shortly after the first paint, or on first selection)
+    and its result is passed to build, so the Tk thread never waits on the
+    query. Until the data arrives the tab shows a loading label.
+    """
+
+    def __init__(self, master, command: Optional[Callable[[], None]] = None, **kwargs):
+        super().__init__(master, command=self._on_tab_selected, **kwargs)
+        self._user_command = command
+        self._builders: Dict[str, tuple] = {}
+        self._prefetches: Dict[str, Future] = {}
+        self._built = set()
+        self._loading_labels: Dict[str, ctk.CTkLabel] = {}
+        self.tasks = TaskRunner(self)
+
+    def add_lazy(self, name: str, build: Callable[..., None],
+                 prefetch: Optional[Callable[[], Any]] = None) -> ctk.CTkFrame:
+        """
+        Adds a tab whose contents are built on first selection.
+
+        Args:
+            name: Tab name
+            build: Populates the tab; called with the prefetched data when prefetch is given
+            prefetch: Loads the tab's data on a worker thread (must not touch widgets)
+
+        Returns:
+            The (still empty) tab frame
+        """
+        tab = self.add(name)
+        self._builders[name] = (build, prefetch)
+        return tab
+
+    def set(self, name: str) -> None:
+        super().set(name)
+        self.ensure_built(name)
+
+    def _on_tab_selected(self) -> None:
+        self.ensure_built(self.get())
+        if self._user_command is not None:
+            self._user_command()
+
+    def is_built(self, name: str) -> bool:
+        return name in self._built
+
+    def _start_prefetch(self, name: str) -> Optional[Future]:
+        build, prefetch = self._builders[name]
+        if prefetch is None:
+            return None
+        if name not in self._prefetches:
+            # Errors are reported when the tab is built
+            self._prefetches[name] = self.tasks.run(prefetch, on_error=lambda error: None)
+        return self._prefetches[name]
+
+    def prefetch_tabs(self, delay_ms: int = PREFETCH_DELAY_MS) -> None:
+        """Starts loading the data of all unbuilt tabs in the background after delay_ms."""
+        def start():
+            for name in self._builders:
+                if name not in self._built:
+                    self._start_prefetch(name)
+        self.after(delay_ms, start)
+
+    def ensure_built(self, name: str) -> None:
+        """Builds a tab now, or as soon as its prefetched data is available."""
+        if name in self._built or name not in self._builders or name in self._loading_labels:
+            return
+        build, prefetch = self._builders[name]
+        if prefetch is None:
+            self._built.add(name)
+            build()
+            return
+
+        future = self._start_prefetch(name)
+        if future.done():
+            self._finish_build(name, future)
+            return
+        label = ctk.CTkLabel(self.tab(name), text="Loading...", font=ctk.CTkFont(size=16))
+        label.pack(pady=100)
+        self._loading_labels[name] = label
+        self.tasks.watch(future, lambda data: self._finish_build(name, future),
+                         lambda error: self._finish_build(name, future))
+
+    def _finish_build(self, name: str, future: Future) -> None:
+        if name in self._built:
+            return
+        label = self._loading_labels.pop(name, None)
+        if label is not None:
+            label.destroy()
+        self._built.add(name)
+        build, _ = self._builders[name]
+        error = future.exception()
+        if error is not None:
+            # Let the tab load its own data the usual way
+            print(f"Error prefetching tab {name}: {error}")
+            build(None)
+        else:
+            build(future.result())
+
+    def build_all(self) -> None:
+        """Builds every tab immediately, loading data on the Tk thread."""
+        for name, (build, prefetch) in self._builders.items():
+            if name in self._built:
+                continue
+            future = self._prefetches.get(name)
+            if prefetch is not None and future is None:
+                future = Future()
+                future.set_result(prefetch())
+            if prefetch is None:
+                self._built.add(name)
+                build()
+            else:
+                self._finish_build(name, future)
@@ -7,12 +7,14 @@ import sys
 # Add the parent directory (src) to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from db.database_manager import verify_user, log_action
+from db.database_manager import verify_user, log_action, get_password_service
+from ui.async_utils import TaskRunner
 
 class LoginFrame(ctk.CTkFrame):
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
+        self.tasks = TaskRunner(self)
         
         # Create a stylish login form
         self.create_widgets()
@@ -53,7 +55,7 @@ class LoginFrame(ctk.CTkFrame):
         self.password_entry.bind("<Return>", lambda event: self.verify_login())
         
         # Login button
-        login_button = ctk.CTkButton(
+        self.login_button = ctk.CTkButton(
             self, 
             text="Login", 
             command=self.verify_login,
@@ -61,7 +63,7 @@ class LoginFrame(ctk.CTkFrame):
             height=40,
             font=ctk.CTkFont(size=15, weight="bold")
         )
-        login_button.pack(pady=20)
+        self.login_button.pack(pady=20)
         
         # Version info
         version_label = ctk.CTkLabel(
@@ -82,7 +84,18 @@ class LoginFrame(ctk.CTkFrame):
         # Set focus to username entry
         self.username_entry.focus_set()
         
+    def on_show(self):
+        # Called by App when the cached login frame is shown again after a logout
+        self.username_entry.delete(0, 'end')
+        self.password_entry.delete(0, 'end')
+        self.login_button.configure(state="normal", text="Login")
+        self.username_entry.focus_set()
+        
     def verify_login(self):
+        # Ignore repeated submits while a login is in progress
+        if self.login_button.cget("state") == "disabled":
+            return
+
         username = self.username_entry.get()
         password = self.password_entry.get()
         
@@ -90,11 +103,23 @@ class LoginFrame(ctk.CTkFrame):
             messagebox.showerror("Login Error", "Please enter both username and password.")
             return
         
-        success, role, user_id, is_owner = verify_user(username, password)
-        
+        # bcrypt runs on the password worker pool so the window stays responsive
+        self.login_button.configure(text="Signing in...")
+        future = get_password_service().submit(verify_user, username, password)
+        self.tasks.watch(future, lambda result: self.on_login_result(username, result),
+                         self.on_login_error, busy=[self.login_button])
+
+    def on_login_result(self, username, result):
+        self.login_button.configure(text="Login")
+        success, role, user_id, is_owner = result
+
         if success:
             self.controller.login_successful(username, role, user_id, is_owner)
         else:
             messagebox.showerror("Login Error", "Invalid username or password.")
             self.password_entry.delete(0, 'end')
             self.password_entry.focus_set()
+
+    def on_login_error(self, error):
+        self.login_button.configure(text="Login")
+        messagebox.showerror("Login Error", f"Login failed: {error}")
@@ -8,6 +8,7 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from db.database_manager import log_action
+from ui.lazy_tabs import LazyTabview
 
 class ManagerDashboard(ctk.CTkFrame):
     def __init__(self, parent, controller):
@@ -26,31 +27,28 @@ class ManagerDashboard(ctk.CTkFrame):
         )
         title_label.pack(pady=(20, 10))
         
-        welcome_label = ctk.CTkLabel(
+        self.welcome_label = ctk.CTkLabel(
             self, 
             text=f"Welcome, {self.controller.current_username}!",
             font=ctk.CTkFont(size=16)
         )
-        welcome_label.pack(pady=(0, 20))
+        self.welcome_label.pack(pady=(0, 20))
         
         # Create tabview for different management sections
-        self.tabview = ctk.CTkTabview(self)
+        self.tabview = LazyTabview(self)
         self.tabview.pack(fill="both", expand=True, padx=20, pady=20)
         
-        # Create tabs
-        self.tabview.add("Inventory Management")
-        self.tabview.add("Sales Overview")
-        self.tabview.add("Staff Management")
-        self.tabview.add("Reports")
+        # Create tabs; each one is built the first time it is selected
+        self.tabview.add_lazy("Inventory Management", self.setup_inventory_tab)
+        self.tabview.add_lazy("Sales Overview", self.setup_sales_tab)
+        self.tabview.add_lazy("Staff Management", self.setup_staff_tab)
+        self.tabview.add_lazy("Reports", self.setup_reports_tab)
         
         # Set default tab
         self.tabview.set("Inventory Management")
         
-        # Populate tabs
-        self.setup_inventory_tab()
-        self.setup_sales_tab()
-        self.setup_staff_tab()
-        self.setup_reports_tab()
+        # Load the data of the other tabs in the background once this one is shown
+        self.tabview.prefetch_tabs()
         
         # Logout button at bottom
         logout_button = ctk.CTkButton(
@@ -105,6 +103,14 @@ class ManagerDashboard(ctk.CTkFrame):
         )
         placeholder.pack(pady=100)
         
+    def on_show(self):
+        # Called by App when this cached dashboard is shown again for a new login
+        self.welcome_label.configure(text=f"Welcome, {self.controller.current_username}!")
+        
+    def reset_user_state(self):
+        # Called by App on logout
+        self.tabview.set("Inventory Management")
+        
     def logout(self):
         # Log the logout
         log_action(self.controller.current_user_id, "USER_LOGOUT", 
@@ -3,16 +3,36 @@ import customtkinter as ctk
 from tkinter import messagebox, filedialog
 import os
 import sys
+import threading
 
 # Add the parent directory (src) to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from db.database_manager import get_all_users, update_user, add_user, get_business_info, update_business_info, log_action
+from db.database_manager import get_all_users, update_user, add_user, get_business_info, update_business_info, log_action, get_password_service, flush_audit_log, get_hardware_id, AUDIT_LOG_PAGE_SIZE
+from db.database_manager import enable_query_stats, disable_query_stats, get_query_stats, get_query_stats_report
+from db.log_archive import get_audit_log_history_page
+from db.log_export import export_audit_log_csv_async
+from db.service_client import is_using_service
+from ui.async_utils import TaskRunner
+from ui.lazy_tabs import LazyTabview
+from ui.virtual_list import VirtualList
+
+# How often the export progress label is updated
+EXPORT_PROGRESS_INTERVAL_MS = 200
+
+# Statements listed in the query statistics report
+QUERY_REPORT_TOP_N = 25
 
 class OwnerDashboard(ctk.CTkFrame):
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
+        self.export_cancel_event = None
+        self.export_progress = (0, 0)
+        
+        # Database and password work runs in the background; a running export
+        # is cancelled when the window is destroyed
+        self.tasks = TaskRunner(self)
         
         # Create the owner dashboard UI
         self.create_widgets()
@@ -26,31 +46,28 @@ class OwnerDashboard(ctk.CTkFrame):
         )
         title_label.pack(pady=(20, 10))
         
-        welcome_label = ctk.CTkLabel(
+        self.welcome_label = ctk.CTkLabel(
             self, 
             text=f"Welcome, {self.controller.current_username}!",
             font=ctk.CTkFont(size=16)
         )
-        welcome_label.pack(pady=(0, 20))
+        self.welcome_label.pack(pady=(0, 20))
         
         # Create tabview for different management sections
-        self.tabview = ctk.CTkTabview(self)
+        self.tabview = LazyTabview(self)
         self.tabview.pack(fill="both", expand=True, padx=20, pady=20)
         
-        # Create tabs
-        self.tabview.add("User Management")
-        self.tabview.add("Business Settings")
-        self.tabview.add("License Information")
-        self.tabview.add("System Logs")
+        # Create tabs; each one is built the first time it is selected
+        self.tabview.add_lazy("User Management", self.setup_user_management_tab)
+        self.tabview.add_lazy("Business Settings", self.setup_business_settings_tab, prefetch=get_business_info)
+        self.tabview.add_lazy("License Information", self.setup_license_info_tab, prefetch=get_hardware_id)
+        self.tabview.add_lazy("System Logs", self.setup_system_logs_tab, prefetch=self.prefetch_logs)
         
         # Set default tab
         self.tabview.set("User Management")
         
-        # Populate tabs
-        self.setup_user_management_tab()
-        self.setup_business_settings_tab()
-        self.setup_license_info_tab()
-        self.setup_system_logs_tab()
+        # Load the data of the other tabs in the background once this one is shown
+        self.tabview.prefetch_tabs()
         
         # Logout button at bottom
         logout_button = ctk.CTkButton(
@@ -76,12 +93,18 @@ class OwnerDashboard(ctk.CTkFrame):
         )
         list_title.pack(pady=(10, 5), padx=10)
         
+        self.user_list_status = ctk.CTkLabel(list_frame, text="")
+        self.user_list_status.pack(padx=10)
+        
         # Create scrollable frame for user list
         scrollable_frame = ctk.CTkScrollableFrame(list_frame)
         scrollable_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
-        # Populate user list
-        self.populate_user_list(scrollable_frame)
+        # Populate user list; rows are kept per user_id and patched in place
+        self.user_list_frame = scrollable_frame
+        self.user_rows = {}
+        self.create_user_list_header()
+        self.refresh_user_list()
         
         # User actions frame
         action_frame = ctk.CTkFrame(tab)
@@ -128,33 +151,25 @@ class OwnerDashboard(ctk.CTkFrame):
         self.new_role.grid(row=3, column=1, padx=10, pady=5)
         
         # Add user button
-        add_button = ctk.CTkButton(
+        self.add_user_button = ctk.CTkButton(
             action_frame, 
             text="Add User", 
             command=self.add_new_user,
             width=150
         )
-        add_button.pack(pady=15)
+        self.add_user_button.pack(pady=15)
         
         # Refresh button
-        refresh_button = ctk.CTkButton(
+        self.refresh_users_button = ctk.CTkButton(
             action_frame, 
             text="Refresh User List", 
-            command=lambda: self.populate_user_list(scrollable_frame),
+            command=self.refresh_user_list,
             width=150
         )
-        refresh_button.pack(pady=(5, 15))
-        
-    def populate_user_list(self, parent_frame):
-        # Clear existing widgets
-        for widget in parent_frame.winfo_children():
-            widget.destroy()
-            
-        # Get all users
-        users = get_all_users()
+        self.refresh_users_button.pack(pady=(5, 15))
         
-        # Create header
-        header_frame = ctk.CTkFrame(parent_frame)
+    def create_user_list_header(self):
+        header_frame = ctk.CTkFrame(self.user_list_frame)
         header_frame.pack(fill="x", pady=(0, 5))
         
         ctk.CTkLabel(header_frame, text="Username", width=100, font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, padx=5, pady=5)
@@ -162,56 +177,101 @@ class OwnerDashboard(ctk.CTkFrame):
         ctk.CTkLabel(header_frame, text="Status", width=80, font=ctk.CTkFont(weight="bold")).grid(row=0, column=2, padx=5, pady=5)
         ctk.CTkLabel(header_frame, text="Actions", width=100, font=ctk.CTkFont(weight="bold")).grid(row=0, column=3, padx=5, pady=5)
         
-        # Add users to list
-        for i, user in enumerate(users):
-            row_frame = ctk.CTkFrame(parent_frame)
-            row_frame.pack(fill="x", pady=2)
+    def refresh_user_list(self):
+        # Reload the users in the background, then patch the list
+        busy = [self.refresh_users_button] if hasattr(self, "refresh_users_button") else []
+        self.tasks.run(get_all_users, on_done=self.apply_user_list, busy=busy, status=self.user_list_status)
+        
+    def apply_user_list(self, users):
+        # Patch the list: add new rows, destroy removed ones, update changed ones
+        current_ids = {user["user_id"] for user in users}
+        
+        for user_id in [user_id for user_id in self.user_rows if user_id not in current_ids]:
+            self.user_rows.pop(user_id)["frame"].destroy()
             
-            ctk.CTkLabel(row_frame, text=user["username"], width=100).grid(row=0, column=0, padx=5, pady=5)
-            ctk.CTkLabel(row_frame, text=user["role"], width=100).grid(row=0, column=1, padx=5, pady=5)
+        for user in users:
+            row = self.user_rows.get(user["user_id"])
+            if row is None:
+                self.user_rows[user["user_id"]] = self.create_user_row(user)
+            elif row["user"] != user:
+                row["user"] = user
+                self.update_user_row(row)
+                
+    def create_user_row(self, user):
+        row_frame = ctk.CTkFrame(self.user_list_frame)
+        row_frame.pack(fill="x", pady=2)
+        row = {"user": user, "frame": row_frame, "toggle_button": None}
+        
+        row["username_label"] = ctk.CTkLabel(row_frame, text=user["username"], width=100)
+        row["username_label"].grid(row=0, column=0, padx=5, pady=5)
+        row["role_label"] = ctk.CTkLabel(row_frame, text=user["role"], width=100)
+        row["role_label"].grid(row=0, column=1, padx=5, pady=5)
+        row["status_label"] = ctk.CTkLabel(row_frame, text="", width=80)
+        row["status_label"].grid(row=0, column=2, padx=5, pady=5)
+        
+        # Only allow actions on non-owner accounts
+        if not user["is_owner"]:
+            action_frame = ctk.CTkFrame(row_frame)
+            action_frame.grid(row=0, column=3, padx=5, pady=2)
             
-            status_text = "Active" if user["is_active"] else "Inactive"
-            status_color = "green" if user["is_active"] else "red"
-            status_label = ctk.CTkLabel(row_frame, text=status_text, width=80, text_color=status_color)
-            status_label.grid(row=0, column=2, padx=5, pady=5)
+            row["toggle_button"] = ctk.CTkButton(
+                action_frame, 
+                text="", 
+                width=80,
+                command=lambda user_id=user["user_id"]: self.toggle_user_status(user_id)
+            )
+            row["toggle_button"].pack(side="left", padx=2)
             
-            # Only allow actions on non-owner accounts
-            if not user["is_owner"]:
-                action_frame = ctk.CTkFrame(row_frame)
-                action_frame.grid(row=0, column=3, padx=5, pady=2)
-                
-                toggle_text = "Deactivate" if user["is_active"] else "Activate"
-                toggle_button = ctk.CTkButton(
-                    action_frame, 
-                    text=toggle_text, 
-                    width=80,
-                    command=lambda u=user: self.toggle_user_status(u, parent_frame)
-                )
-                toggle_button.pack(side="left", padx=2)
-                
-                reset_button = ctk.CTkButton(
-                    action_frame, 
-                    text="Reset PW", 
-                    width=80,
-                    command=lambda u=user: self.reset_user_password(u)
-                )
-                reset_button.pack(side="left", padx=2)
-            else:
-                ctk.CTkLabel(row_frame, text="Owner Account", width=100).grid(row=0, column=3, padx=5, pady=5)
+            reset_button = ctk.CTkButton(
+                action_frame, 
+                text="Reset PW", 
+                width=80,
+                command=lambda user_id=user["user_id"]: self.reset_user_password(self.user_rows[user_id]["user"])
+            )
+            reset_button.pack(side="left", padx=2)
+        else:
+            ctk.CTkLabel(row_frame, text="Owner Account", width=100).grid(row=0, column=3, padx=5, pady=5)
+            
+        self.update_user_row(row)
+        return row
+        
+    def update_user_row(self, row):
+        user = row["user"]
+        row["username_label"].configure(text=user["username"])
+        row["role_label"].configure(text=user["role"])
+        row["status_label"].configure(
+            text="Active" if user["is_active"] else "Inactive",
+            text_color="green" if user["is_active"] else "red"
+        )
+        if row["toggle_button"] is not None:
+            row["toggle_button"].configure(text="Deactivate" if user["is_active"] else "Activate")
     
-    def toggle_user_status(self, user, parent_frame):
+    def toggle_user_status(self, user_id):
+        row = self.user_rows[user_id]
+        user = row["user"]
+        
         # Toggle user active status
         new_status = not user["is_active"]
-        if update_user(user["user_id"], is_active=new_status):
+        self.tasks.run(lambda: update_user(user_id, is_active=new_status),
+                       on_done=lambda success: self.on_user_status_changed(user_id, new_status, success),
+                       busy=[row["toggle_button"]])
+        
+    def on_user_status_changed(self, user_id, new_status, success):
+        row = self.user_rows.get(user_id)
+        if row is None:
+            return
+        user = row["user"]
+        if success:
             status_text = "activated" if new_status else "deactivated"
-            messagebox.showinfo("User Updated", f"User {user['username']} has been {status_text}.")
             
-            # Log the action
-            log_action(self.controller.current_user_id, "USER_STATUS_CHANGED", 
-                      f"User {user['username']} {status_text} by {self.controller.current_username}")
+            # Patch only this row
+            row["user"] = dict(user, is_active=1 if new_status else 0)
+            self.update_user_row(row)
+            messagebox.showinfo("User Updated", f"User {user['username']} has been {status_text}.")
             
-            # Refresh the user list
-            self.populate_user_list(parent_frame)
+            # A critical action type, flushed to disk before log_action returns
+            self.tasks.run(log_action, self.controller.current_user_id, "USER_STATUS_CHANGED",
+                           f"User {user['username']} {status_text} by {self.controller.current_username}")
         else:
             messagebox.showerror("Error", f"Failed to update user {user['username']}.")
     
@@ -225,13 +285,17 @@ class OwnerDashboard(ctk.CTkFrame):
         if not new_password:
             return
             
-        # Update user password
-        if update_user(user["user_id"], password=new_password):
+        # Update user password (bcrypt runs on the password worker pool)
+        future = get_password_service().submit(update_user, user["user_id"], password=new_password)
+        self.tasks.watch(future, lambda success: self.on_password_reset(user, success))
+
+    def on_password_reset(self, user, success):
+        if success:
             messagebox.showinfo("Password Reset", f"Password for {user['username']} has been reset.")
             
-            # Log the action
-            log_action(self.controller.current_user_id, "PASSWORD_RESET", 
-                      f"Password reset for user {user['username']} by {self.controller.current_username}")
+            # A critical action type, flushed to disk before log_action returns
+            self.tasks.run(log_action, self.controller.current_user_id, "PASSWORD_RESET",
+                           f"Password reset for user {user['username']} by {self.controller.current_username}")
         else:
             messagebox.showerror("Error", f"Failed to reset password for {user['username']}.")
     
@@ -247,8 +311,13 @@ class OwnerDashboard(ctk.CTkFrame):
             messagebox.showerror("Validation Error", "All fields are required.")
             return
             
-        # Add user
-        if add_user(username, password, role, full_name):
+        # Add user (bcrypt runs on the password worker pool)
+        future = get_password_service().submit(add_user, username, password, role, full_name)
+        self.tasks.watch(future, lambda success: self.on_user_added(username, role, success),
+                         busy=[self.add_user_button])
+
+    def on_user_added(self, username, role, success):
+        if success:
             messagebox.showinfo("User Added", f"User {username} has been added with role {role}.")
             
             # Log the action
@@ -260,17 +329,17 @@ class OwnerDashboard(ctk.CTkFrame):
             self.new_password.delete(0, 'end')
             self.new_fullname.delete(0, 'end')
             
-            # Refresh user list
-            scrollable_frame = self.tabview.tab("User Management").winfo_children()[0].winfo_children()[2]
-            self.populate_user_list(scrollable_frame)
+            # Add the new user's row
+            self.refresh_user_list()
         else:
             messagebox.showerror("Error", f"Failed to add user {username}.")
     
-    def setup_business_settings_tab(self):
+    def setup_business_settings_tab(self, business_info=None):
         tab = self.tabview.tab("Business Settings")
         
-        # Get current business info
-        business_info = get_business_info()
+        # Get current business info, unless it was prefetched
+        if business_info is None:
+            business_info = get_business_info()
         
         # Settings frame
         settings_frame = ctk.CTkFrame(tab)
@@ -310,13 +379,13 @@ class OwnerDashboard(ctk.CTkFrame):
         date_value_label.grid(row=1, column=1, sticky="w", padx=20, pady=10)
         
         # Save button
-        save_button = ctk.CTkButton(
+        self.save_settings_button = ctk.CTkButton(
             settings_frame, 
             text="Save Changes", 
             command=self.save_business_settings,
             width=150
         )
-        save_button.grid(row=2, column=1, sticky="e", padx=20, pady=(20, 10))
+        self.save_settings_button.grid(row=2, column=1, sticky="e", padx=20, pady=(20, 10))
         
     def save_business_settings(self):
         # Get form values
@@ -328,7 +397,12 @@ class OwnerDashboard(ctk.CTkFrame):
             return
             
         # Update business info
-        if update_business_info(business_name):
+        self.tasks.run(update_business_info, business_name,
+                       on_done=lambda success: self.on_business_settings_saved(business_name, success),
+                       busy=[self.save_settings_button])
+        
+    def on_business_settings_saved(self, business_name, success):
+        if success:
             messagebox.showinfo("Settings Saved", "Business settings have been updated.")
             
             # Log the action
@@ -337,7 +411,7 @@ class OwnerDashboard(ctk.CTkFrame):
         else:
             messagebox.showerror("Error", "Failed to update business settings.")
     
-    def setup_license_info_tab(self):
+    def setup_license_info_tab(self, hardware_id=None):
         tab = self.tabview.tab("License Information")
         
         # License info frame
@@ -373,8 +447,8 @@ class OwnerDashboard(ctk.CTkFrame):
         ctk.CTkLabel(info_frame, text="Active", width=300, anchor="w", text_color="green").grid(row=3, column=1, padx=10, pady=10, sticky="w")
         
         # Hardware ID
-        from db.database_manager import get_hardware_id
-        hardware_id = get_hardware_id()
+        if hardware_id is None:
+            hardware_id = get_hardware_id()
         
         ctk.CTkLabel(info_frame, text="Hardware ID:", width=150, anchor="w").grid(row=4, column=0, padx=10, pady=10, sticky="w")
         ctk.CTkLabel(info_frame, text=f"{hardware_id[:8]}...{hardware_id[-8:]}", width=300, anchor="w").grid(row=4, column=1, padx=10, pady=10, sticky="w")
@@ -397,7 +471,7 @@ class OwnerDashboard(ctk.CTkFrame):
         )
         email_label.pack(pady=(0, 10))
     
-    def setup_system_logs_tab(self):
+    def setup_system_logs_tab(self, first_page=None):
         tab = self.tabview.tab("System Logs")
         
         # Logs frame
@@ -412,77 +486,114 @@ class OwnerDashboard(ctk.CTkFrame):
         )
         logs_title.pack(pady=(10, 5))
         
-        # Create scrollable frame for logs
-        scrollable_frame = ctk.CTkScrollableFrame(logs_frame, height=400)
-        scrollable_frame.pack(fill="both", expand=True, padx=10, pady=10)
-        
-        # Get logs from database
-        conn = None
-        try:
-            from db.database_manager import get_db_connection
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Get the most recent 100 logs
-            cursor.execute("""
-                SELECT a.log_id, a.action_type, a.action_details, a.timestamp, u.username
-                FROM AuditLog a
-                LEFT JOIN Users u ON a.user_id = u.user_id
-                ORDER BY a.timestamp DESC
-                LIMIT 100
-            """)
-            
-            logs = cursor.fetchall()
-            
-            # Create header
-            header_frame = ctk.CTkFrame(scrollable_frame)
-            header_frame.pack(fill="x", pady=(0, 5))
-            
-            ctk.CTkLabel(header_frame, text="Time", width=150, font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, padx=5, pady=5)
-            ctk.CTkLabel(header_frame, text="User", width=100, font=ctk.CTkFont(weight="bold")).grid(row=0, column=1, padx=5, pady=5)
-            ctk.CTkLabel(header_frame, text="Action", width=120, font=ctk.CTkFont(weight="bold")).grid(row=0, column=2, padx=5, pady=5)
-            ctk.CTkLabel(header_frame, text="Details", width=300, font=ctk.CTkFont(weight="bold")).grid(row=0, column=3, padx=5, pady=5)
-            
-            # Add logs to list
-            for i, log in enumerate(logs):
-                row_frame = ctk.CTkFrame(scrollable_frame)
-                row_frame.pack(fill="x", pady=2)
-                
-                ctk.CTkLabel(row_frame, text=log["timestamp"], width=150).grid(row=0, column=0, padx=5, pady=5)
-                ctk.CTkLabel(row_frame, text=log["username"] or "System", width=100).grid(row=0, column=1, padx=5, pady=5)
-                ctk.CTkLabel(row_frame, text=log["action_type"], width=120).grid(row=0, column=2, padx=5, pady=5)
-                ctk.CTkLabel(row_frame, text=log["action_details"], width=300).grid(row=0, column=3, padx=5, pady=5)
-                
-        except Exception as e:
-            error_label = ctk.CTkLabel(
-                scrollable_frame, 
-                text=f"Error loading logs: {str(e)}",
-                text_color="red"
-            )
-            error_label.pack(pady=20)
-        finally:
-            if conn:
-                conn.close()
+        # Virtualized log list: a fixed pool of row widgets, pages loaded on scroll
+        self.logs_list = VirtualList(
+            logs_frame,
+            columns=[
+                ("timestamp", "Time", 150),
+                ("username", "User", 100),
+                ("action_type", "Action", 120),
+                ("action_details", "Details", 300),
+            ],
+            fetch_page=self.fetch_log_page,
+            key_of=lambda log: (log["timestamp"], log["log_id"]),
+            visible_rows=15,
+            page_size=AUDIT_LOG_PAGE_SIZE,
+            tasks=self.tasks
+        )
+        self.logs_list.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Refresh button
-        refresh_button = ctk.CTkButton(
+        self.refresh_logs_button = ctk.CTkButton(
             logs_frame, 
             text="Refresh Logs", 
-            command=lambda: self.setup_system_logs_tab(),
+            command=self.refresh_logs,
             width=150
         )
-        refresh_button.pack(pady=10)
+        self.refresh_logs_button.pack(pady=10)
+        
+        self.logs_status = ctk.CTkLabel(logs_frame, text="")
+        self.logs_status.pack()
+        
+        if first_page is not None:
+            self.logs_list.reset(first_page)
+        else:
+            self.refresh_logs()
         
         # Export logs button
-        export_button = ctk.CTkButton(
-            logs_frame, 
+        export_frame = ctk.CTkFrame(logs_frame, fg_color="transparent")
+        export_frame.pack(pady=(0, 10))
+        
+        self.export_button = ctk.CTkButton(
+            export_frame, 
             text="Export Logs", 
             command=self.export_logs,
             width=150
         )
-        export_button.pack(pady=(0, 10))
+        self.export_button.pack(side="left", padx=5)
+        
+        self.cancel_export_button = ctk.CTkButton(
+            export_frame,
+            text="Cancel Export",
+            command=self.cancel_export,
+            width=120,
+            state="disabled"
+        )
+        self.cancel_export_button.pack(side="left", padx=5)
+        
+        self.export_progress_label = ctk.CTkLabel(export_frame, text="", width=200)
+        self.export_progress_label.pack(side="left", padx=5)
+        
+        # Query statistics: per-statement timings and the slow-query log
+        stats_frame = ctk.CTkFrame(logs_frame, fg_color="transparent")
+        stats_frame.pack(pady=(0, 10))
+        
+        self.query_stats_switch = ctk.CTkSwitch(
+            stats_frame,
+            text="Record query statistics",
+            command=self.toggle_query_stats
+        )
+        if get_query_stats().enabled:
+            self.query_stats_switch.select()
+        self.query_stats_switch.pack(side="left", padx=5)
+        
+        self.query_report_button = ctk.CTkButton(
+            stats_frame,
+            text="Query Report",
+            command=self.show_query_report,
+            width=150
+        )
+        self.query_report_button.pack(side="left", padx=5)
+        
+        # Both read this computer's database file, not the one behind the service
+        if is_using_service():
+            for widget in (self.export_button, self.query_stats_switch, self.query_report_button):
+                widget.configure(state="disabled")
+            ctk.CTkLabel(
+                logs_frame,
+                text="Log export and query statistics are available on the server only."
+            ).pack(pady=(0, 10))
+    
+    def prefetch_logs(self):
+        # Runs on a database worker thread: no widget access
+        flush_audit_log()
+        return self.fetch_log_page(None, AUDIT_LOG_PAGE_SIZE)
+    
+    def fetch_log_page(self, before, limit):
+        logs = get_audit_log_history_page(before, limit)
+        for log in logs:
+            log["username"] = log["username"] or "System"
+        return logs
+    
+    def refresh_logs(self):
+        # Flush queued audit records and load the first page in the background
+        self.tasks.run(self.prefetch_logs, on_done=self.logs_list.reset,
+                       busy=[self.refresh_logs_button], status=self.logs_status)
     
     def export_logs(self):
+        if self.export_cancel_event is not None:
+            return
+        
         # Ask for save location
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
@@ -492,53 +603,114 @@ class OwnerDashboard(ctk.CTkFrame):
         
         if not file_path:
             return
-            
-        # Export logs to CSV
-        conn = None
-        try:
-            from db.database_manager import get_db_connection
-            import csv
-            
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Get all logs
-            cursor.execute("""
-                SELECT a.log_id, a.action_type, a.action_details, a.timestamp, u.username
-                FROM AuditLog a
-                LEFT JOIN Users u ON a.user_id = u.user_id
-                ORDER BY a.timestamp DESC
-            """)
-            
-            logs = cursor.fetchall()
-            
-            # Write to CSV
-            with open(file_path, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(['Log ID', 'Timestamp', 'User', 'Action Type', 'Details'])
-                
-                for log in logs:
-                    writer.writerow([
-                        log["log_id"],
-                        log["timestamp"],
-                        log["username"] or "System",
-                        log["action_type"],
-                        log["action_details"]
-                    ])
-            
-            messagebox.showinfo("Export Complete", f"Logs exported to {file_path}")
+        
+        # Stream the export on a worker thread; progress is only stored there
+        # and shown from the Tk thread by update_export_progress()
+        self.export_cancel_event = threading.Event()
+        self.export_progress = (0, 0)
+        self.cancel_export_button.configure(state="normal")
+        
+        future = export_audit_log_csv_async(file_path, self.store_export_progress, self.export_cancel_event)
+        self.tasks.watch(future,
+                         lambda result: self.on_logs_exported(file_path, result),
+                         lambda error: self.on_logs_exported(file_path, {"success": False, "cancelled": False, "error": str(error)}),
+                         busy=[self.export_button], status=self.export_progress_label,
+                         loading_text="Exporting...", cancel_event=self.export_cancel_event)
+        self.after(EXPORT_PROGRESS_INTERVAL_MS, self.update_export_progress)
+    
+    def store_export_progress(self, written, total):
+        self.export_progress = (written, total)
+    
+    def update_export_progress(self):
+        if self.export_cancel_event is None:
+            return
+        written, total = self.export_progress
+        if total:
+            self.export_progress_label.configure(text=f"Exported {written:,} of {total:,} ({written * 100 // total}%)")
+        self.after(EXPORT_PROGRESS_INTERVAL_MS, self.update_export_progress)
+    
+    def cancel_export(self):
+        if self.export_cancel_event is not None:
+            self.export_cancel_event.set()
+    
+    def on_logs_exported(self, file_path, result):
+        self.export_cancel_event = None
+        self.cancel_export_button.configure(state="disabled")
+        
+        if result["success"]:
+            messagebox.showinfo("Export Complete", f"{result['rows']:,} log entries exported to {file_path}")
             
             # Log the action
             log_action(self.controller.current_user_id, "LOGS_EXPORTED", 
                       f"System logs exported by {self.controller.current_username}")
-                      
-        except Exception as e:
-            messagebox.showerror("Export Error", f"Failed to export logs: {str(e)}")
-        finally:
-            if conn:
-                conn.close()
+        elif not result["cancelled"]:
+            messagebox.showerror("Export Error", f"Failed to export logs: {result['error']}")
+    
+    def toggle_query_stats(self):
+        if self.query_stats_switch.get():
+            log_path = enable_query_stats()
+            log_action(self.controller.current_user_id, "QUERY_STATS_ENABLED",
+                       f"Query statistics enabled by {self.controller.current_username}, slow queries logged to {log_path}")
+        else:
+            disable_query_stats()
+            log_action(self.controller.current_user_id, "QUERY_STATS_DISABLED",
+                       f"Query statistics disabled by {self.controller.current_username}")
+    
+    def show_query_report(self):
+        self.tasks.run(get_query_stats_report, QUERY_REPORT_TOP_N, on_done=self.open_query_report,
+                       busy=[self.query_report_button])
+    
+    def open_query_report(self, report):
+        window = ctk.CTkToplevel(self)
+        window.title("Query Statistics")
+        window.geometry("1000x600")
+        
+        textbox = ctk.CTkTextbox(window, font=ctk.CTkFont(family="Courier", size=12), wrap="none")
+        textbox.pack(fill="both", expand=True, padx=10, pady=10)
+        textbox.insert("1.0", report)
+        textbox.configure(state="disabled")
+        
+        button_frame = ctk.CTkFrame(window, fg_color="transparent")
+        button_frame.pack(pady=(0, 10))
+        ctk.CTkButton(button_frame, text="Save Report", width=120,
+                      command=lambda: self.save_query_report(report)).pack(side="left", padx=5)
+        ctk.CTkButton(button_frame, text="Close", width=120, command=window.destroy).pack(side="left", padx=5)
+    
+    def save_query_report(self, report):
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+            title="Save Query Report"
+        )
+        if not file_path:
+            return
+        try:
+            with open(file_path, "w") as f:
+                f.write(report + "\n")
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to save the report: {e}")
+    
+    def on_show(self):
+        # Called by App when this cached dashboard is shown again for a new login
+        self.welcome_label.configure(text=f"Welcome, {self.controller.current_username}!")
+        
+        # Users and logs may have changed while the dashboard was hidden
+        self.refresh_user_list()
+        if self.tabview.is_built("System Logs"):
+            self.refresh_logs()
+    
+    def reset_user_state(self):
+        # Called by App on logout
+        self.cancel_export()
+        self.new_username.delete(0, 'end')
+        self.new_password.delete(0, 'end')
+        self.new_fullname.delete(0, 'end')
+        self.tabview.set("User Management")
     
     def logout(self):
+        # Stop a running export; the worker removes the partial file
+        self.cancel_export()
+        
         # Log the logout
         log_action(self.controller.current_user_id, "USER_LOGOUT", 
                   f"User {self.controller.current_username} logged out")
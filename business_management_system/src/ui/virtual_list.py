@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+import customtkinter as ctk
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Scrollable table that renders a fixed pool of row widgets.
+
+    Rows are fetched a page at a time from fetch_page(after_key, limit) as the
+    user scrolls towards the end of what has been loaded, and only plain row
+    data is kept. The widgets are created once, visible_rows of them, and are
+    re-labelled on every scroll, so rendering cost does not depend on how many
+    rows exist. When a TaskRunner is given, pages are fetched on the
+    database worker pool and the list re-renders when they arrive.
+    """
+
+    def __init__(self, parent, columns: List[Tuple[str, str, int]],
+                 fetch_page: Callable[[Optional[Any], int], List[Dict[str, Any]]],
+                 key_of: Callable[[Dict[str, Any]], Any],
+                 visible_rows: int = 20, page_size: int = 200, tasks=None, **kwargs):
+        """
+        Args:
+            parent: Parent widget
+            columns: (row key, header title, width) for each column
+            fetch_page: Returns up to limit rows following after_key (None for the first page)
+            key_of: Returns the paging key of a row, passed back to fetch_page
+            visible_rows: Number of row widgets in the pool
+            page_size: Rows requested per fetch
+            tasks: TaskRunner used to fetch pages off the Tk thread (fetched synchronously if omitted)
+        """
+        super().__init__(parent, **kwargs)
+        self.columns = columns
+        self.fetch_page = fetch_page
+        self.key_of = key_of
+        self.visible_rows = visible_rows
+        self.page_size = page_size
+        self.tasks = tasks
+
+        self.rows: List[Dict[str, Any]] = []
+        self.first = 0
+        self.exhausted = False
+        # Background fetch state: the requested first row and a counter that
+        # invalidates pages requested before the last reset()
+        self._loading = False
+        self._target_first = 0
+        self._generation = 0
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        header_frame = ctk.CTkFrame(self)
+        header_frame.grid(row=0, column=0, sticky="ew", pady=(0, 5))
+        for column, (_, title, width) in enumerate(columns):
+            ctk.CTkLabel(header_frame, text=title, width=width, font=ctk.CTkFont(weight="bold")).grid(
+                row=0, column=column, padx=5, pady=5)
+
+        body_frame = ctk.CTkFrame(self, fg_color="transparent")
+        body_frame.grid(row=1, column=0, sticky="nsew")
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+
+        # The fixed widget pool: one frame and one label per column for each visible row
+        self._pool: List[List[ctk.CTkLabel]] = []
+        self._pool_texts: List[List[str]] = []
+        for index in range(visible_rows):
+            row_frame = ctk.CTkFrame(body_frame)
+            row_frame.pack(fill="x", pady=2)
+            labels = []
+            for column, (_, _, width) in enumerate(columns):
+                label = ctk.CTkLabel(row_frame, text="", width=width, anchor="w")
+                label.grid(row=0, column=column, padx=5, pady=5)
+                labels.append(label)
+            for widget in [row_frame] + labels:
+                self._bind_wheel(widget)
+            self._pool.append(labels)
+            self._pool_texts.append([""] * len(columns))
+        self._bind_wheel(body_frame)
+
+    def _bind_wheel(self, widget) -> None:
+        widget.bind("<MouseWheel>", lambda event: self.scroll_by(-3 if event.delta > 0 else 3))
+        widget.bind("<Button-4>", lambda event: self.scroll_by(-3))
+        widget.bind("<Button-5>", lambda event: self.scroll_by(3))
+
+    def reset(self, first_page: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Drops the loaded rows and shows the first page again.
+
+        Args:
+            first_page: The first page if it was already fetched (e.g. in the background)
+        """
+        self.rows = list(first_page) if first_page is not None else []
+        self.first = 0
+        self.exhausted = first_page is not None and len(first_page) < self.page_size
+        self._generation += 1
+        self._loading = False
+        self._target_first = 0
+        self._ensure_loaded(self.visible_rows)
+        self._render()
+
+    def _ensure_loaded(self, count: int) -> None:
+        """Fetches pages until count rows are loaded or the source is exhausted."""
+        if self.tasks is not None:
+            self._request_page(count)
+            return
+        while not self.exhausted and len(self.rows) < count:
+            after_key = self.key_of(self.rows[-1]) if self.rows else None
+            page = self.fetch_page(after_key, self.page_size)
+            self.rows.extend(page)
+            if len(page) < self.page_size:
+                self.exhausted = True
+
+    def _request_page(self, count: int) -> None:
+        """Starts fetching the next page in the background if fewer than count rows are loaded."""
+        if self.exhausted or self._loading or len(self.rows) >= count:
+            return
+        self._loading = True
+        generation = self._generation
+        after_key = self.key_of(self.rows[-1]) if self.rows else None
+        self.tasks.run(self.fetch_page, after_key, self.page_size,
+                       on_done=lambda page: self._on_page(generation, page),
+                       on_error=lambda error: self._on_page_error(generation, error))
+
+    def _on_page(self, generation: int, page: List[Dict[str, Any]]) -> None:
+        if generation != self._generation:
+            return
+        self._loading = False
+        self.rows.extend(page)
+        if len(page) < self.page_size:
+            self.exhausted = True
+        self.scroll_to(self._target_first)
+
+    def _on_page_error(self, generation: int, error: BaseException) -> None:
+        if generation != self._generation:
+            return
+        # The next scroll retries
+        self._loading = False
+        print(f"Error fetching rows: {error}")
+
+    def _scroll_total(self) -> int:
+        # Leave room below the loaded rows until the source is exhausted
+        return max(len(self.rows) + (0 if self.exhausted else self.page_size), 1)
+
+    def scroll_to(self, first: int) -> None:
+        """Shows rows starting at index first, fetching more rows if needed."""
+        self._target_first = first
+        self._ensure_loaded(first + self.visible_rows)
+        self.first = max(0, min(first, len(self.rows) - self.visible_rows))
+        self._render()
+
+    def scroll_by(self, rows: int) -> None:
+        """Scrolls by a number of rows (negative scrolls up)."""
+        self.scroll_to(self.first + rows)
+
+    def _on_scrollbar(self, action: str, value: str, unit: Optional[str] = None) -> None:
+        if action == "moveto":
+            self.scroll_to(int(float(value) * self._scroll_total()))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_by(int(value) * step)
+
+    def _render(self) -> None:
+        for offset, labels in enumerate(self._pool):
+            index = self.first + offset
+            row = self.rows[index] if index < len(self.rows) else None
+            texts = self._pool_texts[offset]
+            for column, (key, _, _) in enumerate(self.columns):
+                value = row.get(key) if row is not None else None
+                text = "" if value is None else str(value)
+                # Only touch widgets whose text actually changed
+                if texts[column] != text:
+                    labels[column].configure(text=text)
+                    texts[column] = text
+
+        total = self._scroll_total()
+        self.scrollbar.set(self.first / total, min((self.first + self.visible_rows) / total, 1.0))